@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of API token verification.
+
+A minimal FastAPI app with one route is served in-process (httpx
+ASGITransport) three ways, so the difference is the auth dependency alone:
+
+* none:     no authentication
+* previous: the old per-endpoint `def verify_api_token` (os.getenv and `!=`
+            on every request; a sync dependency, so it runs in the threadpool)
+* current:  the router-level `require_read` dependency from dependencies.py
+
+It also times `auth_service.verify` directly: cached, and uncached for a
+valid and an invalid token (which should take the same time).
+
+Usage:
+    python benchmarks/auth_overhead.py [requests] [concurrency]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOKEN = "benchmark-token"
+os.environ["API_TOKEN"] = TOKEN
+os.environ.setdefault("API_TOKENS", ";".join(
+    f"client{i}:{'%064x' % i}:read" for i in range(20)
+))
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException
+
+from dependencies import require_read
+from services.auth_service import AuthService
+
+
+def previous_verify_api_token(x_api_token: str = Header(...)):
+    expected_token = os.getenv("API_TOKEN")
+    if not expected_token:
+        raise HTTPException(status_code=500, detail="API token not configured")
+    if x_api_token != expected_token:
+        raise HTTPException(status_code=401, detail="Invalid or missing API token")
+    return True
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    none = APIRouter(prefix="/none")
+    previous = APIRouter(prefix="/previous")
+    current = APIRouter(prefix="/current", dependencies=[Depends(require_read)])
+
+    @none.get("/ping")
+    async def ping_none():
+        return {"ok": True}
+
+    @previous.get("/ping")
+    async def ping_previous(auth: bool = Depends(previous_verify_api_token)):
+        return {"ok": True}
+
+    @current.get("/ping")
+    async def ping_current():
+        return {"ok": True}
+
+    for router in (none, previous, current):
+        app.include_router(router)
+    return app
+
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int) -> float:
+    """Mean microseconds per request"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers={"x-api-token": TOKEN}) as client:
+        remaining = iter(range(requests))
+
+        async def client_loop():
+            for _ in remaining:
+                response = await client.get(path)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def verify_cost(service: AuthService, token: str, calls: int, cached: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        if not cached:
+            service._cache.clear()
+        service.verify(token)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main(requests: int, concurrency: int, rounds: int = 5) -> None:
+    app = build_app()
+    modes = ("none", "previous", "current")
+    results = {mode: [] for mode in modes}
+    asyncio.run(run(app, "/none/ping", 500, concurrency))  # warm up
+    # Interleaved rounds so drift hits every mode alike
+    for _ in range(rounds):
+        for mode in modes:
+            results[mode].append(asyncio.run(run(app, f"/{mode}/ping", requests, concurrency)))
+
+    baseline = statistics.median(results["none"])
+    print(f"{requests:,} requests x {rounds} rounds, concurrency {concurrency} (median us per request)")
+    for mode in modes:
+        cost = statistics.median(results[mode])
+        print(f"  {mode:<10} {cost:8.1f} us   auth overhead {cost - baseline:+8.1f} us")
+
+    service = AuthService()
+    calls = 100000
+    print(f"auth_service.verify with {len(service.credentials)} credentials (us per call)")
+    print(f"  cached                {verify_cost(service, TOKEN, calls, True):6.2f}")
+    print(f"  uncached, valid       {verify_cost(service, TOKEN, calls, False):6.2f}")
+    print(f"  uncached, invalid     {verify_cost(service, 'x' * len(TOKEN), calls, False):6.2f}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 3000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    )
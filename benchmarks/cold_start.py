@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long it takes to import the app, and how long
+`uvicorn main:app` takes from process start until /health answers.
+
+Every run uses a fresh interpreter so nothing is cached in-process.
+
+Usage:
+    python benchmarks/cold_start.py [runs]
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import() -> float:
+    """Time `import main` in a fresh interpreter, in milliseconds"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_uvicorn(timeout: float = 30.0) -> float:
+    """Time from launching uvicorn until /health responds, in milliseconds"""
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.5):
+                    return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("uvicorn did not become healthy in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def report(name, samples):
+    print(
+        f"{name:<22} mean {statistics.mean(samples):8.1f} ms | "
+        f"min {min(samples):8.1f} ms | max {max(samples):8.1f} ms"
+    )
+
+
+def main(runs: int):
+    print(f"Cold start over {runs} runs ({sys.executable})")
+    report("import main", [measure_import() for _ in range(runs)])
+    report("uvicorn to /health", [measure_uvicorn() for _ in range(runs)])
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Load test for the whole API: throughput and p50/p95/p99 latency per endpoint.
+
+The app runs on a seeded throwaway data set, in-process over httpx's ASGI
+transport (default) or as `uvicorn main:app` on a random port (--uvicorn):
+
+* --accounts N generates N accounts (with cards, transactions, loans,
+  cheques, complaints and disputes) with generate_load_data.py into a
+  temporary MOCK_DATA_DIR; --accounts 0 uses a copy of mock_data/
+* virtual callers run voice-call flows, e.g. intent detection, balance, then
+  transaction history; each flow is a short sequence of API calls on one
+  account, with optional think time between them
+* --mix picks the flow weights: "voice" (typical IVR traffic), "support"
+  (complaints, disputes and escalations) or "uniform" (every endpoint once
+  per flow, so all of them get measured)
+* --mode mock runs without a database; --mode postgres (or both) runs
+  against --database-url, which is cleared and filled with the seeded data
+  (FORCE_POPULATE_DB), so point it at a scratch database
+
+Results can be saved with --output and compared with a previous run with
+--compare; the exit code is 1 when an endpoint's p95 or a run's throughput
+regressed by more than --threshold.
+
+Usage:
+    python benchmarks/load_test.py --accounts 10000 --concurrency 1,10,50 --duration 15
+    python benchmarks/load_test.py --mode both --database-url postgresql://localhost/bankwise_bench
+    python benchmarks/load_test.py --output results/after.json --compare results/before.json
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import orjson
+
+API_TOKEN = "load-test-token"
+HEADERS = {"x-api-token": API_TOKEN}
+
+# Collections generate_load_data.py does not produce; copied from mock_data/
+STATIC_FILES = ("branches.json", "atms.json", "fd_rates.json", "agents.json")
+
+Call = Dict[str, Any]
+# step -> (method, route template, builds the request from the dataset and the call)
+Step = Tuple[str, str, Callable[["Dataset", Call], Dict[str, Any]]]
+
+
+class Dataset:
+    """IDs sampled from the seeded data, so every request hits an existing record"""
+
+    def __init__(self, data_dir: str, sample: int = 2000, seed: int = 42):
+        from mock_data_storage import MockDataStorage
+
+        storage = MockDataStorage(data_dir)
+        self.rng = random.Random(seed)
+
+        def sample_of(records, fields):
+            picked = self.rng.sample(range(len(records)), min(sample, len(records)))
+            return [tuple(records[i][f] for f in fields) for i in picked]
+
+        self.accounts = sample_of(storage.accounts, ("account_number",))
+        self.transactions = sample_of(storage.transactions, ("id",))
+        last4 = sorted(storage.get_cards_last4_index())
+        self.card_last4 = self.rng.sample(last4, min(sample, len(last4)))
+        self.cheques = sample_of(storage.cheques, ("cheque_number", "account_number"))
+        self.loans = sample_of(storage.loans, ("loan_id", "account_number"))
+        self.complaints = sample_of(storage.complaints, ("ticket_id",))
+        self.disputes = sample_of(storage.disputes, ("ticket_id",))
+        self.cities = sorted({b["city"] for b in storage.branches})
+        self.pincodes = sorted({a["pincode"] for a in storage.atms})
+        with open(os.path.join(data_dir, "agents.json"), "rb") as f:
+            self.agents = [a["agent_id"] for a in orjson.loads(f.read())]
+        self.sizes = {name: storage.count(name) for name in storage.data_files}
+
+    def pick(self, values):
+        return self.rng.choice(values)
+
+    def new_call(self, utterance: str) -> Call:
+        account, = self.pick(self.accounts)
+        loan_id, loan_account = self.pick(self.loans)
+        return {
+            "utterance": utterance,
+            "session_id": str(uuid.uuid4()),
+            "account": account,
+            "loan_id": loan_id,
+            "loan_account": loan_account,
+        }
+
+
+def _json(body: Dict[str, Any], **extra) -> Dict[str, Any]:
+    return {"json": body, **extra}
+
+
+STEPS: Dict[str, Step] = {
+    "intent": ("POST", "/api/chat/intent", lambda d, c: _json({"text": c["utterance"], "session_id": c["session_id"]})),
+    "balance": ("POST", "/api/account/balance", lambda d, c: _json({"account_number": c["account"]})),
+    "transactions": ("POST", "/api/account/transactions", lambda d, c: _json({"account_number": c["account"], "limit": 5})),
+    "transaction": ("POST", "/api/account/transaction", lambda d, c: _json({"transaction_id": d.pick(d.transactions)[0]})),
+    "snapshot": ("POST", "/api/customer/snapshot", lambda d, c: _json({"account_number": c["account"]})),
+    "batch": ("POST", "/api/batch/{entity}", lambda d, c: {
+        "url": "/api/batch/transactions",
+        "json": {"ids": [d.pick(d.transactions)[0] for _ in range(10)]},
+    }),
+    "card_block": ("POST", "/api/card/block", lambda d, c: _json({"last4": d.pick(d.card_last4), "reason": "Lost card"})),
+    "kyc": ("POST", "/api/kyc/status", lambda d, c: _json({"account_number": c["account"]})),
+    "cheque_status": ("POST", "/api/cheque/status", lambda d, c: _json({"cheque_number": d.pick(d.cheques)[0]})),
+    "cheque_track": ("POST", "/api/cheque/track", lambda d, c: _json(dict(zip(("cheque_number", "account_number"), d.pick(d.cheques))))),
+    "fd_rates": ("POST", "/api/fd/rates", lambda d, c: _json({"amount": d.pick([50000, 100000, 500000])})),
+    "loan_status": ("POST", "/api/loan/status", lambda d, c: _json({"loan_id": c["loan_id"]})),
+    "loan_schedule": ("POST", "/api/loan/schedule", lambda d, c: _json({"loan_id": c["loan_id"], "limit": 12})),
+    "loan_portfolio": ("POST", "/api/loan/portfolio", lambda d, c: _json({"account_number": c["loan_account"]})),
+    "loan_prepayment": ("POST", "/api/loan/prepayment", lambda d, c: _json({"loan_id": c["loan_id"], "prepayment_amount": 50000})),
+    "branch": ("POST", "/api/branch/locate", lambda d, c: _json({"branch_city": d.pick(d.cities), "limit": 3})),
+    "atm": ("POST", "/api/atm/locate", lambda d, c: _json({"pincode": d.pick(d.pincodes), "limit": 3})),
+    "complaint_new": ("POST", "/api/complaint/new", lambda d, c: _json({
+        "account_number": c["account"],
+        "subject": "Card not working",
+        "description": "Card declined at the merchant terminal",
+        "category": "CARD",
+    })),
+    "complaint_status": ("POST", "/api/complaint/status", lambda d, c: _json({"ticket_id": d.pick(d.complaints)[0]})),
+    "complaint_update": ("POST", "/api/complaint/update-status", lambda d, c: _json({"ticket_id": d.pick(d.complaints)[0]})),
+    "dispute_raise": ("POST", "/api/dispute/raise", lambda d, c: _json({
+        "account_number": c["account"],
+        "amount": 1499.0,
+        "transaction_date": date.today().isoformat(),
+        "reason": "Unauthorized transaction",
+    })),
+    "dispute_update": ("POST", "/api/dispute/update-status", lambda d, c: {
+        "params": {"ticket_id": d.pick(d.disputes)[0], "new_status": "IN_PROGRESS"},
+    }),
+    "escalate": ("POST", "/api/escalate", lambda d, c: _json({"reason": "card blocked by mistake", "urgency": "high"})),
+    "agents_available": ("GET", "/api/agents/available", lambda d, c: {"params": {"limit": 5}}),
+    "agent_statistics": ("GET", "/api/agents/statistics", lambda d, c: {}),
+    "agent": ("GET", "/api/agents/{agent_id}", lambda d, c: {"url": f"/api/agents/{d.pick(d.agents)}"}),
+    "agent_status": ("PUT", "/api/agents/{agent_id}/status", lambda d, c: {
+        "url": f"/api/agents/{d.pick(d.agents)}/status",
+        "params": {"status": d.pick(["Available", "Busy"])},
+    }),
+    "sms_alert": ("POST", "/api/sms/transaction-alert", lambda d, c: _json({
+        "account_number": c["account"], "amount": 2500.0, "transaction_type": "DEBIT",
+    })),
+    "sms_send": ("POST", "/api/sms/send", lambda d, c: _json({"account_number": c["account"], "message": "Test message"})),
+    "sms_status": ("GET", "/api/sms/status", lambda d, c: {}),
+    "health": ("GET", "/health", lambda d, c: {}),
+}
+
+# Non-2xx statuses that are the expected answer here: SMS is disabled without Twilio credentials
+EXPECTED_STATUSES = {"sms_alert": {503}, "sms_send": {503}}
+
+# flow -> (what the caller says, steps)
+FLOWS: Dict[str, Tuple[str, List[str]]] = {
+    "balance_enquiry": ("what is my account balance", ["intent", "balance", "transactions"]),
+    "lost_card": ("please block my card", ["intent", "snapshot", "card_block", "sms_alert"]),
+    "dispute": ("I want to dispute a charge", ["intent", "transactions", "transaction", "dispute_raise"]),
+    "new_complaint": ("I want to file a complaint", ["intent", "complaint_new"]),
+    "complaint_followup": ("status of my complaint", ["intent", "complaint_status"]),
+    "loan_enquiry": ("when is my loan emi due", ["intent", "loan_portfolio", "loan_status", "loan_schedule"]),
+    "loan_prepayment": ("I want to prepay my loan", ["intent", "loan_status", "loan_prepayment"]),
+    "find_branch": ("find branch near me", ["intent", "branch"]),
+    "find_atm": ("atm near me", ["intent", "atm"]),
+    "cheque": ("check status of my cheque", ["intent", "cheque_status", "cheque_track"]),
+    "kyc": ("what is my kyc status", ["intent", "kyc"]),
+    "fd_rates": ("fixed deposit rates", ["intent", "fd_rates"]),
+    "speak_to_agent": ("let me speak to a human", ["intent", "agents_available", "escalate"]),
+}
+
+MIXES: Dict[str, Dict[str, float]] = {
+    "voice": {
+        "balance_enquiry": 30, "lost_card": 8, "dispute": 4, "new_complaint": 5,
+        "complaint_followup": 7, "loan_enquiry": 10, "loan_prepayment": 2, "find_branch": 8,
+        "find_atm": 6, "cheque": 5, "kyc": 4, "fd_rates": 5, "speak_to_agent": 6,
+    },
+    "support": {
+        "lost_card": 20, "dispute": 20, "new_complaint": 20, "complaint_followup": 20, "speak_to_agent": 20,
+    },
+    # Every step on its own, one flow per endpoint
+    "uniform": {f"step:{name}": 1 for name in STEPS},
+}
+
+
+def flow_steps(flow: str) -> Tuple[str, List[str]]:
+    if flow.startswith("step:"):
+        return "", [flow[5:]]
+    return FLOWS[flow]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def summarize(latencies: List[float], errors: int, statuses: Dict[int, int], seconds: float) -> Dict[str, Any]:
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / seconds, 2),
+        "p50_ms": round(percentile(latencies, 0.50) * 1e3, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1e3, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1e3, 3),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1e3, 3),
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+async def drive(
+    client, dataset: Dataset, mix: Dict[str, float], concurrency: int, duration: float, warmup: float, think: float
+) -> Dict[str, Any]:
+    """Run virtual callers for warmup + duration seconds; only the measured window is recorded"""
+    flows, weights = list(mix), list(mix.values())
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    loop_start = time.perf_counter()
+    measure_from = loop_start + warmup
+    deadline = measure_from + duration
+    calls = 0
+
+    async def caller():
+        nonlocal calls
+        while time.perf_counter() < deadline:
+            utterance, steps = flow_steps(dataset.rng.choices(flows, weights)[0])
+            call = dataset.new_call(utterance)
+            for name in steps:
+                method, template, build = STEPS[name]
+                kwargs = build(dataset, call)
+                url = kwargs.pop("url", template)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, url, **kwargs)
+                    status = response.status_code
+                except Exception:
+                    status = 0
+                end = time.perf_counter()
+                if start >= measure_from and end <= deadline:
+                    label = f"{method} {template}"
+                    latencies[label].append(end - start)
+                    statuses[label][status] += 1
+                    if not 200 <= status < 300 and status not in EXPECTED_STATUSES.get(name, ()):
+                        errors[label] += 1
+                if think:
+                    await asyncio.sleep(dataset.rng.expovariate(1 / think))
+            if time.perf_counter() >= measure_from:
+                calls += 1
+
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+
+    total_statuses: Dict[int, int] = defaultdict(int)
+    for per_status in statuses.values():
+        for status, count in per_status.items():
+            total_statuses[status] += count
+    endpoints = {
+        label: summarize(values, errors[label], statuses[label], duration)
+        for label, values in sorted(latencies.items())
+    }
+    overall = summarize(
+        [v for values in latencies.values() for v in values], sum(errors.values()), total_statuses, duration
+    )
+    overall["calls_per_second"] = round(calls / duration, 2)
+    return {"overall": overall, "endpoints": endpoints}
+
+
+def seed_data(accounts: int, per_account: int, seed: int, data_dir: str) -> None:
+    source = os.path.join(ROOT, "mock_data")
+    if accounts == 0:
+        shutil.copytree(source, data_dir, ignore=shutil.ignore_patterns("state.db*", "*.py"), dirs_exist_ok=True)
+        return
+
+    from generate_load_data import generate, write_snapshots
+
+    start = time.perf_counter()
+    data = generate(accounts, per_account, seed, date.today().isoformat(), os.cpu_count() or 1)
+    write_snapshots(data, data_dir)
+    for name in STATIC_FILES:
+        shutil.copy(os.path.join(source, name), data_dir)
+    print(f"Seeded {accounts:,} accounts in {time.perf_counter() - start:.1f}s")
+
+
+def app_environment(data_dir: str, database_url: Optional[str]) -> Dict[str, str]:
+    env = {
+        "API_TOKEN": API_TOKEN,
+        "MOCK_DATA_DIR": data_dir,
+        "MOCK_STATE_DB": os.path.join(data_dir, "state.db"),
+        "SHOULD_USE_TWILIO": "false",
+        "LOG_FILE": os.path.join(data_dir, "banking_api.log"),
+        "LOG_CONSOLE": "false",
+        "FORCE_POPULATE_DB": "true" if database_url else "false",
+    }
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    return env
+
+
+class InProcessApp:
+    """The app in this process behind httpx's ASGI transport"""
+
+    def __init__(self, data_dir: str):
+        os.environ.update(app_environment(data_dir, None))
+        os.environ.pop("DATABASE_URL", None)
+        import httpx
+        import main
+
+        self.httpx = httpx
+        self.main = main
+
+    async def start(self, database_url: Optional[str], concurrency: int):
+        os.environ["FORCE_POPULATE_DB"] = "true" if database_url else "false"
+        self.main.db_manager.db_url = database_url
+        await self.main.startup_event()
+        if database_url and not self.main.db_manager.pool:
+            raise SystemExit(f"Could not connect to {database_url}")
+        return self.httpx.AsyncClient(
+            transport=self.httpx.ASGITransport(app=self.main.app, raise_app_exceptions=False), base_url="http://load-test", headers=HEADERS, timeout=60
+        )
+
+    async def stop(self, client) -> None:
+        await client.aclose()
+        await self.main.shutdown_event()
+
+
+class UvicornApp:
+    """`uvicorn main:app` in a subprocess on a random port"""
+
+    def __init__(self, data_dir: str, workers: int):
+        import httpx
+
+        self.httpx = httpx
+        self.data_dir = data_dir
+        self.workers = workers
+        self.process: Optional[subprocess.Popen] = None
+
+    async def start(self, database_url: Optional[str], concurrency: int):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}
+        env.update(app_environment(self.data_dir, database_url))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+             "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        limits = self.httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        client = self.httpx.AsyncClient(base_url=base_url, headers=HEADERS, timeout=60, limits=limits)
+        # Populating the database on startup can take a while for large data sets
+        deadline = time.perf_counter() + 600
+        while time.perf_counter() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit("uvicorn exited during startup")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return client
+            except self.httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+        raise SystemExit("uvicorn did not become ready in time")
+
+    async def stop(self, client) -> None:
+        await client.aclose()
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+            self.process = None
+
+
+def print_run(run: Dict[str, Any]) -> None:
+    overall = run["overall"]
+    print(
+        f"\n[{run['mode']}] mix={run['mix']} concurrency={run['concurrency']}: "
+        f"{overall['throughput']:,.0f} req/s, {overall['calls_per_second']:,.1f} calls/s, "
+        f"p50 {overall['p50_ms']:.2f} ms, p95 {overall['p95_ms']:.2f} ms, p99 {overall['p99_ms']:.2f} ms, "
+        f"{overall['errors']} errors"
+    )
+    print(f"  {'endpoint':<40} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, e in run["endpoints"].items():
+        print(
+            f"  {label:<40} {e['requests']:>7} {e['throughput']:>8.1f} {e['p50_ms']:>8.2f} "
+            f"{e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f} {e['errors']:>7}"
+        )
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> int:
+    """Print changes against a baseline result file; returns the number of regressions"""
+    previous = {(r["mode"], r["mix"], r["concurrency"]): r for r in baseline["runs"]}
+    regressions = 0
+    print(f"\nCompared with {baseline['meta']['started_at']} (threshold {threshold:.0%})")
+    for run in current["runs"]:
+        key = (run["mode"], run["mix"], run["concurrency"])
+        before = previous.get(key)
+        if before is None:
+            print(f"  [{key[0]}] mix={key[1]} concurrency={key[2]}: no baseline")
+            continue
+        rows = [("throughput", before["overall"]["throughput"], run["overall"]["throughput"], True)]
+        for label, e in run["endpoints"].items():
+            if label in before["endpoints"]:
+                rows.append((f"{label} p95", before["endpoints"][label]["p95_ms"], e["p95_ms"], False))
+        print(f"  [{key[0]}] mix={key[1]} concurrency={key[2]}")
+        for name, old, new, higher_is_better in rows:
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = "REGRESSION" if worse > threshold else ""
+            regressions += bool(flag)
+            print(f"    {name:<46} {old:>10.2f} -> {new:>10.2f} ({change:+.1%}) {flag}")
+    return regressions
+
+
+async def run_suite(args, data_dir: str) -> Dict[str, Any]:
+    modes = ["mock", "postgres"] if args.mode == "both" else [args.mode]
+    app = UvicornApp(data_dir, args.workers) if args.uvicorn else InProcessApp(data_dir)
+    dataset = Dataset(data_dir, seed=args.seed)
+    runs = []
+    for mode in modes:
+        database_url = args.database_url if mode == "postgres" else None
+        for concurrency in args.concurrency:
+            # Restart the app per level (startup and shutdown in-process, a new uvicorn otherwise)
+            client = await app.start(database_url, concurrency)
+            try:
+                result = await drive(
+                    client, dataset, MIXES[args.mix], concurrency, args.duration, args.warmup, args.think_ms / 1000
+                )
+            finally:
+                await app.stop(client)
+            run = {"mode": mode, "mix": args.mix, "concurrency": concurrency, **result}
+            print_run(run)
+            runs.append(run)
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "transport": "uvicorn" if args.uvicorn else "asgi",
+            "workers": args.workers if args.uvicorn else 1,
+            "accounts": args.accounts,
+            "transactions_per_account": args.transactions_per_account,
+            "dataset": dataset.sizes,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "think_ms": args.think_ms,
+        },
+        "runs": runs,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=2000, help="accounts to generate (0 = copy of mock_data/)")
+    parser.add_argument("--transactions-per-account", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="voice")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 10, 50],
+                        help="comma-separated concurrent callers, one run each")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each run")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between the steps of a call")
+    parser.add_argument("--mode", choices=["mock", "postgres", "both"], default="mock")
+    parser.add_argument("--database-url", default=os.getenv("LOAD_TEST_DATABASE_URL"),
+                        help="scratch Postgres database for --mode postgres (it is cleared and repopulated)")
+    parser.add_argument("--uvicorn", action="store_true", help="run uvicorn on a random port instead of in-process")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (with --uvicorn)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    if args.mode != "mock" and not args.database_url:
+        parser.error("--mode postgres/both needs --database-url or LOAD_TEST_DATABASE_URL")
+
+    data_dir = tempfile.mkdtemp(prefix="bankwise-load-test-")
+    try:
+        seed_data(args.accounts, args.transactions_per_account, args.seed, data_dir)
+        results = asyncio.run(run_suite(args, data_dir))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "wb") as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+        print(f"\nWrote {args.output}")
+    if args.compare:
+        with open(args.compare, "rb") as f:
+            baseline = orjson.loads(f.read())
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
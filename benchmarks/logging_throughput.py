@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Requests/sec of the API with logging off, with the old synchronous handlers,
+and with the queue-based pipeline from logging_config.py.
+
+Requests go straight to the ASGI app in-process (httpx ASGITransport), so
+the numbers isolate the cost of logging in the request path. The balance
+endpoint is used because it logs on every request, like most routes.
+
+Console output goes to /dev/null in every mode, so terminal speed does not
+skew the comparison.
+
+It also reports how long the calling thread spends per logger.info call,
+which is the time taken away from the event loop.
+
+Usage:
+    python benchmarks/logging_throughput.py [requests] [concurrency] [rounds]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+os.environ.setdefault("API_TOKEN", "benchmark-token")
+os.environ.setdefault("MOCK_SHARED_STATE", "false")
+# One token and account sending thousands of requests would be rate limited
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Keep the app's own startup logging out of the repository log file
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "bankwise-logging-bench.log"))
+os.environ.setdefault("LOG_CONSOLE", "false")
+
+import httpx
+
+import main
+from logging_config import CONSOLE_FORMAT, setup_logging, stop_logging
+from mock_data_storage import mock_storage
+
+
+def logging_off(log_file: str) -> None:
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.WARNING)
+
+
+def logging_sync(log_file: str) -> None:
+    """The previous setup: file and console handlers called on the event loop"""
+    logging_off(log_file)
+    formatter = logging.Formatter(CONSOLE_FORMAT)
+    for handler in (logging.FileHandler(log_file), logging.StreamHandler(open(os.devnull, "w"))):
+        handler.setFormatter(formatter)
+        logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+
+def logging_queue(log_file: str, sample_rate: float = 1.0) -> None:
+    logging_off(log_file)
+    stderr, sys.stderr = sys.stderr, open(os.devnull, "w")
+    try:
+        setup_logging(log_file=log_file, level="INFO", sample_rate=sample_rate, console=True)
+    finally:
+        sys.stderr = stderr
+
+
+async def run(requests: int, concurrency: int, account_number: str) -> float:
+    transport = httpx.ASGITransport(app=main.app)
+    headers = {"x-api-token": os.environ["API_TOKEN"]}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def client_loop():
+            for _ in remaining:
+                response = await client.post(
+                    "/api/account/balance", json={"account_number": account_number}, headers=headers
+                )
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def per_call_cost(calls: int = 20000) -> float:
+    """Microseconds the calling thread spends per logger.info call"""
+    logger = logging.getLogger("routes.account")
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info(f"Account balance request for account: {i}")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main_benchmark(requests: int, concurrency: int, rounds: int) -> None:
+    # The benchmark's own HTTP client would otherwise log every request too
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    account_number = mock_storage.accounts[0]["account_number"]
+    modes = [
+        ("off", logging_off),
+        ("sync (FileHandler + StreamHandler)", logging_sync),
+        ("queue pipeline", logging_queue),
+        ("queue pipeline, INFO sampled 10%", lambda f: logging_queue(f, 0.1)),
+    ]
+    results = {name: [] for name, _ in modes}
+    costs = {}
+    lines = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        logging_off("")
+        asyncio.run(run(200, concurrency, account_number))  # warm up
+        # Interleave the modes so drift (CPU frequency, noisy neighbours) hits all of them alike
+        for _ in range(rounds):
+            for name, configure in modes:
+                log_file = os.path.join(tmp, "bench.log")
+                configure(log_file)
+                results[name].append(asyncio.run(run(requests, concurrency, account_number)))
+                stop_logging()
+                lines[name] = sum(1 for _ in open(log_file)) if os.path.exists(log_file) else 0
+                configure(log_file)
+                costs[name] = per_call_cost()
+                logging_off("")
+                if os.path.exists(log_file):
+                    os.remove(log_file)
+
+    print(f"{requests:,} requests x {rounds} rounds, concurrency {concurrency} (median req/s)")
+    for name, _ in modes:
+        print(
+            f"  {name:<36} {statistics.median(results[name]):8,.0f} req/s  "
+            f"{costs[name]:6.1f} us per log call  ({lines[name]:,} log lines)"
+        )
+
+
+if __name__ == "__main__":
+    main_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 3,
+    )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of the latency instrumentation in metrics.py.
+
+Measures the pieces that run on every request, in isolation and without any
+I/O, so the result is the overhead itself rather than request noise:
+
+* MetricsMiddleware around a trivial ASGI app (start, send wrapper, fold-in)
+* one `timed(phase)` block, as used around DB and mock storage calls
+* one TimedRoute endpoint wrapper call
+
+Also renders /metrics once with the routes the run produced.
+
+Usage:
+    python benchmarks/metrics_overhead.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics, MetricsMiddleware, _current, _RequestTimings, _timed_endpoint, timed
+
+
+class _Route:
+    path = "/api/account/balance"
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def noop_send(message):
+    pass
+
+
+async def noop_receive():
+    return {"type": "http.request"}
+
+
+async def asgi_cost(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "POST", "path": "/api/account/balance"}
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), noop_receive, noop_send)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def timed_block_cost(iterations: int) -> float:
+    token = _current.set(_RequestTimings())
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            with timed("mock"):
+                pass
+        return (time.perf_counter() - start) / iterations * 1e6
+    finally:
+        _current.reset(token)
+
+
+async def endpoint_cost(iterations: int) -> float:
+    async def endpoint():
+        return None
+
+    wrapped = _timed_endpoint(endpoint)
+    token = _current.set(_RequestTimings())
+    try:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await endpoint()
+        plain = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await wrapped()
+        return (time.perf_counter() - start - plain) / iterations * 1e6
+    finally:
+        _current.reset(token)
+
+
+def main(iterations: int) -> None:
+    registry = Metrics()
+    middleware = MetricsMiddleware(bare_app, registry)
+
+    async def run():
+        await asgi_cost(middleware, 1000)  # warm up
+        bare = await asgi_cost(bare_app, iterations)
+        wrapped = await asgi_cost(middleware, iterations)
+        return bare, wrapped, await endpoint_cost(iterations)
+
+    bare, wrapped, endpoint = asyncio.run(run())
+    print(f"{iterations:,} iterations (microseconds per request)")
+    print(f"  MetricsMiddleware          {wrapped - bare:6.2f} us")
+    print(f"  timed(phase) block         {timed_block_cost(iterations):6.2f} us")
+    print(f"  TimedRoute endpoint wrap   {endpoint:6.2f} us")
+
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"  /metrics render            {(time.perf_counter() - start) * 1e3:6.2f} ms ({len(body):,} bytes)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
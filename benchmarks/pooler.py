@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark: direct Postgres against a transaction-mode
+PgBouncer, with and without asyncpg's statement cache.
+
+Each configuration opens a pool the way `DatabaseManager._create_pool`
+does (same connection class, warm-up and lifetime recycling), then
+virtual callers run a query mix through `get_connection` for --duration
+seconds: a lookup by key, a short range scan and a single-row update in a
+transaction. Reported per configuration: pool open and warm-up time,
+throughput, p50/p95/p99 latency, errors by type and connections retired.
+
+Configurations:
+
+* direct, cache 100       the baseline: no pooler in between
+* pooled, cache 100       the old setup: asyncpg's default statement cache
+                          behind a transaction pooler, where a statement
+                          prepared on one server connection is looked up
+                          on another
+* pooled, cache 0         the default now for a transaction pooler
+* pooled, cache 0, 2s     the same, with connections retired every ~2s,
+                          to show what recycling costs
+
+The table is created and dropped over --direct. A local PgBouncer stands
+in for Neon's pooler; a minimal pgbouncer.ini for a local Postgres:
+
+    [databases]
+    bench = host=127.0.0.1 port=5432 dbname=postgres
+    [pgbouncer]
+    listen_port = 6432
+    pool_mode = transaction
+    max_prepared_statements = 0
+    auth_type = trust
+    auth_file = userlist.txt
+
+(`max_prepared_statements = 0` is PgBouncer's default before 1.21, and the
+behaviour of poolers without prepared statement support.)
+
+Usage:
+    python benchmarks/pooler.py --direct postgresql://postgres@localhost:5432/postgres \\
+        --pooled postgresql://postgres@localhost:6432/bench [--concurrency 20] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncpg
+
+from database import POOLER_NONE, POOLER_TRANSACTION, DatabaseManager
+
+ROWS = 10000
+TABLE = "pooler_bench"
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def create_table(direct_url: str) -> None:
+    conn = await asyncpg.connect(direct_url)
+    try:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.execute(
+            f"CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, account_number TEXT NOT NULL, balance NUMERIC(15,2) NOT NULL)"
+        )
+        await conn.copy_records_to_table(
+            TABLE,
+            records=[(i, f"{100000000000 + i}", 1000.0) for i in range(ROWS)],
+            columns=["id", "account_number", "balance"],
+        )
+    finally:
+        await conn.close()
+
+
+async def drop_table(direct_url: str) -> None:
+    conn = await asyncpg.connect(direct_url)
+    try:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    finally:
+        await conn.close()
+
+
+def manager(url: str, pooler: str, cache_size: int, max_lifetime: float, pool_size: int) -> DatabaseManager:
+    db = DatabaseManager()
+    db.db_url = url
+    db.pooler = pooler
+    db.statement_cache_size = cache_size
+    db.min_size = min(5, pool_size)
+    db.max_size = pool_size
+    db.max_lifetime = max_lifetime
+    db.warmup = True
+    return db
+
+
+async def one_call(db: DatabaseManager) -> None:
+    key = random.randrange(ROWS)
+    async with db.get_connection() as conn:
+        if conn is None:
+            raise ConnectionError("no connection")
+        kind = random.random()
+        if kind < 0.6:
+            await conn.fetchrow(f"SELECT account_number, balance FROM {TABLE} WHERE id = $1", key)
+        elif kind < 0.9:
+            await conn.fetch(f"SELECT id, balance FROM {TABLE} WHERE id >= $1 ORDER BY id LIMIT 10", key)
+        else:
+            async with conn.transaction():
+                await conn.execute(f"UPDATE {TABLE} SET balance = balance + $2 WHERE id = $1", key, 1.0)
+
+
+async def run_config(name: str, db: DatabaseManager, concurrency: int, duration: float) -> Dict[str, Any]:
+    retired = 0
+    original_close = asyncpg.Connection.close
+
+    async def counting_close(self, *args, **kwargs):
+        nonlocal retired
+        retired += 1
+        return await original_close(self, *args, **kwargs)
+
+    start = time.perf_counter()
+    await db._create_pool()
+    opened = time.perf_counter() - start
+
+    latencies: List[float] = []
+    errors: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def caller():
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            try:
+                await one_call(db)
+                latencies.append(time.perf_counter() - began)
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    asyncpg.Connection.close = counting_close
+    try:
+        began = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - began
+    finally:
+        asyncpg.Connection.close = original_close
+        await db.close()
+
+    return {
+        "name": name,
+        "open_ms": opened * 1000,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "errors": dict(errors),
+        "retired": retired,
+    }
+
+
+async def main_async(args) -> None:
+    await create_table(args.direct)
+    configs = [
+        ("direct, cache 100", manager(args.direct, POOLER_NONE, 100, 0, args.pool_size)),
+        ("pooled, cache 100", manager(args.pooled, POOLER_TRANSACTION, 100, 0, args.pool_size)),
+        ("pooled, cache 0", manager(args.pooled, POOLER_TRANSACTION, 0, 0, args.pool_size)),
+        ("pooled, cache 0, 2s", manager(args.pooled, POOLER_TRANSACTION, 0, 2.0, args.pool_size)),
+    ]
+    results = []
+    try:
+        for name, db in configs:
+            print(f"Running {name} ...")
+            results.append(await run_config(name, db, args.concurrency, args.duration))
+    finally:
+        await drop_table(args.direct)
+
+    print(f"\nconcurrency={args.concurrency} pool={args.pool_size} duration={args.duration:.0f}s")
+    print(
+        f"  {'configuration':<22} {'open ms':>8} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'retired':>8}  errors"
+    )
+    for r in results:
+        errors = ", ".join(f"{name}={count}" for name, count in sorted(r["errors"].items())) or "-"
+        print(
+            f"  {r['name']:<22} {r['open_ms']:>8.1f} {r['requests']:>7} {r['rps']:>8.1f} {r['p50']:>8.2f} "
+            f"{r['p95']:>8.2f} {r['p99']:>8.2f} {r['retired']:>8}  {errors}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--direct", required=True, help="Postgres URL without a pooler")
+    parser.add_argument("--pooled", required=True, help="URL of a transaction-mode PgBouncer in front of it")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pool-size", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of mock records held as a list of dicts versus a RecordStore.
+
+Builds synthetic transactions, cards and accounts shaped like the mock data
+and measures the retained allocations of each representation with
+tracemalloc. Each representation is built from freshly generated records in
+its own tracemalloc window, so no strings are shared between the two.
+
+Usage:
+    python benchmarks/record_memory.py [rows]
+
+tracemalloc slows allocation down a lot; 1M rows takes several minutes.
+"""
+
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_store import RecordStore
+
+ACCOUNTS = [str(random.Random(i).randint(10**11, 10**12 - 1)) for i in range(20000)]
+TRANSACTION_TYPES = ["UPI", "NEFT", "IMPS", "ATM", "POS", "CASHBACK", "INTEREST"]
+START = datetime(2024, 1, 1)
+
+
+def transactions(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        tx_type = rng.choice(TRANSACTION_TYPES)
+        yield {
+            "id": f"TXN{i:09d}",
+            "account_number": rng.choice(ACCOUNTS),
+            "transaction_date": (START + timedelta(seconds=rng.randint(0, 50_000_000), microseconds=rng.randint(1, 999_999))).isoformat(),
+            "description": f"{tx_type} Transaction",
+            "amount": round(rng.uniform(10, 50000), 2),
+            "type": tx_type,
+            "balance_after": round(rng.uniform(1000, 500000), 2),
+            "status": "COMPLETED",
+            "reference_id": f"REF{rng.randint(10000, 99999)}",
+            "merchant_id": None,
+            "location": None,
+        }
+
+
+def cards(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield {
+            "card_number": f"{4000000000000000 + i}",
+            "account_number": rng.choice(ACCOUNTS),
+            "card_type": rng.choice(["DEBIT", "CREDIT"]),
+            "card_network": rng.choice(["VISA", "MASTERCARD", "RUPAY"]),
+            "expiry_date": f"{rng.randint(1, 12):02d}/{rng.randint(26, 30)}",
+            "cvv": f"{rng.randint(100, 999)}",
+            "card_status": rng.choice(["ACTIVE", "BLOCKED"]),
+            "daily_limit": float(rng.choice([25000, 50000, 100000])),
+            "monthly_limit": float(rng.choice([250000, 500000])),
+            "international_usage": rng.choice(["ENABLED", "DISABLED"]),
+            "contactless": rng.choice(["ENABLED", "DISABLED"]),
+            "issue_date": (START - timedelta(days=rng.randint(0, 1500), microseconds=rng.randint(1, 999_999))).isoformat(),
+            "customer_name": f"Customer {i % 50000}",
+        }
+
+
+def accounts(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(rows):
+        yield {
+            "account_number": f"{100000000000 + i}",
+            "account_type": rng.choice(["SAVINGS", "CURRENT", "SALARY"]),
+            "balance": round(rng.uniform(1000, 1_000_000), 2),
+            "currency": "INR",
+            "customer_name": f"Customer {i % 50000}",
+            "customer_id": f"CUST{i:08d}",
+            "branch_code": f"BR{rng.randint(100, 999)}",
+            "ifsc_code": f"BANK0{rng.randint(100000, 999999)}",
+            "kyc_status": rng.choice(["VERIFIED", "PENDING"]),
+            "kyc_level": rng.choice(["FULL", "MINIMUM"]),
+            "last_updated": (START + timedelta(days=rng.randint(0, 600), microseconds=rng.randint(1, 999_999))).isoformat(),
+            "account_status": "ACTIVE",
+            "linked_cards": [f"{4000000000000000 + i}"],
+            "mobile_numbers": [f"+91{rng.randint(6000000000, 9999999999)}"],
+        }
+
+
+def measure(build):
+    """Retained bytes, peak bytes and seconds for building one representation"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    gc.collect()
+    return current, peak, elapsed
+
+
+def main(rows: int):
+    print(f"Memory at {rows:,} rows (tracemalloc, retained after build)")
+    for name, generate in (("transactions", transactions), ("cards", cards), ("accounts", accounts)):
+        as_dicts, _, dict_time = measure(lambda: list(generate(rows)))
+        as_store, store_peak, store_time = measure(lambda: RecordStore(generate(rows)))
+        print(
+            f"{name:<13} dicts {as_dicts / 2**20:8.1f} MB ({as_dicts / rows:5.0f} B/row) | "
+            f"store {as_store / 2**20:8.1f} MB ({as_store / rows:5.0f} B/row) | "
+            f"{as_dicts / as_store:4.1f}x smaller | build {dict_time:5.1f}s vs {store_time:5.1f}s "
+            f"(store peak {store_peak / 2**20:.0f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Multi-process stress test for the mock mode shared state.
+
+Starts several worker processes, each with its own MockDataStorage and
+AgentService (as uvicorn --workers would), on a throwaway copy of a small
+data set. Every worker concurrently:
+
+* raises complaints
+* blocks random cards
+* sets its own field on one hot card (a lost update would drop a field)
+* flips agent statuses
+
+After a barrier each worker reports what it sees, and the run checks that
+all workers agree with each other and with what was written.
+
+Usage:
+    python benchmarks/shared_state_stress.py [--workers 8] [--ops 500] [--no-shared]
+
+--no-shared runs the same workload with per-process state, to show the
+divergence the shared state fixes.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import orjson
+
+CARDS = 500
+AGENTS = 20
+HOT_CARD = "4000000000000000"
+
+
+def write_data_set(data_dir: str) -> None:
+    cards = [
+        {
+            "card_number": f"{4000000000000000 + i}",
+            "account_number": f"{100000000000 + i % 100}",
+            "card_type": "DEBIT",
+            "card_status": "ACTIVE",
+        }
+        for i in range(CARDS)
+    ]
+    # Complaints and disputes must not be empty, or the storage would generate them
+    complaints = [
+        {
+            "ticket_id": "COMPLAINT-SEED",
+            "account_number": "100000000000",
+            "subject": "seed",
+            "description": "seed",
+            "category": "OTHER",
+            "status": "OPEN",
+            "priority": "LOW",
+            "created_at": "2024-01-01T00:00:00",
+            "estimated_resolution_days": 1,
+        }
+    ]
+    agents = [
+        {"agent_id": f"AGENT{1000 + i}", "current_status": "Available", "is_available": True}
+        for i in range(AGENTS)
+    ]
+    for name, data in (("cards", cards), ("complaints", complaints), ("agents", agents)):
+        with open(os.path.join(data_dir, f"{name}.json"), "wb") as f:
+            f.write(orjson.dumps(data))
+
+
+def worker(index: int, args, data_dir: str, barrier, results) -> None:
+    from mock_data_storage import MockDataStorage
+    from services.agent_service import AgentService
+    from shared_state import SharedState
+
+    state = SharedState(os.path.join(data_dir, "state.db")) if args.shared else None
+    storage = MockDataStorage(data_dir, shared_state=state)
+    agents = AgentService(os.path.join(data_dir, "agents.json"), shared_state=state)
+    rng = random.Random(index)
+    cards = storage.get_index("cards", "card_number")
+
+    barrier.wait()
+    latencies = []
+    blocked = set()
+    start = time.perf_counter()
+    for i in range(args.ops):
+        op = i % 4
+        t0 = time.perf_counter()
+        if op == 0:
+            storage.add_complaint({
+                "account_number": "100000000000",
+                "subject": f"worker {index}",
+                "description": "stress",
+                "category": "CARD",
+            })
+        elif op == 1:
+            card = cards[f"{4000000000000000 + rng.randrange(1, CARDS)}"]
+            storage.update_record("cards", card, {"card_status": "BLOCKED"})
+            blocked.add(card["card_number"])
+        elif op == 2:
+            storage.update_record("cards", cards[HOT_CARD], {f"worker_{index}": i})
+        else:
+            agents.update_agent_status(f"AGENT{1000 + rng.randrange(AGENTS)}", rng.choice(["Available", "Busy"]))
+        # A read after every write, as a request handler would do
+        storage.get_card_by_last4(HOT_CARD[-4:])
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    barrier.wait()
+    # Pick up whatever the other workers wrote last
+    if state:
+        state.sync()
+    hot = storage.get_index("cards", "card_number")[HOT_CARD]
+    latencies.sort()
+    results[index] = {
+        "elapsed": elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p99": latencies[int(len(latencies) * 0.99)],
+        "blocked_written": sorted(blocked),
+        "complaints": len(storage.complaints),
+        "hot_fields": sorted(k for k in hot if k.startswith("worker_")),
+        "blocked_seen": sorted(c["card_number"] for c in storage.cards if c["card_status"] == "BLOCKED"),
+        "agents": [(a["agent_id"], a["current_status"]) for a in agents.agents],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=500, help="operations per worker")
+    parser.add_argument("--no-shared", dest="shared", action="store_false", help="per-process state (old behaviour)")
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix="bankwise-shared-state-")
+    try:
+        write_data_set(data_dir)
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(args.workers)
+        results = ctx.Manager().dict()
+        procs = [
+            ctx.Process(target=worker, args=(i, args, data_dir, barrier, results))
+            for i in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        if any(p.exitcode for p in procs):
+            print("A worker failed")
+            return 1
+
+        results = [results[i] for i in range(args.workers)]
+        total_ops = args.workers * args.ops
+        wall = max(r["elapsed"] for r in results)
+        print(f"{'shared' if args.shared else 'per-process'} state: {args.workers} workers x {args.ops} ops")
+        print(f"throughput {total_ops / wall:,.0f} ops/s | "
+              f"p50 {sorted(r['p50'] for r in results)[len(results) // 2] * 1e3:.2f} ms | "
+              f"worst p99 {max(r['p99'] for r in results) * 1e3:.2f} ms")
+
+        expected_complaints = 1 + sum(1 for i in range(args.ops) if i % 4 == 0) * args.workers
+        expected_hot = sorted(f"worker_{i}" for i in range(args.workers))
+        expected_blocked = sorted(set().union(*(r["blocked_written"] for r in results)))
+        checks = {
+            "every worker sees every complaint": all(r["complaints"] == expected_complaints for r in results),
+            "no lost updates on the hot card": all(r["hot_fields"] == expected_hot for r in results),
+            "every worker sees every blocked card": all(r["blocked_seen"] == expected_blocked for r in results),
+            "workers agree on agent statuses": len({tuple(r["agents"]) for r in results}) == 1,
+        }
+        for name, ok in checks.items():
+            print(f"  [{'ok' if ok else 'FAIL'}] {name}")
+        return 0 if all(checks.values()) else 1
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare end-to-end latency of the customer snapshot endpoint against the
+sequential balance / KYC / transactions / loan calls it replaces.
+
+Runs the app in-process over an ASGI transport, so it measures the full
+request path (auth, validation, storage, serialisation) without network noise.
+Set DATABASE_URL to benchmark against Postgres instead of mock data.
+
+Usage:
+    python benchmarks/snapshot_latency.py [iterations]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_TOKEN", "benchmark-token")
+
+import httpx
+
+from main import app
+from database import db_manager
+from mock_data_storage import mock_storage
+
+HEADERS = {"x-api-token": os.environ["API_TOKEN"]}
+
+
+async def sequential_calls(client, account_number, loan_id):
+    """The calls a voice turn used to make one after another"""
+    await client.post("/api/account/balance", json={"account_number": account_number}, headers=HEADERS)
+    await client.post("/api/kyc/status", json={"account_number": account_number})
+    await client.post("/api/account/transactions", json={"account_number": account_number}, headers=HEADERS)
+    if loan_id:
+        await client.post("/api/loan/status", json={"loan_id": loan_id})
+
+
+async def snapshot_call(client, account_number, loan_id):
+    """The single composite call"""
+    response = await client.post(
+        "/api/customer/snapshot", json={"account_number": account_number}, headers=HEADERS
+    )
+    response.raise_for_status()
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{name:<12} mean {statistics.mean(samples):7.2f} ms | "
+        f"p50 {statistics.median(samples):7.2f} ms | p95 {p95:7.2f} ms"
+    )
+
+
+async def main(iterations: int):
+    await db_manager.initialize()
+    loans_by_account = {loan["account_number"]: loan["loan_id"] for loan in mock_storage.loans}
+    accounts = [a["account_number"] for a in mock_storage.accounts]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        results = {}
+        for name, scenario in (("sequential", sequential_calls), ("snapshot", snapshot_call)):
+            samples = []
+            for i in range(iterations):
+                account_number = accounts[i % len(accounts)]
+                start = time.perf_counter()
+                await scenario(client, account_number, loans_by_account.get(account_number))
+                samples.append((time.perf_counter() - start) * 1000)
+            results[name] = samples
+
+    print(f"Source: {'database' if db_manager.initialized else 'mock'}, iterations: {iterations}")
+    for name, samples in results.items():
+        report(name, samples)
+    speedup = statistics.mean(results["sequential"]) / statistics.mean(results["snapshot"])
+    print(f"Snapshot is {speedup:.1f}x faster than the sequential calls")
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    import logging
+
+    logging.disable(logging.INFO)
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,181 @@
+"""
+In-process change feed: a pub/sub bus for row-level changes.
+
+The write paths publish every change they make: new complaints and disputes
+(ticket writer and mock store), card blocks, agent status changes,
+escalations, and the changes other workers made (see `SharedState.sync`).
+Publishing also bumps the collection's generation (generations.py), so
+caches keyed on generations see the change too.
+
+Each event is encoded once, as a Server-Sent Events frame, and handed to the
+subscribers' queues on their event loop. A subscriber that falls
+`queue_size` events behind has its backlog replaced by a single `reset`
+event, which tells the client to refetch instead of holding up the
+publishers. The last `history` events are kept so a reconnecting client
+can resume from its `Last-Event-ID`.
+
+Event ids are `<stream>-<n>`. The stream is random per process, so a
+client that reconnects to another worker (or after a restart) gets a reset
+rather than a wrong replay.
+"""
+
+import asyncio
+import secrets
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+import logging
+
+import orjson
+
+from generations import generations
+
+logger = logging.getLogger(__name__)
+
+# Ops carried by events
+OP_INSERT = "insert"
+OP_UPDATE = "update"
+OP_UPSERT = "upsert"
+OP_RESET = "reset"
+
+
+class ChangeEvent:
+    """A published change and its SSE frame"""
+
+    __slots__ = ("seq", "collection", "frame")
+
+    def __init__(self, seq: int, collection: Optional[str], frame: bytes):
+        self.seq = seq
+        self.collection = collection
+        self.frame = frame
+
+
+class Subscription:
+    """One client's queue of events, optionally limited to some collections"""
+
+    def __init__(self, feed: "ChangeFeed", collections: Optional[Set[str]], queue_size: int):
+        self.feed = feed
+        self.collections = collections
+        self.queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.loop = asyncio.get_running_loop()
+
+    def wants(self, event: ChangeEvent) -> bool:
+        return event.collection is None or self.collections is None or event.collection in self.collections
+
+    def offer(self, event: ChangeEvent) -> None:
+        """Queue an event; safe to call from any thread"""
+        if self.wants(event):
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: ChangeEvent) -> None:
+        if self.queue.full():
+            # Too slow to keep up: drop the backlog, the client has to refetch anyway
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = self.feed.reset_event(event.seq)
+        self.queue.put_nowait(event)
+
+    async def next(self, timeout: float) -> Optional[ChangeEvent]:
+        """The next event, or None when none arrives within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeFeed:
+    """Fans out published changes to the subscribed clients"""
+
+    def __init__(self, history: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.stream = secrets.token_hex(4)
+        self._history: Deque[ChangeEvent] = deque(maxlen=history)
+        # Sequence number of the last event that fell out of the history
+        self._evicted = 0
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def _frame(self, seq: int, event: Dict[str, Any]) -> bytes:
+        # Decimal and other non-JSON database values are sent as strings
+        data = orjson.dumps(event, default=str)
+        return b"id: %s-%d\nevent: change\ndata: %s\n\n" % (self.stream.encode(), seq, data)
+
+    def reset_event(self, seq: int) -> ChangeEvent:
+        """Tells a client that it missed events and should refetch"""
+        event = {"op": OP_RESET, "timestamp": datetime.now().isoformat()}
+        return ChangeEvent(seq, None, self._frame(seq, event))
+
+    def publish(self, collection: str, op: str, key: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """Publish a change to a record and bump its collection's generation
+
+        `data` is the whole record for inserts and upserts, and only the
+        changed fields for updates. Returns the event's sequence number.
+        """
+        with self._lock:
+            # Under the lock so the history stays in sequence order
+            seq = generations.bump(collection)
+            event = ChangeEvent(
+                seq,
+                collection,
+                self._frame(
+                    seq,
+                    {
+                        "collection": collection,
+                        "op": op,
+                        "key": key,
+                        "data": data,
+                        "timestamp": datetime.now().isoformat(),
+                    },
+                ),
+            )
+            if len(self._history) == self._history.maxlen:
+                self._evicted = self._history[0].seq
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.offer(event)
+            except RuntimeError:
+                logger.debug("Dropping change feed subscriber with a closed event loop")
+                self.unsubscribe(subscription)
+        return seq
+
+    def subscribe(self, collections: Optional[Iterable[str]] = None, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a client; must be called on the event loop that will read it
+
+        With `last_event_id`, the events published since then are queued
+        first, or a reset when they are no longer (or never were) in the
+        history of this stream.
+        """
+        subscription = Subscription(self, set(collections) if collections else None, self.queue_size)
+        with self._lock:
+            if last_event_id:
+                for event in self._replay(last_event_id):
+                    if subscription.wants(event):
+                        subscription._put(event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _replay(self, last_event_id: str) -> List[ChangeEvent]:
+        stream, _, seq = last_event_id.rpartition("-")
+        last_seq = self._history[-1].seq if self._history else 0
+        if stream != self.stream or not seq.isdigit():
+            return [self.reset_event(last_seq)]
+        if int(seq) < self._evicted:
+            # Some of the missed events are no longer in the history
+            return [self.reset_event(last_seq)]
+        return [event for event in self._history if event.seq > int(seq)]
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+# Global change feed instance
+change_feed = ChangeFeed()
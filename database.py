@@ -2,12 +2,19 @@ import asyncio
 import asyncpg
 from typing import List, Optional, Dict, Any
 from contextlib import asynccontextmanager
+from urllib.parse import urlsplit, urlunsplit
+import math
 import os
+import random
+import time
 from dotenv import load_dotenv
 import logging
 
 from datetime import datetime
 
+from metrics import add_phase, timed
+from rate_limiter import rate_limiter
+
 
 def parse_datetime(date_str):
     """Parse a datetime string into a datetime object, handling various formats."""
@@ -26,12 +33,75 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+POOLER_TRANSACTION = "transaction"
+POOLER_SESSION = "session"
+POOLER_NONE = "none"
+
+
+def detect_pooler(db_url: str) -> str:
+    """Pooling mode of a URL: Neon `-pooler` hosts and PgBouncer's port 6432 pool per transaction"""
+    parts = urlsplit(db_url)
+    if "-pooler" in (parts.hostname or "") or parts.port == 6432:
+        return POOLER_TRANSACTION
+    return POOLER_NONE
+
+
+def direct_url_for(db_url: str) -> str:
+    """The direct (unpooled) URL for a Neon pooled URL: the same host without `-pooler`"""
+    parts = urlsplit(db_url)
+    if "-pooler" not in (parts.hostname or ""):
+        return db_url
+    userinfo, at, host = parts.netloc.rpartition("@")
+    return urlunsplit(parts._replace(netloc=userinfo + at + host.replace("-pooler", "", 1)))
+
+
+class PooledConnection(asyncpg.Connection):
+    """A pool connection that knows when it is due to be retired (see DB_MAX_LIFETIME)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retire_at = math.inf
+
 
 class DatabaseManager:
-    """Database manager for Neon DB integration"""
+    """Database manager for Neon DB integration
+
+    Connection settings come from the environment:
+
+    * DATABASE_URL: the URL the request pool uses, usually Neon's `-pooler`
+      endpoint (PgBouncer in transaction mode)
+    * DATABASE_DIRECT_URL: an unpooled URL for schema setup and data
+      loading, which rely on session state (`SET session_replication_role`)
+      that a transaction pooler would hand to other clients. Defaults to
+      DATABASE_URL with `-pooler` removed from a Neon host
+    * DB_POOLER: `transaction`, `session` or `none`; detected from the
+      URL by default. Behind a transaction pooler, consecutive statements
+      may run on different server connections, so asyncpg's named prepared
+      statements are not reused: the statement cache is off
+      (DB_STATEMENT_CACHE_SIZE=0) unless set explicitly, e.g. for PgBouncer
+      1.21+ with `max_prepared_statements`
+    * DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE / DB_COMMAND_TIMEOUT: pool sizing
+    * DB_MAX_LIFETIME: seconds after which a connection is closed on
+      release (jittered by 10% so they do not all reconnect at once), so
+      connections follow pooler restarts and compute moves; 0 disables it.
+      DB_MAX_IDLE closes connections idle for that long
+    * DB_WARMUP: run a round trip on every pool connection at startup,
+      so the first requests do not pay for a cold compute or TLS setup
+    """
 
     def __init__(self):
         self.db_url = os.getenv("DATABASE_URL")
+        self.pooler = os.getenv("DB_POOLER") or (detect_pooler(self.db_url) if self.db_url else POOLER_NONE)
+        self.direct_url = os.getenv("DATABASE_DIRECT_URL") or (direct_url_for(self.db_url) if self.db_url else None)
+        cache_size = os.getenv("DB_STATEMENT_CACHE_SIZE")
+        # asyncpg's default is 100
+        self.statement_cache_size = int(cache_size) if cache_size else (0 if self.pooler == POOLER_TRANSACTION else 100)
+        self.min_size = int(os.getenv("DB_POOL_MIN_SIZE", "5"))
+        self.max_size = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+        self.command_timeout = float(os.getenv("DB_COMMAND_TIMEOUT", "60"))
+        self.max_lifetime = float(os.getenv("DB_MAX_LIFETIME", "1800"))
+        self.max_idle = float(os.getenv("DB_MAX_IDLE", "300"))
+        self.warmup = os.getenv("DB_WARMUP", "true").lower() == "true"
         self.pool = None
         self.initialized = False
 
@@ -44,13 +114,12 @@ class DatabaseManager:
                 )
                 return False
 
-            # Create connection pool
-            self.pool = await asyncpg.create_pool(
-                self.db_url, min_size=5, max_size=20, command_timeout=60
-            )
+            if self.pooler == POOLER_TRANSACTION and self.direct_url == self.db_url:
+                logger.warning("DATABASE_DIRECT_URL not set: schema setup will go through the transaction pooler")
 
-            # Check if tables exist
-            async with self.pool.acquire() as conn:
+            # Schema setup runs on its own direct connection, before the pool opens
+            conn = await asyncpg.connect(self.direct_url, command_timeout=self.command_timeout)
+            try:
                 tables_exist = await conn.fetchval(
                     """
                     SELECT EXISTS (
@@ -74,16 +143,62 @@ class DatabaseManager:
                     logger.info(
                         "BankWise AI Banking Support API - Database tables already exist"
                     )
+
+                    await self._migrate_schema(conn)
                     
                     # Check if we should populate data
                     await self._check_and_populate_data(conn)
+            finally:
+                await conn.close()
 
+            await self._create_pool()
             return True
 
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
+            self.initialized = False
             return False
 
+    async def _create_pool(self):
+        """Open the request pool with settings that suit the pooler in front of the database"""
+        self.pool = await asyncpg.create_pool(
+            self.db_url,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=self.command_timeout,
+            statement_cache_size=self.statement_cache_size,
+            max_inactive_connection_lifetime=self.max_idle,
+            connection_class=PooledConnection,
+            init=self._init_connection,
+        )
+        logger.info(
+            "Database pool open: %s-%s connections, pooler %s, statement cache %s, max lifetime %.0fs",
+            self.min_size, self.max_size, self.pooler, self.statement_cache_size, self.max_lifetime
+        )
+        if self.warmup:
+            await self._warm_up()
+
+    async def _init_connection(self, conn):
+        if self.max_lifetime > 0:
+            conn.retire_at = time.monotonic() + self.max_lifetime * random.uniform(0.9, 1.0)
+
+    async def _warm_up(self):
+        """One round trip on each of the pool's minimum connections"""
+        start = time.perf_counter()
+
+        async def ping():
+            async with self.pool.acquire() as conn:
+                await conn.fetchval("SELECT 1")
+
+        results = await asyncio.gather(*(ping() for _ in range(self.min_size)), return_exceptions=True)
+        failed = sum(1 for result in results if isinstance(result, Exception))
+        logger.info(
+            "Warmed up %s database connections in %.0fms%s",
+            len(results) - failed,
+            (time.perf_counter() - start) * 1000,
+            f", {failed} failed" if failed else "",
+        )
+
     async def _create_tables(self, conn):
         """Create all necessary tables"""
 
@@ -127,10 +242,14 @@ class DatabaseManager:
                 international_usage VARCHAR(20) NOT NULL,
                 contactless VARCHAR(3) NOT NULL,
                 issue_date TIMESTAMP NOT NULL,
-                customer_name VARCHAR(100) NOT NULL
+                customer_name VARCHAR(100) NOT NULL,
+                last4 VARCHAR(4) GENERATED ALWAYS AS (RIGHT(card_number, 4)) STORED
             )
         """
         )
+        await conn.execute(
+            "CREATE INDEX idx_cards_last4_account ON cards (last4, account_number)"
+        )
 
         # Transactions table
         await conn.execute(
@@ -217,7 +336,7 @@ class DatabaseManager:
             """
             CREATE TABLE complaints (
                 id SERIAL PRIMARY KEY,
-                ticket_id VARCHAR(20) UNIQUE NOT NULL,
+                ticket_id VARCHAR(32) UNIQUE NOT NULL,
                 account_number VARCHAR(20) REFERENCES accounts(account_number),
                 subject VARCHAR(200) NOT NULL,
                 description TEXT NOT NULL,
@@ -240,7 +359,7 @@ class DatabaseManager:
             """
             CREATE TABLE disputes (
                 id SERIAL PRIMARY KEY,
-                ticket_id VARCHAR(20) UNIQUE NOT NULL,
+                ticket_id VARCHAR(32) UNIQUE NOT NULL,
                 account_number VARCHAR(20) REFERENCES accounts(account_number),
                 transaction_id VARCHAR(20) NOT NULL,
                 amount DECIMAL(15,2) NOT NULL,
@@ -303,8 +422,60 @@ class DatabaseManager:
         """
         )
 
+        await self._create_outbox_table(conn)
+
         logger.info("BankWise AI Banking Support API - All tables created successfully")
 
+    async def _create_outbox_table(self, conn):
+        """Notification outbox, written in the same transaction as the ticket it announces"""
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                id BIGSERIAL PRIMARY KEY,
+                aggregate_type VARCHAR(20) NOT NULL,
+                aggregate_id VARCHAR(32) NOT NULL,
+                event_type VARCHAR(50) NOT NULL,
+                payload JSONB NOT NULL,
+                created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                processed_at TIMESTAMP,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                failed_at TIMESTAMP
+            )
+        """
+        )
+        # Outbox tables created before retries were scheduled
+        await conn.execute(
+            "ALTER TABLE notification_outbox ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW()"
+        )
+        await conn.execute("ALTER TABLE notification_outbox ADD COLUMN IF NOT EXISTS failed_at TIMESTAMP")
+        await conn.execute("DROP INDEX IF EXISTS idx_notification_outbox_pending")
+        await conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+            ON notification_outbox (next_attempt_at) WHERE processed_at IS NULL AND failed_at IS NULL
+        """
+        )
+
+    async def _migrate_schema(self, conn):
+        """Bring tables created by older versions up to date"""
+        try:
+            await conn.execute(
+                """
+                ALTER TABLE cards ADD COLUMN IF NOT EXISTS last4 VARCHAR(4)
+                GENERATED ALWAYS AS (RIGHT(card_number, 4)) STORED
+            """
+            )
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cards_last4_account ON cards (last4, account_number)"
+            )
+            # Allocated ticket IDs are longer than the original random ones
+            await conn.execute("ALTER TABLE complaints ALTER COLUMN ticket_id TYPE VARCHAR(32)")
+            await conn.execute("ALTER TABLE disputes ALTER COLUMN ticket_id TYPE VARCHAR(32)")
+            await self._create_outbox_table(conn)
+        except Exception as e:
+            logger.error(f"Error migrating database schema: {e}")
+
     async def _check_and_populate_data(self, conn):
         """Check if tables are empty and populate if needed or if override is set"""
         try:
@@ -343,7 +514,7 @@ class DatabaseManager:
                     empty_tables.append(table_name)
 
             if empty_tables:
-                logger.info(f"Found empty tables: {empty_tables}. Populating with data...")
+                logger.info("Found empty tables: %s. Populating with data...", empty_tables)
                 await self._populate_initial_data(conn)
             else:
                 logger.info("All tables contain data. Skipping population.")
@@ -358,12 +529,12 @@ class DatabaseManager:
             await conn.execute("SET session_replication_role = replica;")
             
             # Clear tables in reverse order to handle foreign key constraints
-            tables = ["cheques", "fd_rates", "loans", "disputes", "complaints", "atms", "branches", "transactions", "cards", "accounts"]
+            tables = ["notification_outbox", "cheques", "fd_rates", "loans", "disputes", "complaints", "atms", "branches", "transactions", "cards", "accounts"]
             
             for table in tables:
                 try:
                     await conn.execute(f"TRUNCATE TABLE {table} RESTART IDENTITY CASCADE")
-                    logger.info(f"Cleared table: {table}")
+                    logger.info("Cleared table: %s", table)
                 except Exception as e:
                     logger.warning(f"Could not clear table {table}: {e}")
             
@@ -452,9 +623,9 @@ class DatabaseManager:
                     cards_skipped += 1
             else:
                 cards_skipped += 1
-                logger.debug(f"Skipped card {card['card_number']} - invalid account number {card['account_number']}")
+                logger.debug("Skipped card %s - invalid account number %s", card['card_number'], card['account_number'])
 
-        logger.info(f"Inserted {cards_inserted} cards, skipped {cards_skipped} cards with invalid references")
+        logger.info("Inserted %s cards, skipped %s cards with invalid references", cards_inserted, cards_skipped)
 
         # Insert transactions (limit to prevent excessive data) with validation
         sample_transactions = mock_storage.transactions[:5000]  # Limit to 5000 for initial load
@@ -489,9 +660,12 @@ class DatabaseManager:
                     transactions_skipped += 1
             else:
                 transactions_skipped += 1
-                logger.debug(f"Skipped transaction {tx['id']} - invalid account number {tx['account_number']}")
+                logger.debug("Skipped transaction %s - invalid account number %s", tx['id'], tx['account_number'])
 
-        logger.info(f"Inserted {transactions_inserted} transactions, skipped {transactions_skipped} transactions with invalid references")
+        logger.info(
+            "Inserted %s transactions, skipped %s transactions with invalid references",
+            transactions_inserted, transactions_skipped,
+        )
 
         # Insert branches (single facilities field)
         for branch in mock_storage.branches:
@@ -576,9 +750,15 @@ class DatabaseManager:
                     complaints_skipped += 1
             else:
                 complaints_skipped += 1
-                logger.debug(f"Skipped complaint {complaint['ticket_id']} - invalid account number {complaint.get('account_number')}")
+                logger.debug(
+                    "Skipped complaint %s - invalid account number %s",
+                    complaint['ticket_id'], complaint.get('account_number'),
+                )
 
-        logger.info(f"Inserted {complaints_inserted} complaints, skipped {complaints_skipped} complaints with invalid references")
+        logger.info(
+            "Inserted %s complaints, skipped %s complaints with invalid references",
+            complaints_inserted, complaints_skipped,
+        )
 
         # Insert disputes with validation
         disputes_inserted = 0
@@ -618,9 +798,15 @@ class DatabaseManager:
                     disputes_skipped += 1
             else:
                 disputes_skipped += 1
-                logger.debug(f"Skipped dispute {dispute['ticket_id']} - invalid account number {dispute.get('account_number')}")
+                logger.debug(
+                    "Skipped dispute %s - invalid account number %s",
+                    dispute['ticket_id'], dispute.get('account_number'),
+                )
 
-        logger.info(f"Inserted {disputes_inserted} disputes, skipped {disputes_skipped} disputes with invalid references")
+        logger.info(
+            "Inserted %s disputes, skipped %s disputes with invalid references",
+            disputes_inserted, disputes_skipped,
+        )
 
         # Insert loans with validation
         loans_inserted = 0
@@ -661,9 +847,9 @@ class DatabaseManager:
                     loans_skipped += 1
             else:
                 loans_skipped += 1
-                logger.debug(f"Skipped loan {loan['loan_id']} - invalid account number {loan.get('account_number')}")
+                logger.debug("Skipped loan %s - invalid account number %s", loan['loan_id'], loan.get('account_number'))
 
-        logger.info(f"Inserted {loans_inserted} loans, skipped {loans_skipped} loans with invalid references")
+        logger.info("Inserted %s loans, skipped %s loans with invalid references", loans_inserted, loans_skipped)
 
         # Insert FD rates
         for rate in mock_storage.fd_rates:
@@ -711,17 +897,33 @@ class DatabaseManager:
                     cheques_skipped += 1
             else:
                 cheques_skipped += 1
-                logger.debug(f"Skipped cheque {cheque['cheque_number']} - invalid account number {cheque['account_number']}")
+                logger.debug(
+                    "Skipped cheque %s - invalid account number %s",
+                    cheque['cheque_number'], cheque['account_number'],
+                )
 
-        logger.info(f"Inserted {cheques_inserted} cheques, skipped {cheques_skipped} cheques with invalid references")
+        logger.info(
+            "Inserted %s cheques, skipped %s cheques with invalid references",
+            cheques_inserted, cheques_skipped,
+        )
 
         logger.info(
-            f"BankWise AI Banking Support API - Database populated with {len(valid_account_numbers)} accounts, "
-            f"{cards_inserted} cards, {transactions_inserted} transactions (limited), "
-            f"{len(mock_storage.branches)} branches, {len(mock_storage.atms)} ATMs, "
-            f"{complaints_inserted} complaints, {disputes_inserted} disputes, "
-            f"{loans_inserted} loans, {len(mock_storage.fd_rates)} FD rates, "
-            f"and {cheques_inserted} cheques"
+            "BankWise AI Banking Support API - Database populated with %s accounts, "
+            "%s cards, %s transactions (limited), "
+            "%s branches, %s ATMs, "
+            "%s complaints, %s disputes, "
+            "%s loans, %s FD rates, "
+            "and %s cheques",
+            len(valid_account_numbers),
+            cards_inserted,
+            transactions_inserted,
+            len(mock_storage.branches),
+            len(mock_storage.atms),
+            complaints_inserted,
+            disputes_inserted,
+            loans_inserted,
+            len(mock_storage.fd_rates),
+            cheques_inserted,
         )
 
     @asynccontextmanager
@@ -731,12 +933,36 @@ class DatabaseManager:
             yield None
             return
 
+        start = time.perf_counter()
+        # Pool wait drives load shedding, see rate_limiter.py
+        waiter = rate_limiter.pool.started()
         try:
-            async with self.pool.acquire() as conn:
-                yield conn
+            conn = await self.pool.acquire()
         except Exception as e:
             logger.error(f"Database connection error: {e}")
+            conn = None
+        finally:
+            rate_limiter.pool.abandoned(waiter)
+        if conn is None:
             yield None
+            return
+
+        acquired = time.perf_counter()
+        add_phase("db_acquire", acquired - start)
+        rate_limiter.pool.acquired(waiter, acquired - start)
+        try:
+            # Errors raised by the caller's queries propagate unchanged
+            with timed("db_query"):
+                yield conn
+        finally:
+            try:
+                if time.monotonic() >= conn.retire_at and not conn.is_in_transaction():
+                    # Closing it removes it from the pool, which opens a fresh one as needed
+                    await conn.close(timeout=5)
+            except Exception as e:
+                logger.warning("Error retiring database connection: %s", e)
+            finally:
+                await self.pool.release(conn)
 
     async def close(self):
         """Close database connection pool"""
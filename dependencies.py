@@ -1,14 +1,48 @@
-from fastapi import Header, HTTPException
-import os
+from fastapi import Depends, Header, HTTPException, Request
+from typing import Callable, Optional
+
+from rate_limiter import rate_limiter, ROUTE_SMS
+
+from services.auth_service import Credential, auth_service, SCOPE_READ, SCOPE_WRITE
 
 
 # API Token Authentication
-def verify_api_token(x_api_token: str = Header(...)):
-    """Verify the API token from the request header"""
-    expected_token = os.getenv("API_TOKEN")
-    print("Expected token:", expected_token)
-    if not expected_token:
+async def verify_api_token(x_api_token: Optional[str] = Header(None)) -> Credential:
+    """Verify the API token from the request header and return its credential
+
+    Async so it runs on the event loop instead of a threadpool worker. FastAPI
+    caches it per request, so several scope checks share one verification.
+    """
+    if not auth_service.configured:
         raise HTTPException(status_code=500, detail="API token not configured")
-    if x_api_token != expected_token:
+    credential = auth_service.verify(x_api_token)
+    if credential is None:
         raise HTTPException(status_code=401, detail="Invalid or missing API token")
-    return True
+    return credential
+
+
+def require_scope(scope: str, route_class: Optional[str] = None) -> Callable:
+    """Dependency that requires a valid token with the given scope, within its rate limits
+
+    Used as a router-level dependency, e.g.
+    `APIRouter(..., dependencies=[Depends(require_scope(SCOPE_READ))])`.
+    `route_class` picks the rate limit budgets (the scope by default); a
+    route's most specific dependency decides, see rate_limiter.py.
+    """
+
+    async def check_scope(request: Request, credential: Credential = Depends(verify_api_token)) -> Credential:
+        if not credential.allows(scope):
+            raise HTTPException(status_code=403, detail=f"API token lacks the '{scope}' scope")
+        # The credential's name, not the token, identifies the caller from here on
+        request.state.caller = credential.name
+        await rate_limiter.admit(request, credential.name)
+        return credential
+
+    check_scope.route_class = route_class or scope
+    return check_scope
+
+
+require_read = require_scope(SCOPE_READ)
+require_write = require_scope(SCOPE_WRITE)
+# Endpoints that send text messages: write scope, with the SMS budgets
+require_sms = require_scope(SCOPE_WRITE, route_class=ROUTE_SMS)
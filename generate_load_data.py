@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Scalable synthetic data generator for load and capacity testing.
+
+Generates N accounts with cards, transactions, cheques, loans, complaints and
+disputes, and writes them straight to the columnar snapshot format (see
+mock_data_snapshot.py) that MockDataStorage memory-maps on startup.
+
+* names, cities and free text come from small pools sampled once with Faker;
+  every per-row field is a vectorised NumPy draw
+* accounts are split into fixed-size shards generated in parallel processes;
+  each shard has its own seeded generator, so a given --seed and --as-of
+  always produce the same data regardless of --workers
+* every card, cheque, loan, complaint and dispute points at a generated
+  account, and every dispute at a generated debit transaction; transaction
+  balances are running balances that end at the account balance
+
+Usage:
+    python generate_load_data.py --accounts 100000 --transactions-per-account 50
+    python generate_load_data.py --accounts 1000 --seed 7 --json
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from mock_data_snapshot import write_columns, snapshot_path, convert_to_json
+
+SHARD_SIZE = 10_000
+DAY_US = 86_400 * 1_000_000
+
+CITIES = [
+    "Mumbai", "Delhi", "Bangalore", "Hyderabad", "Chennai", "Kolkata", "Pune",
+    "Ahmedabad", "Jaipur", "Lucknow", "Surat", "Kochi", "Indore", "Bhopal",
+    "Nagpur", "Patna", "Chandigarh", "Coimbatore", "Vadodara", "Visakhapatnam",
+]
+MERCHANTS = [
+    "Amazon", "Flipkart", "Walmart", "Target", "Starbucks", "McDonalds", "Uber",
+    "Swiggy", "Zomato", "Myntra", "BigBasket", "Reliance Digital", "DMart", "Ola",
+]
+
+# Transaction type -> (probability, lognormal mean, lognormal sigma, min, max, is debit)
+TRANSACTION_TYPES = {
+    "PURCHASE": (0.40, 6.5, 1.0, 50, 10000, True),
+    "TRANSFER": (0.20, 8.0, 1.1, 100, 50000, True),
+    "WITHDRAWAL": (0.15, 7.8, 0.8, 100, 20000, True),
+    "DEPOSIT": (0.10, 10.5, 0.6, 10000, 100000, False),
+    "CASHBACK": (0.10, 4.5, 1.0, 10, 1000, False),
+    "INTEREST": (0.05, 5.0, 1.0, 10, 1000, False),
+}
+
+# Collection -> columns holding JSON text rather than plain strings
+JSON_COLUMNS = {"accounts": {"linked_cards", "mobile_numbers"}}
+
+Columns = Dict[str, np.ndarray]
+Shard = Dict[str, Tuple[Columns, Columns]]
+
+
+def build_pools(seed: int, size: int = 5000) -> Dict[str, np.ndarray]:
+    """Sample names and free text once; rows then draw from these pools"""
+    from faker import Faker
+
+    fake = Faker("en_IN")
+    fake.seed_instance(seed)
+    return {
+        "names": np.array([fake.name() for _ in range(size)]),
+        "texts": np.array([fake.text(max_nb_chars=150) for _ in range(size // 5)]),
+        "sentences": np.array([fake.sentence() for _ in range(size // 5)]),
+    }
+
+
+def _pick(rng: np.random.Generator, options, size: int, p=None) -> np.ndarray:
+    return np.asarray(options)[rng.choice(len(options), size=size, p=p)]
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Zero-padded decimal strings of an integer array"""
+    return np.char.zfill(values.astype(np.int64).astype(str), width)
+
+
+def _prefixed(prefix: str, values: np.ndarray, width: int) -> np.ndarray:
+    return np.char.add(prefix, _digits(values, width))
+
+
+def _dates(as_of: np.datetime64, rng: np.random.Generator, size: int, min_days: int, max_days: int) -> np.ndarray:
+    """Random timestamps between max_days and min_days before as_of"""
+    offsets = rng.integers(min_days * DAY_US, max_days * DAY_US, size=size)
+    return as_of - offsets.astype("timedelta64[us]")
+
+
+def _transactions(rng, as_of, account_numbers, pools, per_account):
+    """Transactions per account, sorted by date, with running balances"""
+    counts = np.maximum(rng.poisson(per_account, size=len(account_numbers)), 1)
+    owner = np.repeat(np.arange(len(account_numbers)), counts)
+    total = len(owner)
+
+    names = list(TRANSACTION_TYPES)
+    params = np.array([TRANSACTION_TYPES[n][:5] for n in names], dtype=np.float64)
+    debit = np.array([TRANSACTION_TYPES[n][5] for n in names])
+    type_idx = rng.choice(len(names), size=total, p=params[:, 0])
+    amounts = np.round(
+        np.clip(
+            rng.lognormal(params[type_idx, 1], params[type_idx, 2]),
+            params[type_idx, 3],
+            params[type_idx, 4],
+        ),
+        2,
+    )
+    tx_types = np.asarray(names)[type_idx]
+    is_debit = debit[type_idx]
+
+    dates = _dates(as_of, rng, total, 1, 730)
+    dates = dates[np.lexsort((dates, owner))]
+
+    # Running balance per account: opening balance + cumulative signed amounts
+    signed = np.where(is_debit, -amounts, amounts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    running = np.cumsum(signed)
+    running -= np.repeat(running[starts] - signed[starts], counts)
+    lowest = np.minimum.reduceat(running, starts)
+    opening = np.round(rng.lognormal(10.5, 1.0, size=len(counts)) + np.maximum(0, -lowest), 2)
+    balance_after = np.round(np.repeat(opening, counts) + running, 2)
+    closing = balance_after[np.cumsum(counts) - 1]
+
+    purchase = tx_types == "PURCHASE"
+    merchant = _pick(rng, MERCHANTS, total)
+    description = np.where(
+        purchase,
+        np.char.add("Purchase at ", merchant),
+        np.where(
+            tx_types == "TRANSFER",
+            np.char.add("Transfer to ", _pick(rng, pools["names"], total)),
+            np.where(
+                tx_types == "DEPOSIT",
+                "Salary Credit",
+                np.where(tx_types == "WITHDRAWAL", "ATM Withdrawal", np.char.add(tx_types, " Credit")),
+            ),
+        ),
+    )
+
+    columns = {
+        "local_index": np.arange(total),
+        "account_number": account_numbers[owner],
+        "transaction_date": dates,
+        "description": description,
+        "amount": amounts,
+        "type": tx_types,
+        "balance_after": balance_after,
+        "status": _pick(rng, ["COMPLETED", "PENDING", "FAILED"], total, p=[0.97, 0.02, 0.01]),
+        "reference_id": _prefixed("REF", rng.integers(0, 10**8, size=total), 8),
+        "merchant_id": _prefixed("MER", rng.integers(0, 10**5, size=total), 5),
+        "location": _pick(rng, CITIES, total),
+    }
+    nulls = {"merchant_id": ~purchase, "location": ~purchase}
+    return columns, nulls, closing, is_debit
+
+
+def _generate_shard(task) -> Shard:
+    """Generate one shard of accounts and everything that references them"""
+    shard, start, count, per_account, seed, as_of_iso, pools = task
+    rng = np.random.default_rng([seed, shard])
+    as_of = np.datetime64(as_of_iso, "us")
+    index = np.arange(start, start + count, dtype=np.int64)
+    # Multiplying by a number coprime to 10**11 is a bijection, so numbers stay unique
+    account_numbers = np.char.add("5", _digits(index * 104_729 % 10**11, 11))
+    customer_names = _pick(rng, pools["names"], count)
+
+    # Cards: 1-3 per account, numbers derived from (account index, ordinal)
+    card_counts = rng.choice([1, 2, 3], size=count, p=[0.5, 0.35, 0.15])
+    card_owner = np.repeat(np.arange(count), card_counts)
+    card_ordinal = np.arange(len(card_owner)) - np.repeat(np.cumsum(card_counts) - card_counts, card_counts)
+    card_key = index[card_owner] * 4 + card_ordinal
+    card_type = _pick(rng, ["VISA", "MASTERCARD", "RUPAY"], len(card_owner), p=[0.45, 0.35, 0.2])
+    network_digit = np.where(card_type == "VISA", "4", np.where(card_type == "MASTERCARD", "5", "6"))
+    card_numbers = np.char.add(network_digit, _digits(card_key * 2_654_435_761 % 10**15, 15))
+    cards = (
+        {
+            "card_number": card_numbers,
+            "account_number": account_numbers[card_owner],
+            "card_type": card_type,
+            "card_network": _pick(rng, ["CREDIT", "DEBIT"], len(card_owner), p=[0.3, 0.7]),
+            "expiry_date": np.char.add(
+                np.char.add(rng.integers(1, 13, size=len(card_owner)).astype(str), "/"),
+                rng.integers(25, 31, size=len(card_owner)).astype(str),
+            ),
+            "cvv": rng.integers(100, 1000, size=len(card_owner)).astype(str),
+            "card_status": _pick(rng, ["ACTIVE", "BLOCKED", "EXPIRED", "LOST"], len(card_owner), p=[0.88, 0.05, 0.05, 0.02]),
+            "daily_limit": np.round(rng.uniform(50000, 500000, size=len(card_owner)), 2),
+            "monthly_limit": np.round(rng.uniform(200000, 2000000, size=len(card_owner)), 2),
+            "international_usage": _pick(rng, ["ALLOWED", "BLOCKED"], len(card_owner)),
+            "contactless": _pick(rng, ["YES", "NO"], len(card_owner), p=[0.8, 0.2]),
+            "issue_date": _dates(as_of, rng, len(card_owner), 30, 1095),
+            "customer_name": customer_names[card_owner],
+        },
+        {},
+    )
+
+    tx_columns, tx_nulls, balances, is_debit = _transactions(rng, as_of, account_numbers, pools, per_account)
+
+    # Account JSON lists: masked linked cards and 1-3 mobile numbers
+    last4 = np.ascontiguousarray(card_numbers.astype("<U16").view(np.uint32).reshape(-1, 16)[:, 12:])
+    masked = np.char.add("****", last4.view("<U4").ravel())
+    card_bounds = np.concatenate(([0], np.cumsum(card_counts)))
+    mobile_counts = rng.choice([1, 2, 3], size=count, p=[0.6, 0.3, 0.1])
+    mobiles = np.char.add("+91", rng.integers(7_000_000_000, 10_000_000_000, size=int(mobile_counts.sum())).astype(str))
+    mobile_bounds = np.concatenate(([0], np.cumsum(mobile_counts)))
+    masked_list = masked.tolist()
+    mobile_list = mobiles.tolist()
+    linked_cards = np.array([
+        '["' + '", "'.join(masked_list[card_bounds[i]:card_bounds[i + 1]]) + '"]' for i in range(count)
+    ])
+    mobile_numbers = np.array([
+        '["' + '", "'.join(mobile_list[mobile_bounds[i]:mobile_bounds[i + 1]]) + '"]' for i in range(count)
+    ])
+
+    accounts = (
+        {
+            "account_number": account_numbers,
+            "account_type": _pick(rng, ["Savings", "Current", "Salary"], count, p=[0.6, 0.25, 0.15]),
+            "balance": balances,
+            "currency": np.full(count, "INR"),
+            "customer_name": customer_names,
+            "customer_id": _prefixed("CUST", index, 8),
+            "branch_code": _prefixed("BRANCH", rng.integers(100, 1000, size=count), 3),
+            "ifsc_code": _prefixed("BARB", rng.integers(1000, 10000, size=count), 4),
+            "kyc_status": _pick(rng, ["VERIFIED", "PENDING", "UNDER_REVIEW"], count, p=[0.8, 0.15, 0.05]),
+            "kyc_level": _pick(rng, ["LEVEL_1", "LEVEL_2", "LEVEL_3"], count, p=[0.2, 0.3, 0.5]),
+            "last_updated": _dates(as_of, rng, count, 1, 365),
+            "account_status": _pick(rng, ["ACTIVE", "INACTIVE", "FROZEN"], count, p=[0.92, 0.06, 0.02]),
+            "linked_cards": linked_cards,
+            "mobile_numbers": mobile_numbers,
+        },
+        {},
+    )
+
+    # Cheques: Poisson(1) per account
+    cheque_owner = np.repeat(np.arange(count), rng.poisson(1.0, size=count))
+    n_cheques = len(cheque_owner)
+    cheque_status = _pick(rng, ["Cleared", "Pending", "Bounced", "Under Process"], n_cheques, p=[0.7, 0.15, 0.05, 0.1])
+    issue_date = _dates(as_of, rng, n_cheques, 6, 365)
+    cleared = cheque_status == "Cleared"
+    cheques = (
+        {
+            "account_number": account_numbers[cheque_owner],
+            "amount": np.round(rng.uniform(1000, 50000, size=n_cheques), 2),
+            "status": cheque_status,
+            "issue_date": issue_date,
+            "clearing_date": issue_date + rng.integers(1 * DAY_US, 5 * DAY_US, size=n_cheques).astype("timedelta64[us]"),
+            "payee_name": _pick(rng, pools["names"], n_cheques),
+        },
+        {"clearing_date": ~cleared},
+    )
+
+    # Loans: ~30% of accounts, EMI from the standard amortisation formula
+    loan_owner = np.flatnonzero(rng.random(count) < 0.3)
+    n_loans = len(loan_owner)
+    principal = np.round(np.clip(rng.lognormal(13.0, 1.0, size=n_loans), 50000, 10000000), 2)
+    rate = np.round(rng.uniform(7.5, 15.5, size=n_loans), 2)
+    tenure = rng.choice([12, 24, 36, 60, 84, 120, 180, 240, 360], size=n_loans)
+    monthly = rate / 1200
+    growth = (1 + monthly) ** tenure
+    emi = np.round(principal * monthly * growth / (growth - 1), 2)
+    paid = (rng.random(n_loans) * tenure).astype(np.int64)
+    disbursement = as_of - ((paid + 1) * 30 * DAY_US + rng.integers(0, 30 * DAY_US, size=n_loans)).astype("timedelta64[us]")
+    emi_start = disbursement + np.timedelta64(30 * DAY_US, "us")
+    has_collateral = rng.random(n_loans) < 0.7
+    has_insurance = rng.random(n_loans) < 0.6
+    loans = (
+        {
+            "account_number": account_numbers[loan_owner],
+            "loan_type": _pick(rng, ["HOME_LOAN", "PERSONAL_LOAN", "CAR_LOAN", "EDUCATION_LOAN", "GOLD_LOAN", "BUSINESS_LOAN"], n_loans),
+            "principal": principal,
+            "interest_rate": rate,
+            "tenure_months": tenure,
+            "emi_amount": emi,
+            "disbursement_date": disbursement,
+            "emi_start_date": emi_start,
+            "next_emi_date": emi_start + (paid * 30 * DAY_US).astype("timedelta64[us]"),
+            "total_emis": tenure,
+            "paid_emis": paid,
+            "remaining_tenure": tenure - paid,
+            "status": _pick(rng, ["DISBURSED", "ACTIVE", "COMPLETED", "DEFAULT", "CLOSED"], n_loans, p=[0.05, 0.8, 0.05, 0.03, 0.07]),
+            "collateral_details": _pick(rng, pools["texts"], n_loans),
+            "processing_fee": np.round(principal * rng.uniform(0.005, 0.02, size=n_loans), 2),
+            "insurance_details": _pick(rng, pools["sentences"], n_loans),
+        },
+        {"collateral_details": ~has_collateral, "insurance_details": ~has_insurance},
+    )
+
+    # Complaints: ~5% of accounts
+    complaint_owner = np.flatnonzero(rng.random(count) < 0.05)
+    n_complaints = len(complaint_owner)
+    categories = ["ACCOUNT", "CARD", "TRANSACTION", "ATM", "BRANCH", "LOAN", "FD", "NET_BANKING", "MOBILE_BANKING", "OTHER"]
+    complaint_status = _pick(rng, ["OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED", "ESCALATED"], n_complaints, p=[0.15, 0.15, 0.4, 0.25, 0.05])
+    complaint_resolved = np.isin(complaint_status, ["RESOLVED", "CLOSED"])
+    complaint_created = _dates(as_of, rng, n_complaints, 31, 365)
+    has_agent = rng.random(n_complaints) < 0.8
+    complaints = (
+        {
+            "account_number": account_numbers[complaint_owner],
+            "subject": np.char.add("Complaint regarding ", _pick(rng, categories, n_complaints)),
+            "description": _pick(rng, pools["texts"], n_complaints),
+            "category": _pick(rng, categories, n_complaints),
+            "status": complaint_status,
+            "priority": _pick(rng, ["LOW", "MEDIUM", "HIGH", "URGENT"], n_complaints, p=[0.3, 0.4, 0.2, 0.1]),
+            "created_at": complaint_created,
+            "resolved_at": complaint_created + rng.integers(DAY_US, 30 * DAY_US, size=n_complaints).astype("timedelta64[us]"),
+            "estimated_resolution_days": rng.integers(1, 16, size=n_complaints),
+            "assigned_agent": _prefixed("AGENT", rng.integers(100, 1000, size=n_complaints), 3),
+            "resolution_notes": _pick(rng, pools["sentences"], n_complaints),
+            "customer_satisfaction": rng.integers(1, 6, size=n_complaints),
+        },
+        {
+            "resolved_at": ~complaint_resolved,
+            "assigned_agent": ~has_agent,
+            "resolution_notes": ~complaint_resolved,
+            "customer_satisfaction": ~complaint_resolved,
+        },
+    )
+
+    # Disputes: ~0.5% of debit transactions
+    disputed = np.flatnonzero(is_debit & (rng.random(len(is_debit)) < 0.005))
+    n_disputes = len(disputed)
+    dispute_status = _pick(rng, ["OPEN", "UNDER_REVIEW", "APPROVED", "REJECTED", "RESOLVED"], n_disputes, p=[0.2, 0.2, 0.25, 0.15, 0.2])
+    dispute_resolved = np.isin(dispute_status, ["APPROVED", "REJECTED", "RESOLVED"])
+    dispute_created = np.minimum(
+        tx_columns["transaction_date"][disputed]
+        + rng.integers(DAY_US, 10 * DAY_US, size=n_disputes).astype("timedelta64[us]"),
+        as_of,
+    )
+    has_officer = rng.random(n_disputes) < 0.7
+    disputes = (
+        {
+            "account_number": tx_columns["account_number"][disputed],
+            "transaction_index": disputed,
+            "amount": tx_columns["amount"][disputed],
+            "transaction_date": tx_columns["transaction_date"][disputed],
+            "dispute_type": _pick(rng, ["FRAUD", "UNAUTHORIZED", "BILLING_ERROR", "SERVICE_CHARGE", "OTHER"], n_disputes),
+            "reason": _pick(rng, pools["sentences"], n_disputes),
+            "description": _pick(rng, pools["texts"], n_disputes),
+            "status": dispute_status,
+            "created_at": dispute_created,
+            "resolved_at": dispute_created + rng.integers(3 * DAY_US, 45 * DAY_US, size=n_disputes).astype("timedelta64[us]"),
+            "estimated_resolution_days": rng.integers(5, 31, size=n_disputes),
+            "assigned_officer": _prefixed("OFFICER", rng.integers(100, 1000, size=n_disputes), 3),
+            "resolution_notes": _pick(rng, pools["sentences"], n_disputes),
+            "evidence_submitted": _pick(rng, ["YES", "NO"], n_disputes),
+            "customer_contacted": _pick(rng, ["YES", "NO"], n_disputes),
+        },
+        {
+            "resolved_at": ~dispute_resolved,
+            "assigned_officer": ~has_officer,
+            "resolution_notes": ~dispute_resolved,
+        },
+    )
+
+    return {
+        "accounts": accounts,
+        "cards": cards,
+        "transactions": (tx_columns, tx_nulls),
+        "cheques": cheques,
+        "loans": loans,
+        "complaints": complaints,
+        "disputes": disputes,
+    }
+
+
+def _concat(shards: List[Shard], collection: str) -> Tuple[Columns, Columns]:
+    """Concatenate one collection across shards, in shard order"""
+    parts = [shard[collection] for shard in shards]
+    columns = {name: np.concatenate([p[0][name] for p in parts]) for name in parts[0][0]}
+    rows = [len(next(iter(p[0].values()))) for p in parts]
+    nulls = {
+        name: np.concatenate([p[1].get(name, np.zeros(n, dtype=bool)) for p, n in zip(parts, rows)])
+        for name in dict.fromkeys(name for p in parts for name in p[1])
+    }
+    return columns, nulls
+
+
+def _with_id(columns: Columns, field: str, values: np.ndarray) -> Columns:
+    """Put the generated ID column first, as in the JSON mock data"""
+    return {field: values, **columns}
+
+
+def _id_width(count: int) -> int:
+    return max(7, len(str(max(count - 1, 0))))
+
+
+def generate(accounts: int, per_account: int, seed: int, as_of: str, workers: int) -> Dict[str, Tuple[Columns, Columns]]:
+    """Generate every collection in parallel shards and assign global IDs"""
+    pools = build_pools(seed)
+    tasks = [
+        (shard, start, min(SHARD_SIZE, accounts - start), per_account, seed, as_of, pools)
+        for shard, start in enumerate(range(0, accounts, SHARD_SIZE))
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(_generate_shard, tasks))
+    else:
+        shards = [_generate_shard(task) for task in tasks]
+
+    # Global IDs are assigned after concatenation so they are dense and unique
+    tx_offsets = np.cumsum([0] + [len(s["transactions"][0]["local_index"]) for s in shards])
+    for shard, offset in zip(shards, tx_offsets):
+        shard["disputes"][0]["transaction_index"] = shard["disputes"][0]["transaction_index"] + offset
+
+    data = {name: _concat(shards, name) for name in shards[0]}
+
+    tx, tx_nulls = data["transactions"]
+    tx_width = _id_width(len(tx["local_index"]))
+    del tx["local_index"]
+    data["transactions"] = (_with_id(tx, "id", _prefixed("TXN", np.arange(len(tx["amount"])), tx_width)), tx_nulls)
+
+    disputes, dispute_nulls = data["disputes"]
+    transaction_ids = _prefixed("TXN", disputes.pop("transaction_index"), tx_width)
+    n = len(transaction_ids)
+    disputes = {
+        "ticket_id": _prefixed("DISPUTE", np.arange(n), _id_width(n)),
+        "account_number": disputes.pop("account_number"),
+        "transaction_id": transaction_ids,
+        **disputes,
+    }
+    data["disputes"] = (disputes, dispute_nulls)
+
+    for name, field, prefix in (
+        ("complaints", "ticket_id", "COMPLAINT"),
+        ("loans", "loan_id", "LN"),
+        ("cheques", "cheque_number", ""),
+    ):
+        columns, nulls = data[name]
+        n = len(next(iter(columns.values())))
+        data[name] = (_with_id(columns, field, _prefixed(prefix, np.arange(n), _id_width(n) if prefix else max(6, _id_width(n)))), nulls)
+
+    return data
+
+
+def write_snapshots(data: Dict[str, Tuple[Columns, Columns]], data_dir: str, json_files: bool = False) -> List[Tuple[str, int, str]]:
+    """Write generated collections as snapshots; returns (collection, records, path) per collection"""
+    written = []
+    for name, (columns, nulls) in data.items():
+        path = snapshot_path(data_dir, name)
+        # Stamp the snapshot as current so older JSON files do not shadow it
+        write_columns(columns, path, nulls, {c: "json" for c in JSON_COLUMNS.get(name, ())}, time.time_ns())
+        if json_files:
+            convert_to_json(data_dir, name)
+        written.append((name, len(next(iter(columns.values()))), path))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic mock data for load testing")
+    parser.add_argument("--accounts", type=int, default=10_000, help="number of accounts")
+    parser.add_argument("--transactions-per-account", type=int, default=50, help="mean transactions per account")
+    parser.add_argument("--seed", type=int, default=42, help="random seed")
+    parser.add_argument("--as-of", default=date.today().isoformat(), help="reference date for generated timestamps (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="generator processes")
+    parser.add_argument("--data-dir", default=os.getenv("MOCK_DATA_DIR", "mock_data"), help="mock data directory")
+    parser.add_argument("--json", action="store_true", help="also write JSON files (slow for large datasets)")
+    args = parser.parse_args()
+
+    print(
+        f"Generating {args.accounts} accounts x ~{args.transactions_per_account} transactions "
+        f"(seed {args.seed}, as of {args.as_of}, {args.workers} workers)..."
+    )
+    start = time.perf_counter()
+    data = generate(args.accounts, args.transactions_per_account, args.seed, args.as_of, args.workers)
+    print(f"Generated in {time.perf_counter() - start:.1f}s")
+
+    for name, count, path in write_snapshots(data, args.data_dir, args.json):
+        print(f"Wrote {count} {name} records to {path}")
+
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
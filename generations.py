@@ -0,0 +1,41 @@
+"""
+Per-collection generation counters.
+
+Every write to a collection bumps its generation: the mock store (local
+writes and changes synced from other workers), the agent roster and the
+database write paths. A cache can then remember the generations of the
+collections a value was computed from and treat the value as stale as soon
+as any of them moves, without tracking what exactly changed.
+
+Generations are process-local and only ever increase; they are not
+comparable across processes.
+"""
+
+import itertools
+import threading
+from typing import Dict, Tuple
+
+
+class Generations:
+    """Write counters per collection name"""
+
+    def __init__(self):
+        self._generations: Dict[str, int] = {}
+        # One clock for every collection, so a bumped value is never reused
+        self._clock = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def bump(self, collection: str) -> int:
+        with self._lock:
+            generation = self._generations[collection] = next(self._clock)
+        return generation
+
+    def get(self, collection: str) -> int:
+        return self._generations.get(collection, 0)
+
+    def of(self, *collections: str) -> Tuple[int, ...]:
+        return tuple(self._generations.get(c, 0) for c in collections)
+
+
+# Global generation counters
+generations = Generations()
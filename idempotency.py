@@ -0,0 +1,162 @@
+"""
+Idempotency keys for mutating endpoints.
+
+Voice platforms retry requests that time out. A request that carries an
+`Idempotency-Key` header is executed at most once per (credential,
+endpoint, key) within `ttl` seconds:
+
+* the first request runs, and its response (including a 4xx error) is kept
+  as status and serialised body
+* a retry with the same key and the same body replays the kept response,
+  with `Idempotent-Replayed: true`, at the cost of a dict lookup
+* a duplicate that arrives while the first is still running waits for it
+  and replays its response, instead of running concurrently
+* the same key with a different body is rejected with 422
+
+Unexpected failures (5xx) are not kept: waiting duplicates get the same
+error, and a later retry runs the request again. When the first request is
+cancelled (its client went away), a waiting duplicate runs it instead.
+
+The store is bounded and in-process; with several workers a retry that
+lands on another worker is not recognised.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Tuple
+import logging
+
+import orjson
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from metrics import cache_hit, cache_miss
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class _Execution:
+    """A request with an idempotency key: running (future pending) or done"""
+
+    __slots__ = ("fingerprint", "future", "expires")
+
+    def __init__(self, fingerprint: str, future: "asyncio.Future[Tuple[int, bytes]]", expires: float):
+        self.fingerprint = fingerprint
+        self.future = future
+        self.expires = expires
+
+
+class IdempotencyStore:
+    """Bounded TTL store of in-flight and completed responses by idempotency key"""
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # Insertion order is expiry order, since every entry lives `ttl` seconds
+        self._executions: "OrderedDict[Tuple[str, str, str], _Execution]" = OrderedDict()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._executions:
+            execution = next(iter(self._executions.values()))
+            if execution.expires > now and len(self._executions) < self.max_entries:
+                break
+            self._executions.popitem(last=False)
+
+    async def run(self, request: Request, execute: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `execute()` once per idempotency key and replay its response to retries
+
+        Without the header, `execute()` simply runs. Its result (a response
+        model or other JSON-encodable value) is returned as a JSON response.
+        """
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return await execute()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+
+        scope = self._scope(request, key)
+        fingerprint = hashlib.sha256(await request.body()).hexdigest()
+
+        self._evict()
+        execution = self._executions.get(scope)
+        if execution is not None:
+            if execution.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422, detail="Idempotency-Key was already used with a different request"
+                )
+            cache_hit("idempotency")
+            logger.info("Replaying response for idempotency key %s on %s", key, request.url.path)
+            try:
+                status_code, body = await asyncio.shield(execution.future)
+            except asyncio.CancelledError:
+                if not execution.future.cancelled():
+                    raise
+                # The first request was abandoned before it finished: run this one instead
+                return await self.run(request, execute)
+            return Response(
+                content=body, status_code=status_code, media_type="application/json", headers={REPLAYED_HEADER: "true"}
+            )
+
+        cache_miss("idempotency")
+        execution = _Execution(fingerprint, asyncio.get_running_loop().create_future(), time.monotonic() + self.ttl)
+        self._executions[scope] = execution
+        try:
+            result = await execute()
+        except HTTPException as e:
+            if e.status_code >= 500:
+                self._fail(scope, execution, e)
+            else:
+                # Deterministic rejections (404, 409, ...) are replayed like successes
+                execution.future.set_result((e.status_code, orjson.dumps({"detail": jsonable_encoder(e.detail)})))
+            raise
+        except asyncio.CancelledError:
+            self._forget(scope, execution)
+            execution.future.cancel()
+            raise
+        except BaseException as e:
+            self._fail(scope, execution, e)
+            raise
+
+        body = orjson.dumps(jsonable_encoder(result))
+        execution.future.set_result((200, body))
+        return Response(content=body, media_type="application/json")
+
+    @staticmethod
+    def _scope(request: Request, key: str) -> Tuple[str, str, str]:
+        # Per credential (named by the scope check in dependencies.py), so
+        # clients cannot collide on (or read) each other's keys
+        return (getattr(request.state, "caller", ""), request.url.path, key)
+
+    def holds(self, request: Request) -> bool:
+        """Whether the request's key is known, so `run` will replay (or reject) it without executing"""
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return False
+        execution = self._executions.get(self._scope(request, key))
+        return execution is not None and execution.expires > time.monotonic()
+
+    def _forget(self, scope: Tuple[str, str, str], execution: _Execution) -> None:
+        if self._executions.get(scope) is execution:
+            del self._executions[scope]
+
+    def _fail(self, scope: Tuple[str, str, str], execution: _Execution, error: BaseException) -> None:
+        """Pass an unexpected failure to waiting duplicates and forget the key"""
+        self._forget(scope, execution)
+        execution.future.set_exception(error)
+        # Mark the exception retrieved, so asyncio does not warn when nobody waited
+        execution.future.exception()
+
+
+# Global idempotency store
+idempotency_store = IdempotencyStore(
+    ttl=float(os.getenv("IDEMPOTENCY_TTL", "3600")),
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000")),
+)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+BM25 search index over the knowledge base, stored in one memory-mapped file.
+
+The Markdown and text files in knowledge_base/ are split into passages at
+every heading; a passage's title is its heading path ("FAQ > Card Services >
+Q4: ..."), so a short section still carries its context. Passages that
+appear in both knowledge_base/*.md and knowledge_base/Text/*.txt are kept
+once.
+
+The BM25 weight of every (term, passage) pair is computed at build time, so
+a query only sums precomputed weights over the postings of its terms. The
+index file is laid out as:
+
+    b"BWKB" | u32 version | u32 header length | header JSON | arrays
+
+where the header holds the metadata (sources, BM25 parameters) and the
+offset, dtype and length of every array:
+
+* terms: sorted vocabulary as UTF-8 bytes + offsets
+* postings: per-term offsets into passage ids (int32) and weights (float32)
+* passages: text, title and source as UTF-8 bytes + offsets
+
+Arrays are NumPy views over the mapped file, so opening the index costs
+one read of the header and the vocabulary.
+
+    python kb_index.py build
+    python kb_index.py search "how do I block my card"
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+MAGIC = b"BWKB"
+ALIGN = 8
+
+KB_DIR = os.getenv("KB_DIR", "knowledge_base")
+KB_INDEX = os.getenv("KB_INDEX", os.path.join(KB_DIR, "kb.index"))
+SOURCE_PATTERNS = (("", ".md"), ("Text", ".txt"))
+
+# BM25 parameters (the usual defaults)
+K1 = 1.2
+B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its me my "
+    "of on or our please should that the their then there this to was what when where "
+    "which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords, with plural 's' stripped"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def source_files(kb_dir: str = KB_DIR) -> List[str]:
+    """Knowledge base files to index, Markdown first"""
+    files = []
+    for subdir, extension in SOURCE_PATTERNS:
+        directory = os.path.join(kb_dir, subdir)
+        if os.path.isdir(directory):
+            files.extend(
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith(extension)
+            )
+    return files
+
+
+def source_signature(files: Iterable[str]) -> List[List]:
+    """(path, mtime_ns, size) of every source, to tell when the index is stale"""
+    signature = []
+    for path in files:
+        stat = os.stat(path)
+        signature.append([path, stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def chunk_by_heading(text: str) -> List[Tuple[str, str]]:
+    """Split a Markdown document into (heading path, body) passages"""
+    passages = []
+    path: List[Tuple[int, str]] = []
+    body: List[str] = []
+    in_code = False
+
+    def flush():
+        content = "\n".join(body).strip()
+        if content:
+            passages.append((" > ".join(title for _, title in path), content))
+        body.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, match.group(2).replace("**", "").strip()))
+        else:
+            body.append(line)
+    flush()
+    return passages
+
+
+def _pack(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """UTF-8 bytes and offsets for a list of strings"""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def build_index(kb_dir: str = KB_DIR, index_path: str = KB_INDEX) -> Dict:
+    """Chunk, tokenize and score the knowledge base and write the index file; returns its header"""
+    start = time.perf_counter()
+    files = source_files(kb_dir)
+    signature = source_signature(files)
+
+    texts, titles, sources, seen = [], [], [], set()
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            document = f.read()
+        name = os.path.relpath(path, kb_dir).replace(os.sep, "/")
+        for title, body in chunk_by_heading(document):
+            if (title, body) in seen:
+                continue
+            seen.add((title, body))
+            texts.append(body)
+            titles.append(title)
+            sources.append(name)
+
+    # Headings are indexed along with the body, so "card block" finds the Q&A titled that way
+    term_counts = [Counter(tokenize(f"{title}\n{text}")) for title, text in zip(titles, texts)]
+    lengths = np.array([sum(c.values()) for c in term_counts], dtype=np.float64)
+    n = len(texts)
+    avgdl = float(lengths.mean()) if n else 0.0
+
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for passage, counts in enumerate(term_counts):
+        for term, tf in counts.items():
+            postings.setdefault(term, []).append((passage, tf))
+
+    vocabulary = sorted(postings)
+    term_offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    passage_ids, weights = [], []
+    for i, term in enumerate(vocabulary):
+        entries = postings[term]
+        df = len(entries)
+        idf = np.log(1 + (n - df + 0.5) / (df + 0.5))
+        for passage, tf in entries:
+            norm = K1 * (1 - B + B * lengths[passage] / avgdl)
+            passage_ids.append(passage)
+            weights.append(idf * tf * (K1 + 1) / (tf + norm))
+        term_offsets[i + 1] = len(passage_ids)
+
+    arrays = {
+        "term_offsets": term_offsets,
+        "postings_passages": np.array(passage_ids, dtype=np.int32),
+        "postings_weights": np.array(weights, dtype=np.float32),
+    }
+    for name, values in (("terms", vocabulary), ("texts", texts), ("titles", titles), ("sources", sources)):
+        arrays[f"{name}_data"], arrays[f"{name}_offsets"] = _pack(values)
+
+    header = {
+        "version": INDEX_VERSION,
+        "built_at": time.time(),
+        "sources": signature,
+        "passages": n,
+        "terms": len(vocabulary),
+        "avgdl": avgdl,
+        "k1": K1,
+        "b": B,
+    }
+    _write(index_path, header, arrays)
+    logger.info(
+        "Built knowledge base index: %s passages, %s terms in %.1f ms",
+        n, len(vocabulary), (time.perf_counter() - start) * 1000
+    )
+    return header
+
+
+def _write(index_path: str, header: Dict, arrays: Dict[str, np.ndarray]) -> None:
+    """Write header and arrays to a temp file and move it into place"""
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = [offset, array.dtype.str, len(array)]
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = {**header, "arrays": layout}
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = len(MAGIC) + 8 + len(header_bytes)
+    padding = -prefix % ALIGN
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", INDEX_VERSION, len(header_bytes) + padding))
+        f.write(header_bytes + b" " * padding)
+        for array in arrays.values():
+            data = np.ascontiguousarray(array).tobytes()
+            f.write(data + b"\0" * (-len(data) % ALIGN))
+    os.replace(tmp_path, index_path)
+
+
+class KBIndex:
+    """A memory-mapped knowledge base index"""
+
+    def __init__(self, index_path: str = KB_INDEX):
+        self.path = index_path
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:4] != MAGIC:
+            raise ValueError(f"{index_path} is not a knowledge base index")
+        version, header_length = struct.unpack_from("<II", self._mmap, 4)
+        if version != INDEX_VERSION:
+            raise ValueError(f"{index_path} has index version {version}, expected {INDEX_VERSION}")
+        data_start = 12 + header_length
+        self.header = json.loads(self._mmap[12:data_start])
+        self.arrays = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (offset, dtype, count) in self.header["arrays"].items()
+        }
+        # The vocabulary is small; a dict makes term lookups O(1)
+        terms = self._strings("terms")
+        self.term_ids = {terms(i): i for i in range(self.header["terms"])}
+
+    def _strings(self, name: str):
+        data, offsets = self.arrays[f"{name}_data"], self.arrays[f"{name}_offsets"]
+        return lambda i: bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    @property
+    def sources(self) -> List[List]:
+        return self.header["sources"]
+
+    def passage(self, i: int) -> Dict:
+        return {
+            "id": i,
+            "source": self._strings("sources")(i),
+            "title": self._strings("titles")(i),
+            "text": self._strings("texts")(i),
+        }
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """(passage id, score) of the best passages for a query, best first"""
+        term_ids = {self.term_ids[t] for t in tokenize(query) if t in self.term_ids}
+        if not term_ids or top_k <= 0:
+            return []
+        offsets = self.arrays["term_offsets"]
+        passages = self.arrays["postings_passages"]
+        weights = self.arrays["postings_weights"]
+        scores = np.zeros(self.header["passages"], dtype=np.float32)
+        for term_id in term_ids:
+            start, end = offsets[term_id], offsets[term_id + 1]
+            # A term lists each passage once, so plain fancy-index addition is exact
+            scores[passages[start:end]] += weights[start:end]
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(scores[matched], -top_k)[-top_k:]]
+        best = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(i), float(scores[i])) for i in best]
+
+
+def is_stale(index: Optional[KBIndex], kb_dir: str = KB_DIR) -> bool:
+    """Whether the knowledge base files changed since the index was built"""
+    if index is None:
+        return True
+    try:
+        return source_signature(source_files(kb_dir)) != index.sources
+    except OSError:
+        return True
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "search"):
+        print(__doc__)
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if sys.argv[1] == "build":
+        header = build_index()
+        print(f"Wrote {KB_INDEX}: {header['passages']} passages, {header['terms']} terms")
+        return
+
+    index = KBIndex()
+    query = " ".join(sys.argv[2:])
+    start = time.perf_counter()
+    results = index.search(query)
+    elapsed = (time.perf_counter() - start) * 1e6
+    for passage_id, score in results:
+        passage = index.passage(passage_id)
+        print(f"{score:6.2f}  {passage['source']}  {passage['title']}")
+    print(f"{len(results)} results in {elapsed:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
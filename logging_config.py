@@ -0,0 +1,297 @@
+"""
+Non-blocking, structured logging for the API.
+
+Request handlers only put log records on an in-memory queue; a background
+writer thread formats them and does all the file and console I/O:
+
+* records are enqueued unformatted, so message interpolation (`%s` args),
+  JSON serialisation and exception rendering happen off the event loop
+* the writer drains the queue in batches and flushes once per batch, so a
+  burst of requests costs one write + flush instead of one per line
+* the queue is bounded (LOG_QUEUE_SIZE): when the writer falls that far
+  behind, new records are dropped and the count is logged, rather than
+  holding memory and delaying every later line
+* the log file gets one JSON object per line and is rotated by size
+* high-volume INFO/DEBUG lines can be sampled per call site
+  (LOG_INFO_SAMPLE_RATE); warnings and errors are always kept
+
+Configuration (environment):
+    LOG_LEVEL              root level, default INFO
+    LOG_FILE               default banking_api.log
+    LOG_MAX_BYTES          rotate the log file at this size, default 10 MB
+    LOG_BACKUP_COUNT       rotated files to keep, default 5
+    LOG_INFO_SAMPLE_RATE   fraction of INFO/DEBUG lines kept per call site, default 1.0
+    LOG_CONSOLE            also log to stderr (plain text), default true
+    LOG_FLUSH_INTERVAL_MS  how long the writer lets records accumulate, default 50
+    LOG_QUEUE_SIZE         records queued for the writer before new ones are dropped, default 100000
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", None, None).__dict__
+) | {"message", "asctime", "taskName"}
+
+CONSOLE_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fixed fraction of INFO/DEBUG records from each call site
+
+    Sampling is deterministic (every 1/rate-th record of a given logger and
+    line), so a rare line is never dropped entirely and a hot loop is thinned
+    evenly. Kept records carry `sample_rate` so counts can be re-weighted.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = min(max(rate, 0.0), 1.0)
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno > logging.INFO:
+            return True
+        site = (record.name, record.lineno)
+        with self._lock:
+            seen = self._counts.get(site, 0)
+            self._counts[site] = seen + 1
+        # Keep the record whenever the running total of kept records steps up
+        if int((seen + 1) * self.rate) > int(seen * self.rate) or seen == 0:
+            record.sample_rate = self.rate
+            return True
+        return False
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread
+
+    The stock `prepare` formats the message (and exception) in the calling
+    thread so the record can be pickled. The queue here is in-process, so
+    the record is passed through untouched. When the queue is full the
+    record is dropped and counted instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class _BatchFlushMixin:
+    """Skips the flush StreamHandler does after every record; the listener flushes per batch"""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+
+class BatchRotatingFileHandler(_BatchFlushMixin, logging.handlers.RotatingFileHandler):
+    pass
+
+
+class BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+
+class BatchQueueListener:
+    """Background thread that writes queued records in batches
+
+    Waking the writer thread for every record means a GIL hand-off per log
+    line. Instead the thread drains up to `max_batch` queued records, writes
+    them and flushes each handler once. It sleeps for `flush_interval`
+    seconds only after a short batch, so a backlog is written at full speed.
+    Records dropped by `source` because the queue was full are reported with
+    the next batch.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        log_queue: queue.Queue,
+        *handlers: logging.Handler,
+        source: Optional[_DeferredQueueHandler] = None,
+        flush_interval: float = 0.05,
+        max_batch: int = 1000,
+    ):
+        self.queue = log_queue
+        self.handlers = handlers
+        self.source = source
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._reported_drops = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Write everything queued so far, then stop the thread"""
+        if self._thread is None:
+            return
+        self.queue.put(self._sentinel)
+        self._thread.join()
+        self._thread = None
+
+    def handle(self, record: logging.LogRecord) -> None:
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def _report_drops(self) -> None:
+        dropped = self.source.dropped if self.source is not None else 0
+        if dropped > self._reported_drops:
+            message = "Log queue full, dropped %s records"
+            args = (dropped - self._reported_drops,)
+            self.handle(logging.LogRecord(__name__, logging.WARNING, __file__, 0, message, args, None))
+            self._reported_drops = dropped
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            stopping = False
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                else:
+                    self.handle(record)
+            self._report_drops()
+            for handler in self.handlers:
+                if isinstance(handler, _BatchFlushMixin):
+                    handler.flush_batch()
+            if stopping:
+                return
+            if len(batch) < self.max_batch:
+                time.sleep(self.flush_interval)
+
+
+_listener: Optional[BatchQueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+def setup_logging(
+    log_file: Optional[str] = None,
+    level: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    console: Optional[bool] = None,
+    max_bytes: Optional[int] = None,
+    backup_count: Optional[int] = None,
+    flush_interval_ms: Optional[float] = None,
+    queue_size: Optional[int] = None,
+) -> BatchQueueListener:
+    """Route all logging through a queue to a background writer thread
+
+    Arguments default to the environment settings listed in the module
+    docstring. Calling it again replaces the previous pipeline.
+    """
+    global _listener, _queue_handler
+    log_file = log_file or os.getenv("LOG_FILE", "banking_api.log")
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    if sample_rate is None:
+        sample_rate = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))
+    if console is None:
+        console = os.getenv("LOG_CONSOLE", "true").lower() == "true"
+    if max_bytes is None:
+        max_bytes = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    if backup_count is None:
+        backup_count = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    if flush_interval_ms is None:
+        flush_interval_ms = float(os.getenv("LOG_FLUSH_INTERVAL_MS", "50"))
+    if queue_size is None:
+        queue_size = int(os.getenv("LOG_QUEUE_SIZE", "100000"))
+
+    stop_logging()
+
+    handlers = []
+    file_handler = BatchRotatingFileHandler(
+        log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(JsonFormatter())
+    handlers.append(file_handler)
+    if console:
+        console_handler = BatchStreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    _queue_handler = queue_handler
+    root.setLevel(level.upper())
+
+    _listener = BatchQueueListener(
+        log_queue, *handlers, source=queue_handler, flush_interval=flush_interval_ms / 1000
+    )
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,20 +1,24 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header
+from fastapi import FastAPI, BackgroundTasks, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-import os
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
 
 from mock_data_storage import mock_storage
 from database import db_manager
+from services.ticket_writer import ticket_writer
+from services.kb_service import kb_service
+from services.prompt_service import prompt_service
+from static_assets import static_assets
 from models import *
+from logging_config import setup_logging
+from metrics import CONTENT_TYPE, MetricsMiddleware, metrics
+from rate_limiter import rate_limiter
+from shared_state import SharedStateMiddleware
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("banking_api.log"), logging.StreamHandler()],
-)
+# Configure logging: handlers run on a background thread, see logging_config.py
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -31,17 +35,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-
-# API Token Authentication
-def verify_api_token(x_api_token: str = Header(...)):
-    """Verify the API token from the request header"""
-    expected_token = os.getenv("API_TOKEN")
-    if not expected_token:
-        raise HTTPException(status_code=500, detail="API token not configured")
-    if x_api_token != expected_token:
-        raise HTTPException(status_code=401, detail="Invalid or missing API token")
-    return True
+# Other workers' mock data changes are applied once per request, see shared_state.py
+app.add_middleware(SharedStateMiddleware)
+# Outermost, so the recorded latency covers the whole request
+app.add_middleware(MetricsMiddleware)
 
 
 # Enums for standardization
@@ -111,9 +108,22 @@ async def startup_event():
         logger.info("Database initialized successfully")
     else:
         logger.warning("Database initialization failed, using mock data only")
-        logger.info(
-            f"Initialized mock data with {len(mock_storage.accounts)} accounts, {len(mock_storage.cards)} cards, {len(mock_storage.transactions)} transactions"
-        )
+        # Warm the mock data in the background so startup doesn't wait on it
+        asyncio.get_running_loop().run_in_executor(None, mock_storage.load_all)
+
+    # Open (or build) the knowledge base index in the background
+    asyncio.get_running_loop().run_in_executor(None, kb_service.load)
+    # Split and tag the system prompt and knowledge base for prompt compilation
+    asyncio.get_running_loop().run_in_executor(None, prompt_service.load)
+    # Fingerprint and compress the dashboard's static files
+    asyncio.get_running_loop().run_in_executor(None, static_assets.load)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending ticket writes and close the database pool"""
+    await ticket_writer.close()
+    await db_manager.close()
 
 
 @app.get("/")
@@ -141,9 +151,16 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics: per-route latency, request phases, pool saturation, cache hit rates and rate limiting"""
+    return Response(metrics.render(db_manager.pool, rate_limiter), media_type=CONTENT_TYPE)
+
+
 # Include all route modules
 from routes import (
     account,
+    customer,
     card,
     dispute,
     complaint,
@@ -157,9 +174,14 @@ from routes import (
     chat,
     sms,
     dashboard,
+    batch,
+    kb,
+    prompt,
+    assets,
 )
 
 app.include_router(account.router)
+app.include_router(customer.router)
 app.include_router(card.router)
 app.include_router(dispute.router)
 app.include_router(complaint.router)
@@ -173,6 +195,10 @@ app.include_router(escalation.router)
 app.include_router(chat.router)
 app.include_router(sms.router)
 app.include_router(dashboard.router)
+app.include_router(batch.router)
+app.include_router(kb.router)
+app.include_router(prompt.router)
+app.include_router(assets.router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,336 @@
+"""
+Request latency instrumentation and Prometheus text exposition.
+
+* `MetricsMiddleware` (pure ASGI) times every request and records it in a
+  per-route histogram once the response has been sent.
+* Code on the request path adds time to named phases of the current request
+  with `timed(phase)`, `timed_calls(phase)` or `add_phase(phase, seconds)`:
+
+      db_acquire  waiting for a pooled connection      (database.get_connection)
+      db_query    holding the connection (queries)     (database.get_connection)
+      mock        mock data storage lookups and writes (MockDataStorage methods)
+      sms         sending SMS notifications            (SMSService)
+      endpoint    the route function itself            (TimedRoute)
+      serialize   from endpoint return to response start: response model
+                  validation and JSON encoding
+
+* Caches report hits and misses with `cache_hit(name)` / `cache_miss(name)`.
+* The rate limiter reports refused requests with `reject(route_class, reason)`
+  and its state as gauges (see rate_limiter.py).
+
+All updates are plain dict/list increments made on the event loop thread
+(request timings are collected per request and folded in by the middleware),
+so no locks are taken on the request path. Counters bumped from worker
+threads are best-effort.
+"""
+
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+PHASES = ("db_acquire", "db_query", "mock", "sms", "endpoint", "serialize")
+
+# Histogram bucket upper bounds in seconds (Prometheus client defaults plus 1ms)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _RequestTimings:
+    __slots__ = ("phases", "active", "started", "endpoint_done")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        # Phases currently being timed, so nested (or concurrent) calls are not counted twice
+        self.active: Dict[str, int] = {}
+        # When each active phase went from idle to busy
+        self.started: Dict[str, float] = {}
+        self.endpoint_done: Optional[float] = None
+
+
+_current: ContextVar[Optional[_RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide metrics registry"""
+
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.phase_seconds: Dict[Tuple[str, str], float] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.cache_misses: Dict[str, int] = {}
+        self.rejections: Dict[Tuple[str, str], int] = {}
+        self.started = time.time()
+
+    def observe_request(
+        self, method: str, route: str, status: int, seconds: float, timings: _RequestTimings
+    ) -> None:
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = _Histogram()
+        histogram.observe(seconds)
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        for phase, spent in timings.phases.items():
+            if spent:
+                key = (route, phase)
+                self.phase_seconds[key] = self.phase_seconds.get(key, 0.0) + spent
+
+    def cache_hit(self, name: str, count: int = 1) -> None:
+        self.cache_hits[name] = self.cache_hits.get(name, 0) + count
+
+    def cache_miss(self, name: str, count: int = 1) -> None:
+        self.cache_misses[name] = self.cache_misses.get(name, 0) + count
+
+    def reject(self, route_class: str, reason: str) -> None:
+        key = (route_class, reason)
+        self.rejections[key] = self.rejections.get(key, 0) + 1
+
+    def render(self, pool=None, limiter=None) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines: List[str] = []
+
+        lines.append("# HELP bankwise_http_request_duration_seconds Request latency by route")
+        lines.append("# TYPE bankwise_http_request_duration_seconds histogram")
+        for (method, route), histogram in sorted(self.latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                lines.append(f'bankwise_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'bankwise_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"bankwise_http_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"bankwise_http_request_duration_seconds_count{{{labels}}} {histogram.count}")
+
+        lines.append("# HELP bankwise_http_requests_total Requests by route and status code")
+        lines.append("# TYPE bankwise_http_requests_total counter")
+        for (method, route, status), count in sorted(self.requests.items()):
+            lines.append(
+                f'bankwise_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+            )
+
+        lines.append("# HELP bankwise_request_phase_seconds_total Time spent in each phase of a request, by route")
+        lines.append("# TYPE bankwise_request_phase_seconds_total counter")
+        for (route, phase), seconds in sorted(self.phase_seconds.items()):
+            lines.append(
+                f'bankwise_request_phase_seconds_total{{route="{_escape(route)}",phase="{phase}"}} {seconds:.6f}'
+            )
+
+        lines.append("# HELP bankwise_cache_requests_total Cache lookups by cache and result")
+        lines.append("# TYPE bankwise_cache_requests_total counter")
+        for name in sorted(set(self.cache_hits) | set(self.cache_misses)):
+            lines.append(f'bankwise_cache_requests_total{{cache="{name}",result="hit"}} {self.cache_hits.get(name, 0)}')
+            lines.append(f'bankwise_cache_requests_total{{cache="{name}",result="miss"}} {self.cache_misses.get(name, 0)}')
+
+        lines.append("# HELP bankwise_rate_limited_total Requests refused by the rate limiter, by route class and reason")
+        lines.append("# TYPE bankwise_rate_limited_total counter")
+        for (route_class, reason), count in sorted(self.rejections.items()):
+            lines.append(f'bankwise_rate_limited_total{{route_class="{route_class}",reason="{reason}"}} {count}')
+
+        gauges = limiter.gauges() if limiter is not None else []
+        if pool is not None:
+            size, idle = pool.get_size(), pool.get_idle_size()
+            for name, help_text, value in (
+                ("bankwise_db_pool_size", "Open connections in the asyncpg pool", size),
+                ("bankwise_db_pool_idle", "Idle connections in the asyncpg pool", idle),
+                ("bankwise_db_pool_in_use", "Connections checked out of the asyncpg pool", size - idle),
+                ("bankwise_db_pool_max_size", "Maximum size of the asyncpg pool", pool.get_max_size()),
+            ):
+                gauges.append((name, help_text, value))
+        for name, help_text, value in gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}" if isinstance(value, float) else f"{name} {value}")
+
+        lines.append("# HELP bankwise_process_start_time_seconds Start time of the process since unix epoch")
+        lines.append("# TYPE bankwise_process_start_time_seconds gauge")
+        lines.append(f"bankwise_process_start_time_seconds {self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def add_phase(phase: str, seconds: float) -> None:
+    """Add time to a phase of the current request (no-op outside a request)"""
+    timings = _current.get()
+    if timings is not None:
+        timings.phases[phase] += seconds
+
+
+class timed:
+    """Context manager adding the time spent inside it to a phase of the current request
+
+    A phase is timed from when its first block is entered until its last
+    one exits, so nested blocks, and concurrent tasks of one request (e.g.
+    queries under `asyncio.gather`), count the wall time the phase was
+    busy once.
+    """
+
+    __slots__ = ("phase", "timings")
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            active = self.timings.active
+            depth = active.get(self.phase, 0)
+            if depth == 0:
+                self.timings.started[self.phase] = time.perf_counter()
+            active[self.phase] = depth + 1
+        return self
+
+    def __exit__(self, *exc):
+        timings = self.timings
+        if timings is not None:
+            depth = timings.active[self.phase] - 1
+            timings.active[self.phase] = depth
+            if depth == 0:
+                timings.phases[self.phase] += time.perf_counter() - timings.started[self.phase]
+        return False
+
+
+def timed_calls(phase: str) -> Callable:
+    """Decorator timing every call of a function (sync or async) as a request phase"""
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed(phase):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with timed(phase):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_methods(phase: str, prefixes: Tuple[str, ...]) -> Callable:
+    """Class decorator applying `timed_calls(phase)` to every method whose name has one of the prefixes"""
+
+    def decorator(cls):
+        for name, member in list(vars(cls).items()):
+            if callable(member) and name.startswith(prefixes):
+                setattr(cls, name, timed_calls(phase)(member))
+        return cls
+
+    return decorator
+
+
+def _timed_endpoint(func: Callable) -> Callable:
+    """Wrap a route function so its duration and end time are recorded"""
+    if asyncio.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_endpoint(*args, **kwargs):
+            with timed("endpoint"):
+                result = await func(*args, **kwargs)
+            timings = _current.get()
+            if timings is not None:
+                timings.endpoint_done = time.perf_counter()
+            return result
+
+        return async_endpoint
+
+    @functools.wraps(func)
+    def endpoint(*args, **kwargs):
+        with timed("endpoint"):
+            result = func(*args, **kwargs)
+        timings = _current.get()
+        if timings is not None:
+            timings.endpoint_done = time.perf_counter()
+        return result
+
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    """APIRoute whose route function is timed as the `endpoint` phase
+
+    Used as `APIRouter(route_class=TimedRoute)`. The wrapper keeps the
+    function's signature (functools.wraps), so FastAPI resolves parameters
+    and the response model exactly as before.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        # include_router re-creates routes from the already wrapped endpoint
+        if not getattr(endpoint, "_timed", False):
+            endpoint = _timed_endpoint(endpoint)
+            endpoint._timed = True
+        super().__init__(path, endpoint, **kwargs)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request"""
+
+    def __init__(self, app, registry: Optional[Metrics] = None):
+        self.app = app
+        self.registry = registry or metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = _RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if timings.endpoint_done is not None:
+                    timings.phases["serialize"] += time.perf_counter() - timings.endpoint_done
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # Label by route template, never the raw path, to keep cardinality bounded
+            path = getattr(route, "path", None) or "unmatched"
+            self.registry.observe_request(
+                scope["method"], path, status, time.perf_counter() - start, timings
+            )
+
+
+# Global metrics registry
+metrics = Metrics()
+cache_hit = metrics.cache_hit
+cache_miss = metrics.cache_miss
@@ -1,9 +1,37 @@
+"""
+Builds the knowledge base: every mock data collection (JSON) is rendered to
+Markdown, and every Markdown file to a styled PDF.
+
+The build is incremental. A manifest in the Markdown output directory records
+the SHA-256 of each input file and of this script, and of the Markdown each
+PDF was rendered from; a collection is only re-rendered when one of those
+changed or an output is missing. Collections are rendered in parallel worker
+processes, and the large ones (transactions, complaints) are read and
+formatted in chunks instead of being loaded whole.
+
+Usage:
+    python build_kb.py
+    python build_kb.py --input-dir . --workers 4 --force
+    python build_kb.py --no-pdf
+"""
+
+import argparse
+import glob
+import hashlib
 import json
 import os
-import glob
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+
 import markdown2
 import pdfkit
-from datetime import datetime
+
+MANIFEST_FILENAME = ".build_manifest.json"
+CHUNK_SIZE = 1000  # records per formatted chunk of a streamed collection
+READ_SIZE = 1 << 20  # bytes read at a time when streaming a JSON file
 
 # --- Helper Functions ---
 
@@ -13,15 +41,89 @@ def get_status_color(status):
     if not status:
         return "black"
     status = status.upper()
-    if status in ["AVAILABLE", "ACTIVE", "VERIFIED"]:
+    if status in ["AVAILABLE", "ACTIVE", "VERIFIED", "COMPLETED", "RESOLVED", "APPROVED", "CLEARED"]:
         return "green"
-    if status in ["BUSY", "ON BREAK", "IN TRAINING", "UNDER_REVIEW"]:
+    if status in ["BUSY", "ON BREAK", "IN TRAINING", "UNDER_REVIEW", "UNDER PROCESS", "IN_PROGRESS", "OPEN", "MAINTENANCE"]:
         return "orange"
-    if status in ["OFF DUTY", "INACTIVE", "FROZEN", "PENDING"]:
+    if status in ["OFF DUTY", "INACTIVE", "FROZEN", "PENDING", "BLOCKED", "LOST", "EXPIRED", "FAILED",
+                  "ESCALATED", "REJECTED", "BOUNCED", "DEFAULT", "OUT_OF_SERVICE"]:
         return "red"
     return "black"
 
 
+def format_status(status):
+    """Colored status text for Markdown."""
+    return f"<font color=\"{get_status_color(status)}\">{status or 'N/A'}</font>"
+
+
+def format_date(value, with_time=True):
+    """Formats an ISO timestamp the way the KB documents show dates."""
+    if not value:
+        return "N/A"
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return dt.strftime("%d-%b-%Y %I:%M %p" if with_time else "%d-%b-%Y")
+
+
+def format_amount(value):
+    """Formats a rupee amount."""
+    return f"₹{value or 0:,.2f}"
+
+
+def file_sha256(filepath):
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_chunks(filepath, chunk_size=CHUNK_SIZE):
+    """Yields the records of a JSON array file in lists of up to `chunk_size`.
+
+    The file is read READ_SIZE bytes at a time and decoded one record at a
+    time, so memory use depends on the chunk size rather than the file size.
+    Records must be JSON objects (as in every mock data file): an incomplete
+    object never decodes, so a record split across reads is detected.
+    """
+    decoder = json.JSONDecoder()
+    with open(filepath, "r", encoding="utf-8") as f:
+        buffer = f.read(READ_SIZE).lstrip()
+        if not buffer.startswith("["):
+            raise json.JSONDecodeError("Expected a JSON array", buffer, 0)
+        pos = 1
+        chunk = []
+        eof = False
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos < len(buffer) and buffer[pos] == "]":
+                break
+            try:
+                if pos == len(buffer):
+                    raise json.JSONDecodeError("Need more data", buffer, pos)
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(READ_SIZE)
+                eof = not more
+                buffer = buffer[pos:] + more
+                pos = 0
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
 # --- Formatting Functions (JSON to Markdown) ---
 
 
@@ -132,11 +234,126 @@ def generate_fd_rates_md(data):
     return "\n".join(md_lines)
 
 
+def generate_collection_md(title, format_record, data):
+    """Markdown for a collection whose records are formatted one at a time."""
+    return "\n".join([title] + [format_record(record) for record in data])
+
+
+def format_card_md(card):
+    return "\n".join([
+        f"### Card {card.get('card_number', 'N/A')} ({card.get('customer_name', 'N/A')})",
+        f"* **Account Number**: `{card.get('account_number', 'N/A')}`",
+        f"* **Card Type**: {card.get('card_type', 'N/A')} | **Network**: {card.get('card_network', 'N/A')}",
+        f"* **Card Status**: {format_status(card.get('card_status'))}",
+        f"* **Expiry**: {card.get('expiry_date', 'N/A')} | **Issued**: {format_date(card.get('issue_date'), with_time=False)}",
+        f"* **Limits**: {format_amount(card.get('daily_limit'))} daily | {format_amount(card.get('monthly_limit'))} monthly",
+        f"* **International Usage**: {card.get('international_usage', 'N/A')} | **Contactless**: {card.get('contactless', 'N/A')}\n",
+    ])
+
+
+def format_transaction_md(txn):
+    lines = [
+        f"### Transaction {txn.get('id', 'N/A')}",
+        f"* **Account Number**: `{txn.get('account_number', 'N/A')}`",
+        f"* **Date**: {format_date(txn.get('transaction_date'))}",
+        f"* **Description**: {txn.get('description', 'N/A')}",
+        f"* **Amount**: {format_amount(txn.get('amount'))} ({txn.get('type', 'N/A')})",
+        f"* **Balance After**: {format_amount(txn.get('balance_after'))}",
+        f"* **Status**: {format_status(txn.get('status'))}",
+        f"* **Reference**: {txn.get('reference_id') or 'N/A'}",
+    ]
+    if txn.get("merchant_id") or txn.get("location"):
+        lines.append(f"* **Merchant**: {txn.get('merchant_id') or 'N/A'} | **Location**: {txn.get('location') or 'N/A'}")
+    lines[-1] += "\n"
+    return "\n".join(lines)
+
+
+def format_branch_md(branch):
+    address = " ".join(str(branch.get("address", "N/A")).split())
+    return "\n".join([
+        f"### {branch.get('name', 'N/A')}",
+        f"* **IFSC**: `{branch.get('ifsc', 'N/A')}` | **Type**: {branch.get('branch_type', 'N/A')}",
+        f"* **Address**: {address}, {branch.get('city', 'N/A')} - {branch.get('pincode', 'N/A')}",
+        f"* **Contact**: {branch.get('email', 'N/A')} | {branch.get('phone', 'N/A')}",
+        f"* **Working Hours**: {branch.get('working_hours', 'N/A')}",
+        f"* **Facilities**: {branch.get('facilities', 'N/A')}",
+        f"* **Branch Manager**: {branch.get('manager_name', 'N/A')}",
+        f"* **Established**: {format_date(branch.get('established_date'), with_time=False)}\n",
+    ])
+
+
+def format_atm_md(atm):
+    address = " ".join(str(atm.get("address", "N/A")).split())
+    return "\n".join([
+        f"### ATM {atm.get('id', 'N/A')} ({atm.get('city', 'N/A')})",
+        f"* **Address**: {address}, {atm.get('city', 'N/A')} - {atm.get('pincode', 'N/A')}",
+        f"* **Bank**: {atm.get('bank_name', 'N/A')} | **Type**: {atm.get('type', 'N/A')} | **24x7**: {atm.get('24x7', 'N/A')}",
+        f"* **Status**: {format_status(atm.get('status'))}",
+        f"* **Facilities**: {atm.get('facilities', 'N/A')}",
+        f"* **Last Maintenance**: {format_date(atm.get('last_maintenance'), with_time=False)}\n",
+    ])
+
+
+def format_complaint_md(complaint):
+    return "\n".join([
+        f"### {complaint.get('ticket_id', 'N/A')}: {complaint.get('subject', 'N/A')}",
+        f"* **Account Number**: `{complaint.get('account_number', 'N/A')}`",
+        f"* **Category**: {complaint.get('category', 'N/A')} | **Priority**: {complaint.get('priority', 'N/A')}",
+        f"* **Status**: {format_status(complaint.get('status'))}",
+        f"* **Description**: {complaint.get('description', 'N/A')}",
+        f"* **Raised**: {format_date(complaint.get('created_at'))} | **Resolved**: {format_date(complaint.get('resolved_at'))}",
+        f"* **Estimated Resolution**: {complaint.get('estimated_resolution_days', 'N/A')} days",
+        f"* **Assigned Agent**: {complaint.get('assigned_agent') or 'Unassigned'}",
+        f"* **Resolution Notes**: {complaint.get('resolution_notes') or 'N/A'}",
+        f"* **Customer Satisfaction**: {complaint.get('customer_satisfaction') or 'N/A'}\n",
+    ])
+
+
+def format_dispute_md(dispute):
+    return "\n".join([
+        f"### {dispute.get('ticket_id', 'N/A')}: {dispute.get('dispute_type', 'N/A')} dispute",
+        f"* **Account Number**: `{dispute.get('account_number', 'N/A')}`",
+        f"* **Transaction**: {dispute.get('transaction_id', 'N/A')} | {format_amount(dispute.get('amount'))} on {format_date(dispute.get('transaction_date'))}",
+        f"* **Status**: {format_status(dispute.get('status'))}",
+        f"* **Reason**: {dispute.get('reason', 'N/A')}",
+        f"* **Description**: {' '.join(str(dispute.get('description', 'N/A')).split())}",
+        f"* **Raised**: {format_date(dispute.get('created_at'))} | **Resolved**: {format_date(dispute.get('resolved_at'))}",
+        f"* **Estimated Resolution**: {dispute.get('estimated_resolution_days', 'N/A')} days",
+        f"* **Assigned Officer**: {dispute.get('assigned_officer') or 'Unassigned'}",
+        f"* **Evidence Submitted**: {dispute.get('evidence_submitted', 'N/A')} | **Customer Contacted**: {dispute.get('customer_contacted', 'N/A')}",
+        f"* **Resolution Notes**: {dispute.get('resolution_notes') or 'N/A'}\n",
+    ])
+
+
+def format_loan_md(loan):
+    return "\n".join([
+        f"### Loan {loan.get('loan_id', 'N/A')} ({loan.get('loan_type', 'N/A')})",
+        f"* **Account Number**: `{loan.get('account_number', 'N/A')}`",
+        f"* **Status**: {format_status(loan.get('status'))}",
+        f"* **Principal**: {format_amount(loan.get('principal'))} at {loan.get('interest_rate', 'N/A')}% for {loan.get('tenure_months', 'N/A')} months",
+        f"* **EMI**: {format_amount(loan.get('emi_amount'))} | **Paid**: {loan.get('paid_emis', 'N/A')}/{loan.get('total_emis', 'N/A')} | **Remaining Tenure**: {loan.get('remaining_tenure', 'N/A')} months",
+        f"* **Disbursed**: {format_date(loan.get('disbursement_date'), with_time=False)} | **Next EMI**: {format_date(loan.get('next_emi_date'), with_time=False)}",
+        f"* **Processing Fee**: {format_amount(loan.get('processing_fee'))}",
+        f"* **Collateral**: {loan.get('collateral_details') or 'None'}",
+        f"* **Insurance**: {loan.get('insurance_details') or 'None'}\n",
+    ])
+
+
+def format_cheque_md(cheque):
+    return "\n".join([
+        f"### Cheque {cheque.get('cheque_number', 'N/A')}",
+        f"* **Account Number**: `{cheque.get('account_number', 'N/A')}`",
+        f"* **Payee**: {cheque.get('payee_name', 'N/A')} | **Amount**: {format_amount(cheque.get('amount'))}",
+        f"* **Status**: {format_status(cheque.get('status'))}",
+        f"* **Issued**: {format_date(cheque.get('issue_date'))} | **Cleared**: {format_date(cheque.get('clearing_date'))}\n",
+    ])
+
+
 # --- PDF Conversion Function ---
 
 
 def convert_md_to_pdf(md_filepath, pdf_filepath):
-    """Converts a single Markdown file to a PDF with styling."""
+    """Converts a single Markdown file to a PDF with styling. Returns whether it succeeded."""
     try:
         with open(md_filepath, "r", encoding="utf-8") as f:
             md_content = f.read()
@@ -168,6 +385,7 @@ def convert_md_to_pdf(md_filepath, pdf_filepath):
         """
         pdfkit.from_string(html_with_style, pdf_filepath)
         print(f"📄 Successfully created PDF: '{os.path.basename(pdf_filepath)}'")
+        return True
     except FileNotFoundError:
         print(
             "❌ Error: wkhtmltopdf not found. Please ensure it's installed and in your system's PATH."
@@ -177,6 +395,7 @@ def convert_md_to_pdf(md_filepath, pdf_filepath):
         print(
             f"❌ An unexpected error occurred during PDF conversion for '{os.path.basename(md_filepath)}': {e}"
         )
+    return False
 
 
 # --- Main Processing Logic ---
@@ -187,56 +406,190 @@ FORMATTER_DISPATCHER = {
     "fd_rates": generate_fd_rates_md,
 }
 
+# Collections formatted record by record: title and per-record formatter
+RECORD_FORMATTERS = {
+    "cards": ("## 💳 Debit & Credit Cards\n", format_card_md),
+    "transactions": ("## 💸 Transaction History\n", format_transaction_md),
+    "branches": ("## 🏢 Branch Directory\n", format_branch_md),
+    "atms": ("## 🏧 ATM Locations\n", format_atm_md),
+    "complaints": ("## 📝 Customer Complaints\n", format_complaint_md),
+    "disputes": ("## ⚖️ Transaction Disputes\n", format_dispute_md),
+    "loans": ("## 💰 Loan Accounts\n", format_loan_md),
+    "cheques": ("## 🧾 Cheque Status\n", format_cheque_md),
+}
+for _name, (_title, _format_record) in RECORD_FORMATTERS.items():
+    FORMATTER_DISPATCHER[_name] = partial(generate_collection_md, _title, _format_record)
+
+# Large collections, read and formatted CHUNK_SIZE records at a time
+STREAMED_COLLECTIONS = {"transactions", "complaints"}
+
+
+def write_markdown(json_filepath, md_filepath, base_name, chunk_size=CHUNK_SIZE):
+    """Renders a JSON collection to Markdown; returns the SHA-256 of what was written.
+
+    Written to a temp file and moved into place, so an interrupted build never
+    leaves a truncated file behind.
+    """
+    digest = hashlib.sha256()
+    tmp_filepath = f"{md_filepath}.tmp"
+    with open(tmp_filepath, "w", encoding="utf-8") as f:
 
-def process_json_files(input_dir, md_output_dir, pdf_output_dir):
-    """Finds JSON files, converts them to Markdown, and then to PDF."""
+        def write(text):
+            f.write(text)
+            digest.update(text.encode("utf-8"))
+
+        if base_name in STREAMED_COLLECTIONS:
+            # Same output as generate_collection_md, produced a chunk at a time
+            title, format_record = RECORD_FORMATTERS[base_name]
+            write(title)
+            for chunk in iter_json_chunks(json_filepath, chunk_size):
+                write("".join("\n" + format_record(record) for record in chunk))
+        else:
+            with open(json_filepath, "r", encoding="utf-8") as json_file:
+                data = json.load(json_file)
+            write(FORMATTER_DISPATCHER[base_name](data))
+    os.replace(tmp_filepath, md_filepath)
+    return digest.hexdigest()
+
+
+def build_collection(task):
+    """Worker: renders one collection's Markdown and/or PDF as needed.
+
+    Returns (base_name, manifest entry, or None if the build failed).
+    """
+    base_name, json_filepath, md_filepath, pdf_filepath, entry, render_md, chunk_size = task
+    filename = os.path.basename(json_filepath)
+    entry = dict(entry)
+    try:
+        if render_md:
+            entry["markdown"] = write_markdown(json_filepath, md_filepath, base_name, chunk_size)
+            print(f"✅ Successfully converted '{filename}' to '{os.path.basename(md_filepath)}'")
+
+        if pdf_filepath and (entry.get("pdf") != entry["markdown"] or not os.path.exists(pdf_filepath)):
+            if not convert_md_to_pdf(md_filepath, pdf_filepath):
+                entry.pop("pdf", None)
+                return base_name, entry
+            entry["pdf"] = entry["markdown"]
+        return base_name, entry
+
+    except json.JSONDecodeError:
+        print(f"❌ Error: Could not decode JSON in '{filename}'.")
+    except Exception as e:
+        print(f"❌ An unexpected error occurred processing '{filename}': {e}")
+    return base_name, None
+
+
+def load_manifest(manifest_path):
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def process_json_files(
+    input_dir,
+    md_output_dir,
+    pdf_output_dir,
+    workers=None,
+    force=False,
+    build_pdf=True,
+    chunk_size=CHUNK_SIZE,
+):
+    """Finds JSON files and converts the changed ones to Markdown, and then to PDF."""
     print(f"Searching for JSON files in: '{input_dir}'")
+    start = time.perf_counter()
     os.makedirs(md_output_dir, exist_ok=True)
-    os.makedirs(pdf_output_dir, exist_ok=True)
+    if build_pdf:
+        os.makedirs(pdf_output_dir, exist_ok=True)
 
-    json_files = glob.glob(os.path.join(input_dir, "*.json"))
+    json_files = sorted(glob.glob(os.path.join(input_dir, "*.json")))
     if not json_files:
         print("No JSON files found to process.")
         return
 
+    manifest_path = os.path.join(md_output_dir, MANIFEST_FILENAME)
+    manifest = {} if force else load_manifest(manifest_path)
+    # Formatter changes invalidate every output, so this script's hash is part of the key
+    builder_hash = file_sha256(os.path.abspath(__file__))
+
+    tasks, skipped = [], 0
     for json_filepath in json_files:
         filename = os.path.basename(json_filepath)
         base_name = os.path.splitext(filename)[0]
 
-        formatter = FORMATTER_DISPATCHER.get(base_name)
-        if not formatter:
+        if base_name not in FORMATTER_DISPATCHER:
             print(f"⚠️  Skipping '{filename}': No formatter found.")
             continue
 
-        try:
-            with open(json_filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            markdown_content = formatter(data)
-            md_filename = f"{base_name}.md"
-            md_filepath = os.path.join(md_output_dir, md_filename)
-            with open(md_filepath, "w", encoding="utf-8") as f:
-                f.write(markdown_content)
-            print(f"✅ Successfully converted '{filename}' to '{md_filename}'")
-
-            pdf_filename = f"{base_name}.pdf"
-            pdf_filepath = os.path.join(pdf_output_dir, pdf_filename)
-            convert_md_to_pdf(md_filepath, pdf_filepath)
-
-        except json.JSONDecodeError:
-            print(f"❌ Error: Could not decode JSON in '{filename}'.")
-        except Exception as e:
-            print(f"❌ An unexpected error occurred processing '{filename}': {e}")
+        md_filepath = os.path.join(md_output_dir, f"{base_name}.md")
+        pdf_filepath = os.path.join(pdf_output_dir, f"{base_name}.pdf") if build_pdf else None
+        entry = manifest.get(base_name, {})
+        key = {"input": file_sha256(json_filepath), "builder": builder_hash}
+        render_md = (
+            any(entry.get(k) != v for k, v in key.items())
+            or "markdown" not in entry
+            or not os.path.exists(md_filepath)
+        )
+        render_pdf = pdf_filepath is not None and (
+            render_md or entry.get("pdf") != entry.get("markdown") or not os.path.exists(pdf_filepath)
+        )
+        if not render_md and not render_pdf:
+            skipped += 1
+            continue
+        tasks.append((base_name, json_filepath, md_filepath, pdf_filepath, {**entry, **key}, render_md, chunk_size))
+
+    failed = 0
+    if tasks:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+        print(f"Building {len(tasks)} collection(s) with {workers} worker(s), {skipped} unchanged")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Largest inputs first, so they do not start last and hold up the build
+            tasks.sort(key=lambda t: os.path.getsize(t[1]), reverse=True)
+            for future in as_completed(pool.submit(build_collection, task) for task in tasks):
+                base_name, entry = future.result()
+                if entry is None:
+                    failed += 1
+                    manifest.pop(base_name, None)
+                else:
+                    manifest[base_name] = entry
+                save_manifest(manifest_path, manifest)
+
+    print(
+        f"🏁 Done in {time.perf_counter() - start:.1f}s: {len(tasks) - failed} built, "
+        f"{skipped} unchanged, {failed} failed"
+    )
 
 
 if __name__ == "__main__":
-    INPUT_DIR = "json_data"
-    MD_OUTPUT_DIR = "markdown_output"
-    PDF_OUTPUT_DIR = "pdf_output"
-
-    if not os.path.exists(INPUT_DIR):
-        os.makedirs(INPUT_DIR)
-        print(f"Created dummy input directory '{INPUT_DIR}'.")
+    parser = argparse.ArgumentParser(description="Build the knowledge base Markdown and PDFs from JSON data")
+    parser.add_argument("--input-dir", default="json_data", help="directory of JSON collections")
+    parser.add_argument("--md-dir", default="markdown_output", help="Markdown output directory")
+    parser.add_argument("--pdf-dir", default="pdf_output", help="PDF output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="records per chunk for large collections")
+    parser.add_argument("--force", action="store_true", help="rebuild everything, ignoring the manifest")
+    parser.add_argument("--no-pdf", action="store_true", help="only build Markdown")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_dir):
+        os.makedirs(args.input_dir)
+        print(f"Created dummy input directory '{args.input_dir}'.")
         print("Please place your JSON files there and run again.")
 
-    process_json_files(INPUT_DIR, MD_OUTPUT_DIR, PDF_OUTPUT_DIR)
+    process_json_files(
+        args.input_dir,
+        args.md_dir,
+        args.pdf_dir,
+        workers=args.workers,
+        force=args.force,
+        build_pdf=not args.no_pdf,
+        chunk_size=args.chunk_size,
+    )
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Columnar, memory-mappable snapshot format for mock data collections.
+
+Each collection is written to its own directory with one `.npy` file per
+column plus a `meta.json` describing the columns:
+
+* numbers and booleans are stored as float64/int64/bool arrays
+* ISO datetime strings are stored as datetime64[us]
+* strings (and JSON-encoded lists or mixed values) are dictionary encoded: an int32 code per
+  row plus a sorted dictionary kept as UTF-8 bytes and offsets
+
+All arrays are opened with `mmap_mode="r"`, so a snapshot of millions of
+transactions opens instantly and can be filtered with NumPy without building
+one dict per row. JSON stays the interchange format; use this script to
+convert between the two:
+
+    python mock_data_snapshot.py to-snapshot [collection ...]
+    python mock_data_snapshot.py to-json [collection ...]
+"""
+
+import json
+import os
+import sys
+from typing import List, Dict, Any, Callable, Optional, Iterable, Sequence, Tuple
+import logging
+
+import numpy as np
+import orjson
+
+from record_store import count_codes
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+NULL_CODE = -1
+
+
+def _is_iso_datetime(value: str) -> bool:
+    return len(value) >= 19 and value[4] == "-" and value[10] == "T"
+
+
+def _infer_kind(values: List[Any]) -> str:
+    """Pick the column encoding for a list of values"""
+    present = [v for v in values if v is not None]
+    if not present:
+        return "string"
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return "int"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return "float"
+    if all(isinstance(v, str) and _is_iso_datetime(v) for v in present):
+        try:
+            np.array(present, dtype="datetime64[us]")
+            return "datetime"
+        except ValueError:
+            pass
+    if all(isinstance(v, str) for v in present):
+        return "string"
+    # Lists, dicts and mixed columns round-trip through JSON text
+    return "json"
+
+
+def _encode_strings(values: List[Optional[str]]):
+    """Dictionary-encode strings into (codes, utf-8 bytes, offsets) with a sorted dictionary"""
+    present = sorted({v for v in values if v is not None})
+    lookup = {v: i for i, v in enumerate(present)}
+    codes = np.fromiter(
+        (NULL_CODE if v is None else lookup[v] for v in values),
+        dtype=np.int32,
+        count=len(values),
+    )
+    encoded = [v.encode("utf-8") for v in present]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return codes, data, offsets
+
+
+def _encode_string_array(values: np.ndarray, nulls: Optional[np.ndarray]):
+    """Vectorised dictionary encoding of a NumPy unicode array"""
+    present = values if nulls is None else values[~nulls]
+    uniques, inverse = np.unique(present, return_inverse=True)
+    codes = np.full(len(values), NULL_CODE, dtype=np.int32)
+    if nulls is None:
+        codes[:] = inverse
+    else:
+        codes[~nulls] = inverse
+
+    offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+    if not len(uniques):
+        return codes, np.zeros(0, dtype=np.uint8), offsets
+    encoded = np.char.encode(uniques, "utf-8")
+    lengths = np.char.str_len(encoded)
+    offsets[1:] = np.cumsum(lengths)
+    # Keep only the used bytes of each fixed-width entry, in order
+    raw = encoded.view(np.uint8).reshape(len(encoded), encoded.dtype.itemsize)
+    data = raw[np.arange(encoded.dtype.itemsize) < lengths[:, None]]
+    return codes, data, offsets
+
+
+def write_columns(
+    columns: Dict[str, np.ndarray],
+    path: str,
+    nulls: Optional[Dict[str, np.ndarray]] = None,
+    kinds: Optional[Dict[str, str]] = None,
+    source_mtime_ns: Optional[int] = None,
+) -> None:
+    """Write NumPy column arrays as a snapshot directory
+
+    `nulls` maps a field to a boolean mask of None rows, and `kinds` can mark
+    string columns that already hold JSON text as "json".
+    """
+    os.makedirs(path, exist_ok=True)
+    nulls = nulls or {}
+    kinds = kinds or {}
+    rows = len(next(iter(columns.values()))) if columns else 0
+    meta_columns = []
+
+    for field, values in columns.items():
+        base = os.path.join(path, field)
+        null_mask = nulls.get(field)
+        nullable = bool(null_mask is not None and null_mask.any())
+
+        if values.dtype.kind == "f":
+            kind = "float"
+            np.save(f"{base}.npy", values.astype(np.float64, copy=False))
+        elif values.dtype.kind == "b":
+            kind = "bool"
+            np.save(f"{base}.npy", values)
+        elif values.dtype.kind in "iu":
+            kind = "int"
+            np.save(f"{base}.npy", values.astype(np.int64, copy=False))
+        elif values.dtype.kind == "M":
+            kind = "datetime"
+            np.save(f"{base}.npy", values.astype("datetime64[us]"))
+        else:
+            kind = kinds.get(field, "string")
+            if values.dtype.kind == "U":
+                codes, data, offsets = _encode_string_array(values, null_mask if nullable else None)
+            else:
+                codes, data, offsets = _encode_strings(
+                    [None if (nullable and null_mask[i]) else v for i, v in enumerate(values.tolist())]
+                )
+            np.save(f"{base}.npy", codes)
+            np.save(f"{base}.dict.npy", data)
+            np.save(f"{base}.offsets.npy", offsets)
+
+        if nullable and kind in ("float", "int", "bool", "datetime"):
+            np.save(f"{base}.null.npy", null_mask)
+        meta_columns.append({"name": field, "kind": kind, "nullable": nullable})
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "rows": rows,
+        "columns": meta_columns,
+        "source_mtime_ns": source_mtime_ns,
+    }
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def write_snapshot(records: List[Dict[str, Any]], path: str, source_mtime_ns: Optional[int] = None) -> None:
+    """Write a list of records as a columnar snapshot directory"""
+    fields = list(dict.fromkeys(key for record in records for key in record))
+    columns: Dict[str, np.ndarray] = {}
+    nulls: Dict[str, np.ndarray] = {}
+    kinds: Dict[str, str] = {}
+
+    for field in fields:
+        values = [record.get(field) for record in records]
+        kind = _infer_kind(values)
+        null_mask = np.array([v is None for v in values], dtype=bool)
+        if null_mask.any():
+            nulls[field] = null_mask
+
+        if kind == "float":
+            columns[field] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif kind == "bool":
+            columns[field] = np.array([bool(v) for v in values], dtype=bool)
+        elif kind == "int":
+            columns[field] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+        elif kind == "datetime":
+            columns[field] = np.array(["NaT" if v is None else v for v in values], dtype="datetime64[us]")
+        else:
+            if kind == "json":
+                kinds[field] = "json"
+                values = [None if v is None else json.dumps(v, ensure_ascii=False) for v in values]
+            columns[field] = np.array(values, dtype=object)
+
+    write_columns(columns, path, nulls, kinds, source_mtime_ns)
+
+
+class _Column:
+    """A memory-mapped column, decoded lazily"""
+
+    def __init__(self, path: str, name: str, kind: str, nullable: bool):
+        base = os.path.join(path, name)
+        self.name = name
+        self.kind = kind
+        self.values = np.load(f"{base}.npy", mmap_mode="r")
+        self.nulls = np.load(f"{base}.null.npy", mmap_mode="r") if nullable and kind in ("float", "int", "bool", "datetime") else None
+        if kind in ("string", "json"):
+            self.dictionary = np.load(f"{base}.dict.npy", mmap_mode="r")
+            self.offsets = np.load(f"{base}.offsets.npy", mmap_mode="r")
+
+    def _decode_code(self, code: int) -> str:
+        start, end = self.offsets[code], self.offsets[code + 1]
+        return bytes(self.dictionary[start:end]).decode("utf-8")
+
+    def code_of(self, value: str) -> int:
+        """Binary search the sorted dictionary; returns NULL_CODE when the value is absent"""
+        lo, hi = 0, len(self.offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._decode_code(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.offsets) - 1 and self._decode_code(lo) == value:
+            return lo
+        return NULL_CODE
+
+    def mask_equal(self, value: Any) -> np.ndarray:
+        """Boolean mask of rows equal to value"""
+        if self.kind in ("string", "json"):
+            code = self.code_of(value)
+            if code == NULL_CODE:
+                return np.zeros(len(self.values), dtype=bool)
+            return self.values == code
+        if self.kind == "datetime":
+            return self.values == np.datetime64(value, "us")
+        return self.values == value
+
+    def group_codes(self) -> Tuple[np.ndarray, int, Callable[[int], Any]]:
+        """A code in [0, size) per row, the size, and a function from a code to its value"""
+        if self.kind in ("string", "json"):
+            def label(code: int) -> Any:
+                if code == 0:
+                    return None
+                text = self._decode_code(code - 1)
+                return json.loads(text) if self.kind == "json" else text
+            # Shift NULL_CODE (-1) to 0
+            return np.asarray(self.values, dtype=np.int64) + 1, len(self.offsets), label
+
+        uniques, codes = np.unique(self.values, return_inverse=True)
+        labels = uniques.tolist()
+        if self.kind == "datetime":
+            labels = [s[:-7] if s.endswith(".000000") else s for s in np.datetime_as_string(uniques, unit="us").tolist()]
+        if self.nulls is not None:
+            # Code 2i is value i, 2i + 1 is null
+            codes = codes * 2 + self.nulls
+            labels = [v for label in labels for v in (label, None)]
+        return codes, len(labels), labels.__getitem__
+
+    def decode(self, indices: np.ndarray) -> List[Any]:
+        """Decode the given rows to Python values"""
+        raw = self.values[indices]
+        if self.kind in ("string", "json"):
+            cache: Dict[int, str] = {}
+            out = []
+            for code in raw.tolist():
+                if code == NULL_CODE:
+                    out.append(None)
+                    continue
+                if code not in cache:
+                    cache[code] = self._decode_code(code)
+                # JSON values are parsed per row so callers never share mutable lists
+                out.append(json.loads(cache[code]) if self.kind == "json" else cache[code])
+            return out
+
+        if self.kind == "datetime":
+            # Match datetime.isoformat(), which omits zero microseconds
+            out = [
+                s[:-7] if s.endswith(".000000") else s
+                for s in np.datetime_as_string(raw, unit="us").tolist()
+            ]
+        else:
+            out = raw.tolist()
+        if self.nulls is not None:
+            nulls = self.nulls[indices].tolist()
+            out = [None if is_null else v for v, is_null in zip(out, nulls)]
+        return out
+
+
+class SnapshotTable:
+    """Read-only, memory-mapped view over a collection snapshot"""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version in {path}")
+        self.path = path
+        self.columns = {
+            c["name"]: _Column(path, c["name"], c["kind"], c["nullable"])
+            for c in self.meta["columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw column array (dictionary codes for string columns)"""
+        return self.columns[name].values
+
+    def where(self, field: str, value: Any) -> np.ndarray:
+        """Indices of rows whose field equals value"""
+        return np.flatnonzero(self.columns[field].mask_equal(value))
+
+    def where_in(self, field: str, values: Iterable[Any]) -> np.ndarray:
+        """Indices of rows whose field is any of values, in one pass over the column"""
+        column = self.columns[field]
+        if column.kind in ("string", "json"):
+            codes = [column.code_of(v) for v in values]
+            targets = np.array([c for c in codes if c != NULL_CODE], dtype=np.int32)
+        else:
+            targets = np.array(list(values), dtype=column.values.dtype)
+        return np.flatnonzero(np.isin(column.values, targets))
+
+    def first(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """First row whose field equals value, or None"""
+        indices = self.where(field, value)
+        return self.rows(indices[:1])[0] if len(indices) else None
+
+    def sort(self, indices: np.ndarray, field: str, descending: bool = False) -> np.ndarray:
+        """Order a set of row indices by a numeric or datetime column"""
+        keys = self.columns[field].values[indices]
+        order = np.argsort(keys, kind="stable")
+        if descending:
+            order = order[::-1]
+        return indices[order]
+
+    def group_by(
+        self, fields: Sequence[str], sum_field: Optional[str] = None
+    ) -> List[Tuple[Tuple[Any, ...], int, float]]:
+        """(field values, row count, sum of sum_field) per distinct combination of fields
+
+        Grouped with NumPy over the raw columns: dictionary codes for strings,
+        distinct values for other kinds. Only the values of the groups found
+        are decoded.
+        """
+        if not len(self):
+            return []
+        codes, sizes, labels = zip(*(self.columns[name].group_codes() for name in fields))
+        weights = None
+        if sum_field:
+            column = self.columns[sum_field]
+            weights = np.asarray(column.values, dtype=np.float64)
+            if column.nulls is not None:
+                weights = np.where(column.nulls, 0.0, weights)
+
+        groups, counts, totals = count_codes(codes, sizes, weights)
+        keys = zip(*([label(code) for code in column.tolist()] for column, label in zip(groups, labels)))
+        return list(zip(keys, counts.tolist(), totals.tolist()))
+
+    def rows(self, indices: Iterable[int]) -> List[Dict[str, Any]]:
+        """Materialise only the requested rows as dicts"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return []
+        names = list(self.columns)
+        decoded = [self.columns[name].decode(indices) for name in names]
+        return [dict(zip(names, values)) for values in zip(*decoded)]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialise the whole collection"""
+        return self.rows(np.arange(len(self)))
+
+
+def snapshot_path(data_dir: str, data_type: str) -> str:
+    return os.path.join(data_dir, "snapshots", data_type)
+
+
+def open_snapshot(data_dir: str, data_type: str, json_file: Optional[str] = None) -> Optional[SnapshotTable]:
+    """Open a collection snapshot if one exists and is not older than its JSON source"""
+    path = snapshot_path(data_dir, data_type)
+    if not os.path.exists(os.path.join(path, "meta.json")):
+        return None
+    try:
+        table = SnapshotTable(path)
+    except Exception as e:
+        logger.error("Error opening %s snapshot: %s", data_type, e)
+        return None
+
+    if json_file and os.path.exists(json_file):
+        source_mtime = table.meta.get("source_mtime_ns")
+        if source_mtime is not None and os.stat(json_file).st_mtime_ns > source_mtime:
+            logger.warning("Snapshot for %s is older than %s, ignoring it", data_type, json_file)
+            return None
+    return table
+
+
+def convert_to_snapshot(data_dir: str, data_type: str) -> int:
+    """Convert <data_dir>/<data_type>.json into a snapshot; returns the row count"""
+    json_file = os.path.join(data_dir, f"{data_type}.json")
+    with open(json_file, "rb") as f:
+        records = orjson.loads(f.read())
+    write_snapshot(records, snapshot_path(data_dir, data_type), os.stat(json_file).st_mtime_ns)
+    return len(records)
+
+
+def convert_to_json(data_dir: str, data_type: str) -> int:
+    """Convert a snapshot back into <data_dir>/<data_type>.json; returns the row count"""
+    path = snapshot_path(data_dir, data_type)
+    table = SnapshotTable(path)
+    records = table.to_records()
+    json_file = os.path.join(data_dir, f"{data_type}.json")
+    with open(json_file, "wb") as f:
+        f.write(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+
+    # Both formats now hold the same data; keep the snapshot current
+    table.meta["source_mtime_ns"] = os.stat(json_file).st_mtime_ns
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(table.meta, f, indent=2)
+    return len(records)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("to-snapshot", "to-json"):
+        print(__doc__)
+        sys.exit(1)
+
+    data_dir = os.getenv("MOCK_DATA_DIR", "mock_data")
+    collections = sys.argv[2:] or [
+        os.path.splitext(name)[0]
+        for name in sorted(os.listdir(data_dir))
+        if name.endswith(".json")
+    ]
+    convert = convert_to_snapshot if sys.argv[1] == "to-snapshot" else convert_to_json
+
+    for data_type in collections:
+        count = convert(data_dir, data_type)
+        print(f"Converted {count} {data_type} records ({sys.argv[1]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,95 @@
 import orjson
 import os
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
-from faker import Faker
 
-fake = Faker('en_IN')
+from mock_data_snapshot import SnapshotTable, open_snapshot
+from record_store import RecordStore, group_records
+from change_feed import change_feed, OP_INSERT, OP_UPDATE
+from generations import generations
+from services.id_allocator import id_allocator
+from shared_state import SharedState, shared_state
+from metrics import cache_hit, cache_miss, timed_methods
 
 logger = logging.getLogger(__name__)
 
+_fake = None
 
+
+def get_fake():
+    """Get the shared Faker instance, importing Faker only when data must be generated"""
+    global _fake
+    if _fake is None:
+        from faker import Faker
+
+        _fake = Faker('en_IN')
+    return _fake
+
+
+# Collections held in a RecordStore (compact columns) rather than a list of dicts
+COMPACT_COLLECTIONS = ("accounts", "cards", "transactions")
+
+# Key field(s) of each collection whose records can be changed at runtime.
+# Card numbers are stored masked, so they are only unique per account.
+RECORD_KEYS = {
+    "accounts": ("account_number",),
+    "cards": ("card_number", "account_number"),
+    "transactions": ("id",),
+    "complaints": ("ticket_id",),
+    "disputes": ("ticket_id",),
+    "loans": ("loan_id",),
+    "cheques": ("cheque_number",),
+}
+
+
+class _Collection:
+    """Descriptor for a mock data collection that is loaded on first access
+
+    Changes from other workers are applied on the first access in a request
+    (see `SharedState.sync_once`); later accesses read `_collections` directly.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if obj.shared_state:
+            obj.shared_state.sync_once()
+        data = obj._collections.get(self.name)
+        if data is None:
+            data = obj._load_collection(self.name)
+        return data
+
+    def __set__(self, obj, value):
+        obj._collections[self.name] = obj._compact(self.name, value)
+
+
+# Time spent in storage calls is reported as the "mock" phase of a request
+@timed_methods("mock", ("get_", "add_", "update_", "query_", "count"))
 class MockDataStorage:
     """Handles persistent storage of mock data in JSON files"""
 
-    def __init__(self, data_dir: str = "mock_data"):
+    accounts = _Collection()
+    cards = _Collection()
+    transactions = _Collection()
+    branches = _Collection()
+    atms = _Collection()
+    complaints = _Collection()
+    disputes = _Collection()
+    loans = _Collection()
+    fd_rates = _Collection()
+    cheques = _Collection()
+
+    def __init__(self, data_dir: str = "mock_data", shared_state: Optional[SharedState] = None):
         self.data_dir = data_dir
+        # Cross-worker overlay for runtime changes; None keeps them in this process only
+        self.shared_state = shared_state
         self.data_files = {
             "accounts": "accounts.json",
             "cards": "cards.json",
@@ -28,60 +102,133 @@ class MockDataStorage:
             "fd_rates": "fd_rates.json",
             "cheques": "cheques.json",
         }
+        # Collections are loaded lazily on first access, see _Collection
+        self._collections: Dict[str, List[Dict]] = {}
+        self._load_lock = threading.RLock()
+        # Lazily built lookup indexes: (data_type, key_field) -> (size, records, {key: record})
+        self._indexes: Dict[tuple, tuple] = {}
+        # Columnar snapshots opened so far (None when a collection has no usable snapshot)
+        self._snapshots: Dict[str, Optional[SnapshotTable]] = {}
         self.ensure_data_directory()
-        self.load_or_create_data()
 
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-            logger.info(f"Created mock data directory: {self.data_dir}")
-
-    def load_or_create_data(self):
-        """Load data from JSON files or create new data"""
-        try:
-            self.accounts = (
-                self._load_json_file("accounts") or self._generate_accounts()
-            )
-            self.cards = self._load_json_file("cards") or self._generate_cards()
-            self.transactions = (
-                self._load_json_file("transactions") or self._generate_transactions()
-            )
-            self.branches = (
-                self._load_json_file("branches") or self._generate_branches()
+            logger.info("Created mock data directory: %s", self.data_dir)
+
+    def _compact(self, data_type: str, data: List[Dict]) -> List[Dict]:
+        """Keep the large collections in a column store instead of one dict per record"""
+        if data_type in COMPACT_COLLECTIONS and not isinstance(data, RecordStore):
+            return RecordStore(data)
+        return data
+
+    def _load_collection(self, data_type: str) -> List[Dict]:
+        """Load one collection from its JSON file, generating and saving it only if missing"""
+        with self._load_lock:
+            data = self._collections.get(data_type)
+            if data is not None:
+                return data
+
+            snapshot = self.get_snapshot(data_type)
+            data = snapshot.to_records() if snapshot else self._load_json_file(data_type)
+            if not data:
+                try:
+                    data = getattr(self, f"_generate_{data_type}")()
+                    self._save_json_file(data_type, data)
+                except Exception as e:
+                    logger.error(f"Error generating {data_type} mock data: {e}")
+                    data = []
+
+            return self._install(data_type, data)
+
+    def _install(self, data_type: str, data: List[Dict]) -> List[Dict]:
+        """Make a loaded collection current, with the changes other workers made applied on top"""
+        data = self._collections[data_type] = self._compact(data_type, data)
+        generations.bump(data_type)
+        if self.shared_state and data_type in RECORD_KEYS:
+            for key, record in self.shared_state.records(data_type):
+                self._apply_record(data_type, key, record)
+            self.shared_state.register(
+                data_type, lambda key, record: self._apply_record(data_type, key, record)
             )
-            self.atms = self._load_json_file("atms") or self._generate_atms()
-            self.complaints = (
-                self._load_json_file("complaints") or self._generate_complaints()
-            )
-            self.disputes = (
-                self._load_json_file("disputes") or self._generate_disputes()
-            )
-            self.loans = self._load_json_file("loans") or self._generate_loans()
-            self.fd_rates = (
-                self._load_json_file("fd_rates") or self._generate_fd_rates()
-            )
-            self.cheques = self._load_json_file("cheques") or self._generate_cheques()
+        return data
+
+    def _apply_record(self, data_type: str, key: str, record: Dict) -> None:
+        existing = self._record_index(data_type).get(key)
+        if existing is None:
+            self._collections[data_type].append(record)
+        else:
+            existing.update(record)
+
+    def get_snapshot(self, data_type: str) -> Optional[SnapshotTable]:
+        """Get the memory-mapped snapshot of a collection, if one exists and is current"""
+        if data_type not in self._snapshots:
+            json_file = os.path.join(self.data_dir, self.data_files[data_type])
+            self._snapshots[data_type] = open_snapshot(self.data_dir, data_type, json_file)
+        return self._snapshots[data_type]
+
+    def query_snapshot(self, data_type: str) -> Optional[SnapshotTable]:
+        """Snapshot to query instead of the in-memory list, while the list is not loaded
+
+        A snapshot only holds the baseline data, so collections that have been
+        changed at runtime (by any worker) are always served from memory.
+        """
+        if data_type in self._collections:
+            return None
+        if self.shared_state and self.shared_state.has_records(data_type):
+            return None
+        return self.get_snapshot(data_type)
+
+    def count(self, data_type: str) -> int:
+        """Number of records in a collection, without materialising a snapshot"""
+        snapshot = self.query_snapshot(data_type)
+        return len(snapshot) if snapshot else len(getattr(self, data_type))
+
+    def count_by(
+        self, data_type: str, fields: List[str], sum_field: Optional[str] = None
+    ) -> List[tuple]:
+        """(field values, record count, sum of sum_field) per distinct combination of fields
+
+        Vectorised over the snapshot columns or the RecordStore codes where the
+        collection has them; plain lists are grouped in one Python pass.
+        """
+        snapshot = self.query_snapshot(data_type)
+        if snapshot:
+            return snapshot.group_by(fields, sum_field)
+        records = getattr(self, data_type)
+        if isinstance(records, RecordStore):
+            return records.group_by(fields, sum_field)
+        return group_records(records, fields, sum_field)
+
+    def load_all(self, max_workers: int = 4) -> None:
+        """Load every collection concurrently in a thread pool; snapshotted ones stay memory-mapped"""
+        pending = [
+            t for t in self.data_files
+            if t not in self._collections and not self.get_snapshot(t)
+        ]
+        if not pending:
+            return
 
-            # Save all data to ensure we have files
-            self.save_all_data()
+        # Parse the files in parallel first; generation (which needs accounts) runs after
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = dict(zip(pending, executor.map(self._load_json_file, pending)))
 
-            logger.info("Mock data loaded from JSON files or generated successfully")
+        with self._load_lock:
+            for data_type, data in loaded.items():
+                if data and data_type not in self._collections:
+                    self._install(data_type, data)
+        for data_type in pending:
+            getattr(self, data_type)
 
-        except Exception as e:
-            logger.error(f"Error loading mock data: {e}")
-            # Fallback to generating all data
-            self.accounts = self._generate_accounts()
-            self.cards = self._generate_cards()
-            self.transactions = self._generate_transactions()
-            self.branches = self._generate_branches()
-            self.atms = self._generate_atms()
-            self.complaints = self._generate_complaints()
-            self.disputes = self._generate_disputes()
-            self.loans = self._generate_loans()
-            self.fd_rates = self._generate_fd_rates()
-            self.cheques = self._generate_cheques()
-            self.save_all_data()
+        logger.info(
+            "Mock data loaded: %s accounts, %s cards, %s transactions",
+            self.count('accounts'), self.count('cards'), self.count('transactions')
+        )
+
+    def load_or_create_data(self):
+        """Load data from JSON files or create new data"""
+        self.load_all()
 
     def _load_json_file(self, data_type: str) -> Optional[List[Dict]]:
         """Load data from JSON file using orjson for better performance"""
@@ -90,7 +237,7 @@ class MockDataStorage:
             try:
                 with open(file_path, "rb") as f:  # orjson requires binary mode
                     data = orjson.loads(f.read())
-                    logger.info(f"Loaded {len(data)} {data_type} records from JSON")
+                    logger.info("Loaded %s %s records from JSON", len(data), data_type)
                     return data
             except Exception as e:
                 logger.error(f"Error loading {data_type} from JSON: {e}")
@@ -101,29 +248,27 @@ class MockDataStorage:
         """Save data to JSON file using orjson for better performance"""
         file_path = os.path.join(self.data_dir, self.data_files[data_type])
         try:
+            if isinstance(data, RecordStore):
+                data = data.to_dicts()
             # orjson.dumps returns bytes, write in binary mode
             json_data = orjson.dumps(data, option=orjson.OPT_INDENT_2)
-            with open(file_path, "wb") as f:
+            # Write to a temporary file and rename, so readers never see a partial file
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
                 f.write(json_data)
-            logger.info(f"Saved {len(data)} {data_type} records to JSON")
+            os.replace(tmp_path, file_path)
+            logger.info("Saved %s %s records to JSON", len(data), data_type)
         except Exception as e:
             logger.error(f"Error saving {data_type} to JSON: {e}")
 
     def save_all_data(self):
-        """Save all data to JSON files"""
-        self._save_json_file("accounts", self.accounts)
-        self._save_json_file("cards", self.cards)
-        self._save_json_file("transactions", self.transactions)
-        self._save_json_file("branches", self.branches)
-        self._save_json_file("atms", self.atms)
-        self._save_json_file("complaints", self.complaints)
-        self._save_json_file("disputes", self.disputes)
-        self._save_json_file("loans", self.loans)
-        self._save_json_file("fd_rates", self.fd_rates)
-        self._save_json_file("cheques", self.cheques)
+        """Save all loaded collections to JSON files"""
+        for data_type, data in list(self._collections.items()):
+            self._save_json_file(data_type, data)
 
     def _generate_accounts(self) -> List[Dict]:
         """Generate mock account data"""
+        fake = get_fake()
         accounts = []
         account_types = ["Savings", "Current", "Salary"]
 
@@ -195,6 +340,7 @@ class MockDataStorage:
 
     def _generate_transactions(self) -> List[Dict]:
         """Generate mock transaction data"""
+        fake = get_fake()
         transactions = []
         transaction_types = [
             "DEPOSIT",
@@ -270,6 +416,7 @@ class MockDataStorage:
 
     def _generate_branches(self) -> List[Dict]:
         """Generate mock branch data"""
+        fake = get_fake()
         branches = []
         cities = [
             "Mumbai",
@@ -314,6 +461,7 @@ class MockDataStorage:
 
     def _generate_atms(self) -> List[Dict]:
         """Generate mock ATM data"""
+        fake = get_fake()
         atms = []
         banks = [
             "Bank of Baroda",
@@ -369,6 +517,7 @@ class MockDataStorage:
 
     def _generate_complaints(self) -> List[Dict]:
         """Generate mock complaint data"""
+        fake = get_fake()
         complaints = []
         categories = [
             "ACCOUNT",
@@ -419,6 +568,7 @@ class MockDataStorage:
 
     def _generate_disputes(self) -> List[Dict]:
         """Generate mock dispute data"""
+        fake = get_fake()
         disputes = []
         dispute_types = [
             "FRAUD",
@@ -467,6 +617,7 @@ class MockDataStorage:
 
     def _generate_loans(self) -> List[Dict]:
         """Generate mock loan data"""
+        fake = get_fake()
         loans = []
         loan_types = [
             "HOME_LOAN",
@@ -548,6 +699,7 @@ class MockDataStorage:
 
     def _generate_cheques(self) -> List[Dict]:
         """Generate mock cheque data"""
+        fake = get_fake()
         cheques = []
         statuses = ["Cleared", "Pending", "Bounced", "Under Process"]
 
@@ -572,24 +724,96 @@ class MockDataStorage:
 
         return cheques
 
+    def get_index(self, data_type: str, key_field: str) -> Dict[str, Dict]:
+        """Get a {key: record} index over a collection, rebuilt when the collection grows"""
+        records = getattr(self, data_type)
+        cached = self._indexes.get((data_type, key_field))
+        if cached and cached[0] == len(records) and cached[1] is records:
+            cache_hit("mock_index")
+            return cached[2]
+
+        cache_miss("mock_index")
+        index = {}
+        for record in records:
+            index.setdefault(record[key_field], record)
+        self._indexes[(data_type, key_field)] = (len(records), records, index)
+        return index
+
+    def record_key(self, data_type: str, record: Dict) -> str:
+        """Key identifying a record of a collection in the shared state"""
+        return ":".join(str(record[field]) for field in RECORD_KEYS[data_type])
+
+    def _record_index(self, data_type: str) -> Dict[str, Dict]:
+        """{record_key: record} index, rebuilt when the collection grows"""
+        records = getattr(self, data_type)
+        cached = self._indexes.get((data_type, RECORD_KEYS[data_type]))
+        if cached and cached[0] == len(records) and cached[1] is records:
+            return cached[2]
+
+        index = {}
+        for record in records:
+            index.setdefault(self.record_key(data_type, record), record)
+        self._indexes[(data_type, RECORD_KEYS[data_type])] = (len(records), records, index)
+        return index
+
+    def get_many(self, data_type: str, key_field: str, keys: List[str]) -> Dict[str, Dict]:
+        """Resolve many keys at once through the collection index"""
+        snapshot = self.query_snapshot(data_type)
+        if snapshot:
+            found = {}
+            for record in snapshot.rows(snapshot.where_in(key_field, dict.fromkeys(keys))):
+                found.setdefault(record[key_field], record)
+            return found
+
+        index = self.get_index(data_type, key_field)
+        return {key: index[key] for key in keys if key in index}
+
     def get_account_by_number(self, account_number: str) -> Optional[Dict]:
         """Get account by account number"""
-        for account in self.accounts:
-            if account["account_number"] == account_number:
-                return account
-        return None
+        return self.get_index("accounts", "account_number").get(account_number)
+
+    def get_cards_last4_index(self) -> Dict[str, List[Dict]]:
+        """Get a {last4: [cards]} index, rebuilt when the card list grows"""
+        cached = self._indexes.get(("cards", "last4"))
+        if cached and cached[0] == len(self.cards) and cached[1] is self.cards:
+            cache_hit("mock_index")
+            return cached[2]
+
+        cache_miss("mock_index")
+        index: Dict[str, List[Dict]] = {}
+        for card in self.cards:
+            index.setdefault(card["card_number"][-4:], []).append(card)
+        self._indexes[("cards", "last4")] = (len(self.cards), self.cards, index)
+        return index
+
+    def get_cards_by_last4(
+        self, last4: str, account_number: Optional[str] = None
+    ) -> List[Dict]:
+        """Get all cards ending with the given 4 digits, optionally scoped to an account"""
+        cards = self.get_cards_last4_index().get(last4, [])
+        if account_number:
+            cards = [c for c in cards if c["account_number"] == account_number]
+        return cards
 
     def get_card_by_last4(self, last4: str) -> Optional[Dict]:
         """Get card by last 4 digits"""
-        for card in self.cards:
-            if card["card_number"].endswith(last4):
-                return card
-        return None
+        cards = self.get_cards_by_last4(last4)
+        return cards[0] if cards else None
+
+    def get_cards_by_account(self, account_number: str) -> List[Dict]:
+        """Get all cards linked to an account"""
+        return [c for c in self.cards if c["account_number"] == account_number]
 
     def get_transactions_by_account(
         self, account_number: str, limit: int = 5
     ) -> List[Dict]:
         """Get transactions for an account"""
+        snapshot = self.query_snapshot("transactions")
+        if snapshot:
+            indices = snapshot.where("account_number", account_number)
+            indices = snapshot.sort(indices, "transaction_date", descending=True)
+            return snapshot.rows(indices[:limit])
+
         account_transactions = [
             t for t in self.transactions if t["account_number"] == account_number
         ]
@@ -609,24 +833,27 @@ class MockDataStorage:
 
     def get_complaint_by_id(self, ticket_id: str) -> Optional[Dict]:
         """Get complaint by ticket ID"""
-        for complaint in self.complaints:
-            if complaint["ticket_id"] == ticket_id:
-                return complaint
-        return None
+        return self.get_index("complaints", "ticket_id").get(ticket_id)
+
+    def get_complaints_by_account(self, account_number: str) -> List[Dict]:
+        """Get all complaints raised for an account"""
+        return [c for c in self.complaints if c["account_number"] == account_number]
+
+    def get_disputes_by_account(self, account_number: str) -> List[Dict]:
+        """Get all disputes raised for an account"""
+        return [d for d in self.disputes if d["account_number"] == account_number]
 
     def get_dispute_by_id(self, ticket_id: str) -> Optional[Dict]:
         """Get dispute by ticket ID"""
-        for dispute in self.disputes:
-            if dispute["ticket_id"] == ticket_id:
-                return dispute
-        return None
+        return self.get_index("disputes", "ticket_id").get(ticket_id)
 
     def get_loan_by_id(self, loan_id: str) -> Optional[Dict]:
         """Get loan by loan ID"""
-        for loan in self.loans:
-            if loan["loan_id"] == loan_id:
-                return loan
-        return None
+        return self.get_index("loans", "loan_id").get(loan_id)
+
+    def get_loans_by_account(self, account_number: str) -> List[Dict]:
+        """Get all loans for an account"""
+        return [l for l in self.loans if l["account_number"] == account_number]
 
     def get_fd_rates(self, tenure: Optional[int] = None) -> List[Dict]:
         """Get FD rates, optionally filtered by tenure"""
@@ -636,51 +863,75 @@ class MockDataStorage:
 
     def get_cheque_by_number(self, cheque_number: str) -> Optional[Dict]:
         """Get cheque by cheque number"""
-        for cheque in self.cheques:
-            if cheque["cheque_number"] == cheque_number:
-                return cheque
-        return None
+        return self.get_index("cheques", "cheque_number").get(cheque_number)
 
     def get_transaction_by_id(self, transaction_id: str) -> Optional[Dict]:
         """Get transaction by transaction ID"""
-        for transaction in self.transactions:
-            if transaction["id"] == transaction_id:
-                return transaction
-        return None
+        snapshot = self.query_snapshot("transactions")
+        if snapshot:
+            return snapshot.first("id", transaction_id)
+        return self.get_index("transactions", "id").get(transaction_id)
+
+    def add_record(self, data_type: str, record: Dict) -> Dict:
+        """Add a record to a collection, shared with the other workers"""
+        key = self.record_key(data_type, record)
+        if self.shared_state:
+            self.shared_state.put(data_type, key, record)
+            # Upsert rather than append: a sync since the put may have applied it already
+            self._apply_record(data_type, key, record)
+        else:
+            records = getattr(self, data_type)
+            records.append(record)
+            self._save_json_file(data_type, records)
+        change_feed.publish(data_type, OP_INSERT, key, record)
+        return record
+
+    def update_record(self, data_type: str, record: Dict, changes: Dict) -> Dict:
+        """Apply changes to a record of a collection, shared with the other workers"""
+        key = self.record_key(data_type, record)
+        if self.shared_state:
+            # Merge under the shared write lock so concurrent updates are not lost
+            record.update(self.shared_state.update(data_type, key, changes, base=record))
+        else:
+            record.update(changes)
+            # Large collections were never written back on change; only the ticket files are
+            if data_type not in COMPACT_COLLECTIONS:
+                self._save_json_file(data_type, getattr(self, data_type))
+        change_feed.publish(data_type, OP_UPDATE, key, changes)
+        return record
 
     def add_complaint(self, complaint_data: Dict) -> Dict:
-        """Add a new complaint"""
-        complaint_data["ticket_id"] = f"COMPLAINT{random.randint(10000, 99999)}"
-        complaint_data["created_at"] = datetime.now().isoformat()
-        complaint_data["status"] = "OPEN"
-        complaint_data["priority"] = "MEDIUM"
-        self.complaints.append(complaint_data)
-        self._save_json_file("complaints", self.complaints)
-        return complaint_data
+        """Add a new complaint, filling in any server-assigned fields the caller left out"""
+        complaint_data.setdefault("ticket_id", id_allocator.next_id("COMPLAINT"))
+        complaint_data.setdefault("created_at", datetime.now().isoformat())
+        complaint_data.setdefault("status", "OPEN")
+        complaint_data.setdefault("priority", "MEDIUM")
+        return self.add_record("complaints", complaint_data)
 
     def update_complaint(self, ticket_id: str, update_data: Dict) -> Optional[Dict]:
         """Update an existing complaint"""
-        for i, complaint in enumerate(self.complaints):
-            if complaint["ticket_id"] == ticket_id:
-                # Ensure datetime fields are properly formatted
-                if "resolved_at" in update_data and update_data["resolved_at"] is not None:
-                    if hasattr(update_data["resolved_at"], 'isoformat'):
-                        update_data["resolved_at"] = update_data["resolved_at"].isoformat()
-                
-                self.complaints[i].update(update_data)
-                self._save_json_file("complaints", self.complaints)
-                return self.complaints[i]
-        return None
+        # Ensure datetime fields are properly formatted
+        if "resolved_at" in update_data and update_data["resolved_at"] is not None:
+            if hasattr(update_data["resolved_at"], 'isoformat'):
+                update_data["resolved_at"] = update_data["resolved_at"].isoformat()
+        complaint = self.get_complaint_by_id(ticket_id)
+        if complaint is None:
+            return None
+        return self.update_record("complaints", complaint, update_data)
 
     def add_dispute(self, dispute_data: Dict) -> Dict:
-        """Add a new dispute"""
-        dispute_data["ticket_id"] = f"DISPUTE{random.randint(10000, 99999)}"
-        dispute_data["created_at"] = datetime.now().isoformat()
-        dispute_data["status"] = "OPEN"
-        self.disputes.append(dispute_data)
-        self._save_json_file("disputes", self.disputes)
-        return dispute_data
-
+        """Add a new dispute, filling in any server-assigned fields the caller left out"""
+        dispute_data.setdefault("ticket_id", id_allocator.next_id("DISPUTE"))
+        dispute_data.setdefault("created_at", datetime.now().isoformat())
+        dispute_data.setdefault("status", "OPEN")
+        return self.add_record("disputes", dispute_data)
+
+    def update_dispute(self, ticket_id: str, update_data: Dict) -> Optional[Dict]:
+        """Update an existing dispute"""
+        dispute = self.get_dispute_by_id(ticket_id)
+        if dispute is None:
+            return None
+        return self.update_record("disputes", dispute, update_data)
 
 # Initialize the storage
-mock_storage = MockDataStorage()
+mock_storage = MockDataStorage(os.getenv("MOCK_DATA_DIR", "mock_data"), shared_state=shared_state)
@@ -83,6 +83,11 @@ class AccountInfoRequest(BaseModel):
     last4: Optional[str] = None
 
 
+class CustomerSnapshotRequest(BaseModel):
+    account_number: str
+    transaction_limit: int = 5
+
+
 class TransactionHistoryRequest(BaseModel):
     account_number: str
     limit: int = 5
@@ -90,6 +95,7 @@ class TransactionHistoryRequest(BaseModel):
 
 class CardBlockRequest(BaseModel):
     last4: str
+    account_number: Optional[str] = None
     reason: Optional[str] = None
 
 
@@ -139,10 +145,31 @@ class LoanStatusRequest(BaseModel):
     loan_id: str
 
 
+class LoanScheduleRequest(BaseModel):
+    loan_id: str
+    start_month: int = 1
+    limit: Optional[int] = None
+
+
+class LoanPortfolioRequest(BaseModel):
+    account_number: str
+
+
+class LoanPrepaymentRequest(BaseModel):
+    loan_id: str
+    prepayment_amount: float
+    mode: str = "reduce_tenure"  # "reduce_tenure" or "reduce_emi"
+
+
 class TransactionRequest(BaseModel):
     transaction_id: str
 
 
+class BatchLookupRequest(BaseModel):
+    ids: List[str]
+    stream: bool = False
+
+
 class SpeakToAgentRequest(BaseModel):
     reason: Optional[str] = None
     urgency: str = "medium"
@@ -294,6 +321,61 @@ class LoanStatusResponse(BaseModel):
     status: Status
 
 
+class AmortizationEntry(BaseModel):
+    month: int
+    emi: float
+    interest: float
+    principal: float
+    balance: float
+
+
+class LoanSummary(BaseModel):
+    loan_id: str
+    loan_type: Optional[str] = None
+    principal: float
+    interest_rate: float
+    tenure_months: int
+    paid_emis: int
+    remaining_emis: int
+    emi_amount: float
+    outstanding_principal: float
+    principal_paid: float
+    interest_paid: float
+    remaining_interest: float
+    total_interest: float
+
+
+class LoanScheduleResponse(BaseModel):
+    summary: LoanSummary
+    schedule: List[AmortizationEntry]
+    status: Status
+
+
+class LoanPortfolioResponse(BaseModel):
+    account_number: str
+    loans: List[LoanSummary]
+    total_outstanding_principal: float
+    total_monthly_emi: float
+    total_remaining_interest: float
+    status: Status
+
+
+class LoanPrepaymentResponse(BaseModel):
+    loan_id: str
+    mode: str
+    prepayment_amount: float
+    outstanding_before: float
+    outstanding_after: float
+    emi_before: float
+    emi_after: float
+    remaining_emis_before: int
+    remaining_emis_after: int
+    remaining_interest_before: float
+    remaining_interest_after: float
+    interest_saved: float
+    status: Status
+
+
 class TransactionResponse(BaseModel):
     transaction_id: str
     account_number: str
@@ -372,3 +454,99 @@ class ChequeTrackingResponse(BaseModel):
     payee: str
     tracking_events: List[ChequeTrackingEvent]
     status: Status
+
+
+class AccountSnapshot(BaseModel):
+    account_number: str
+    account_type: str
+    customer_name: str
+    balance: float
+    currency: str
+    account_status: str
+    kyc_status: str
+    kyc_level: str
+    last_updated: str
+
+
+class CardSummary(BaseModel):
+    card_number: str
+    card_type: str
+    card_network: str
+    card_status: str
+    expiry_date: str
+
+
+class DisputeSummary(BaseModel):
+    ticket_id: str
+    amount: float
+    dispute_type: str
+    status: str
+    created_at: str
+    estimated_resolution_days: int
+
+
+class CustomerSnapshotResponse(BaseModel):
+    """Everything a voice turn usually needs about a customer, in one response"""
+
+    account: AccountSnapshot
+    transactions: List[Transaction]
+    cards: List[CardSummary]
+    loans: List[LoanInfo]
+    open_complaints: List[Complaint]
+    open_disputes: List[DisputeSummary]
+    source: str
+    status: Status
+
+
+class BatchLookupItem(BaseModel):
+    id: str
+    status: Status
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BatchLookupResponse(BaseModel):
+    entity: str
+    results: List[BatchLookupItem]
+    found: int
+    not_found: int
+    status: Status
+
+
+class KBSearchRequest(BaseModel):
+    query: str
+    top_k: int = 5
+
+
+class KBPassage(BaseModel):
+    id: int
+    source: str
+    title: str
+    text: str
+    score: float
+
+
+class KBSearchResponse(BaseModel):
+    query: str
+    results: List[KBPassage]
+    total_count: int
+    status: Status
+
+
+class PromptContextRequest(BaseModel):
+    intent: Intent
+    channel: Channel = Channel.VOICE
+    language_pref: Language = Language.EN
+    max_tokens: int = 1500
+
+
+class PromptContextResponse(BaseModel):
+    intent: Intent
+    channel: Channel
+    language_pref: Language
+    context: str
+    token_count: int
+    max_tokens: int
+    sections: List[str]
+    omitted_sections: int
+    status: Status
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Token-budgeted prompt context compiler.
+
+The system prompt and the knowledge base are split into sections at every
+heading, and each section is tagged with the intents (see `Intent` in
+models.py) and channels it is relevant to:
+
+* system prompt sections are core rules, included for every intent; the
+  mode-specific ones ("Web Voice Mode", "Chat Mode", ...) only for their channel
+* knowledge base sections are tagged from their heading path: the intent
+  values quoted in FAQ headings ("Scenario Type: `card_block`") and the
+  keywords in INTENT_KEYWORDS; untagged sections are left out, except for
+  the general guides in GENERAL_SOURCES, which fill any remaining budget
+
+`compile_context` picks sections in priority order (language instructions,
+core rules, intent-specific knowledge, general guides) and skips any that
+would exceed the token budget, then assembles them in document order.
+
+Tokens are estimated at CHARS_PER_TOKEN characters per token, close enough
+for English Markdown to keep prompts within a budget without a tokenizer.
+
+    python prompt_compiler.py card_block voice en 800
+"""
+
+import math
+import os
+import re
+import sys
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from kb_index import KB_DIR, source_files
+from models import Channel, Intent, Language
+
+SYSTEM_PROMPT_PATH = os.getenv("SYSTEM_PROMPT_PATH", os.path.join("Prompts", "SYSTEM_PROMPT_V4.md"))
+CHARS_PER_TOKEN = 4
+
+# Priority tiers, lowest first. The language instruction goes first: it is
+# short, and a reply in the wrong language fails whatever else is included
+TIER_LANGUAGE = 0
+TIER_CORE = 1
+TIER_INTENT = 2
+TIER_GENERAL = 3
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_QUOTED = re.compile(r"`([a-z_]+)`")
+
+# Heading keywords (matched at word starts) that tag a knowledge base section with an intent
+INTENT_KEYWORDS: Dict[Intent, Tuple[str, ...]] = {
+    Intent.ACCOUNT_INFO: ("balance", "account"),
+    Intent.TX_HISTORY: ("transaction",),
+    Intent.CARD_BLOCK: ("card",),
+    Intent.RAISE_DISPUTE: ("dispute", "chargeback"),
+    Intent.COMPLAINT_NEW: ("complaint", "grievance"),
+    Intent.COMPLAINT_STATUS: ("complaint status", "existing complaint", "grievance"),
+    Intent.LOCATE_BRANCH: ("branch", "working hours", "contact"),
+    Intent.LOCATE_ATM: ("atm",),
+    Intent.KYC_STATUS: ("kyc", "document"),
+    Intent.CHEQUE_STATUS: ("cheque",),
+    Intent.FD_RATE_INFO: ("fixed deposit", "fd", "investment"),
+    Intent.LOAN_STATUS: ("loan", "emi"),
+    Intent.SPEAK_TO_AGENT: ("escalat", "human agent", "agent"),
+}
+
+# System prompt headings that only apply to one channel
+CHANNEL_KEYWORDS: Dict[Channel, Tuple[str, ...]] = {
+    Channel.VOICE: ("voice mode", "call agent mode"),
+    Channel.CHAT: ("chat mode",),
+}
+
+# Knowledge base files with guidance that applies whatever the intent
+GENERAL_SOURCES = ("error_handling_guide.md",)
+
+LANGUAGE_INSTRUCTIONS: Dict[Language, str] = {
+    Language.HI: (
+        "## Language\n\n"
+        "The customer prefers Hindi. Reply in simple, conversational Hindi (Devanagari script). "
+        "Keep account numbers, amounts, dates and product names in digits and their usual English terms."
+    ),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _matches(title: str, keywords: Tuple[str, ...]) -> bool:
+    return any(re.search(rf"\b{re.escape(keyword)}", title) for keyword in keywords)
+
+
+class Section:
+    """A heading and its body, tagged with the intents and channels it serves"""
+
+    __slots__ = ("source", "order", "level", "title", "heading", "body", "parent", "intents", "channels", "tier")
+
+    def __init__(self, source: str, order: int, level: int, title: str, heading: str, body: str, parent: Optional[int]):
+        self.source = source
+        self.order = order
+        self.level = level
+        self.title = title
+        self.heading = heading
+        self.body = body
+        self.parent = parent
+        self.intents: FrozenSet[Intent] = frozenset()
+        self.channels: FrozenSet[Channel] = frozenset()
+        self.tier = TIER_CORE
+
+    @property
+    def text(self) -> str:
+        return f"{self.heading}\n\n{self.body}" if self.body else self.heading
+
+
+def split_sections(document: str, source: str, start: int = 0) -> List[Section]:
+    """Split a Markdown document at every heading
+
+    Orders are numbered from `start`, so sections from several documents
+    keep a single document order. `title` is the heading path without the
+    document (level 1) title.
+    """
+    sections: List[Section] = []
+    stack: List[Section] = []
+    lines: List[str] = []
+    in_code = False
+
+    def flush():
+        if sections:
+            # Drop the horizontal rules that separate top-level sections
+            sections[-1].body = re.sub(r"(\s*^-{3,}\s*$)+\Z", "", "\n".join(lines).strip(), flags=re.M).strip()
+        lines.clear()
+
+    for line in document.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING.match(line)
+        if not match:
+            lines.append(line)
+            continue
+        flush()
+        level = len(match.group(1))
+        while stack and stack[-1].level >= level:
+            stack.pop()
+        name = match.group(2).replace("**", "").strip()
+        path = [s.title.rsplit(" > ", 1)[-1] for s in stack if s.level > 1]
+        section = Section(
+            source=source,
+            order=start + len(sections),
+            level=level,
+            title=" > ".join(path + [name]),
+            heading=line.strip(),
+            body="",
+            parent=stack[-1].order if stack else None,
+        )
+        sections.append(section)
+        stack.append(section)
+    flush()
+    return sections
+
+
+def tag_prompt_sections(sections: List[Section]) -> None:
+    """System prompt sections are core rules; mode-specific ones belong to their channel"""
+    for section in sections:
+        title = section.title.lower()
+        section.channels = frozenset(c for c, keywords in CHANNEL_KEYWORDS.items() if _matches(title, keywords))
+
+
+def tag_kb_sections(sections: List[Section]) -> None:
+    """Tag knowledge base sections with intents from their heading path"""
+    values = {intent.value: intent for intent in Intent}
+    for section in sections:
+        title = section.title.lower()
+        intents = {values[v] for v in _QUOTED.findall(title) if v in values}
+        intents.update(i for i, keywords in INTENT_KEYWORDS.items() if _matches(title, keywords))
+        section.intents = frozenset(intents)
+        section.tier = TIER_GENERAL if section.source in GENERAL_SOURCES else TIER_INTENT
+
+
+def load_sections(prompt_path: str = SYSTEM_PROMPT_PATH, kb_dir: str = KB_DIR) -> List[Section]:
+    """Split and tag the system prompt and the knowledge base Markdown files"""
+    with open(prompt_path, "r", encoding="utf-8") as f:
+        sections = split_sections(f.read(), os.path.basename(prompt_path))
+    tag_prompt_sections(sections)
+
+    # Markdown only: knowledge_base/Text holds plain-text copies of the same files
+    for path in source_files(kb_dir):
+        if not path.endswith(".md"):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            kb_sections = split_sections(f.read(), os.path.basename(path), start=len(sections))
+        tag_kb_sections(kb_sections)
+        sections.extend(kb_sections)
+    return sections
+
+
+class CompiledPrompt:
+    """An assembled prompt and what went into it"""
+
+    __slots__ = ("text", "tokens", "sections", "omitted")
+
+    def __init__(self, text: str, tokens: int, sections: List[str], omitted: int):
+        self.text = text
+        self.tokens = tokens
+        self.sections = sections
+        self.omitted = omitted
+
+
+def compile_context(
+    sections: List[Section],
+    intent: Intent,
+    channel: Channel = Channel.VOICE,
+    language: Language = Language.EN,
+    max_tokens: int = 1500,
+) -> CompiledPrompt:
+    """The relevant sections for an intent that fit in `max_tokens`
+
+    Candidates are taken in priority order (tier, then sections tagged with
+    fewer intents first, then document order). A section is added when its
+    body and the heading lines of any enclosing sections not yet included fit
+    in the remaining budget, and skipped otherwise; the count of skipped
+    sections is `omitted`.
+    """
+    by_order = {section.order: section for section in sections}
+
+    def relevant(section: Section) -> bool:
+        if not section.body:
+            # Bare headings are only included to frame a chosen subsection
+            return False
+        if section.tier == TIER_CORE:
+            return not section.channels or channel in section.channels
+        return section.tier == TIER_GENERAL or intent in section.intents
+
+    candidates = [s for s in sections if relevant(s)]
+    if language in LANGUAGE_INSTRUCTIONS:
+        heading, body = LANGUAGE_INSTRUCTIONS[language].split("\n\n", 1)
+        language_section = Section("language", len(sections), 2, "Language", heading, body, None)
+        language_section.tier = TIER_LANGUAGE
+        candidates.append(language_section)
+    candidates.sort(key=lambda s: (s.tier, len(s.intents), s.order))
+
+    # order -> whether the section's body is included (False: heading line only)
+    chosen: Dict[int, bool] = {}
+    parts: Dict[int, str] = {}
+    used, omitted = 0, 0
+    for section in candidates:
+        added = {section.order: section.text}
+        parent = section.parent
+        while parent is not None and parent not in chosen:
+            added[parent] = by_order[parent].heading
+            parent = by_order[parent].parent
+        cost = sum(estimate_tokens(text) for text in added.values())
+        if section.order in chosen:
+            cost -= estimate_tokens(parts[section.order])
+        if used + cost > max_tokens:
+            omitted += 1
+            continue
+        used += cost
+        parts.update(added)
+        for order in added:
+            chosen[order] = order == section.order
+        by_order.setdefault(section.order, section)
+
+    ordered = sorted(parts)
+    text = "\n\n".join(parts[order] for order in ordered)
+    return CompiledPrompt(
+        text=text,
+        tokens=estimate_tokens(text),
+        sections=[f"{by_order[o].source}: {by_order[o].title}" for o in ordered if chosen[o]],
+        omitted=omitted,
+    )
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    intent = Intent(sys.argv[1])
+    channel = Channel(sys.argv[2]) if len(sys.argv) > 2 else Channel.VOICE
+    language = Language(sys.argv[3]) if len(sys.argv) > 3 else Language.EN
+    max_tokens = int(sys.argv[4]) if len(sys.argv) > 4 else 1500
+
+    compiled = compile_context(load_sections(), intent, channel, language, max_tokens)
+    print(compiled.text)
+    print(f"\n--- {compiled.tokens} tokens, {len(compiled.sections)} sections, {compiled.omitted} omitted")
+    for title in compiled.sections:
+        print(f"  {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Rate limiting and load shedding for authenticated requests.
+
+Every request that passes a scope check (dependencies.py) is admitted here
+once, before the route runs. Retries whose Idempotency-Key is already known
+are replayed from idempotency.py, so they are not charged or shed:
+
+* load shedding: while requests wait too long for a database connection,
+  new requests are refused with 503 and `Retry-After`, lowest priority
+  first. Reads are shed once the pool wait passes `shed_wait`; writes
+  (card blocks, disputes, complaints, escalations) only at four times
+  that (`SHED_FACTORS`), so they keep the connections that are left
+* token buckets, kept in memory per (route class, API token) and per
+  (route class, account_number): a caller over either budget gets 429 and
+  `Retry-After`, without touching the database
+
+Route classes are `read`, `write` and `sms` (the endpoints that send text
+messages on request). A route's class is the one of its most specific
+scope dependency. Budgets are `rate/burst` pairs (requests per second, and
+how many may arrive at once) per class, e.g. `read=50/100,write=10/20`; a
+class without a budget is not limited.
+
+The SMS provider also gets a process-wide budget of messages per second
+(`take_sms`), shared by request-time sends and the outbox relay.
+
+Buckets are per process, so with several workers each worker enforces the
+budgets separately. Idle buckets are evicted least recently used first;
+an evicted bucket was full again anyway unless it was used very recently.
+"""
+
+import itertools
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import orjson
+from fastapi import HTTPException, Request
+
+from idempotency import idempotency_store
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ROUTE_READ = "read"
+ROUTE_WRITE = "write"
+ROUTE_SMS = "sms"
+
+# How much more pool wait than `shed_wait` a route class tolerates before it is shed
+SHED_FACTORS = {ROUTE_READ: 1.0, ROUTE_SMS: 1.0, ROUTE_WRITE: 4.0}
+
+DEFAULT_TOKEN_BUDGETS = "read=50/100,write=10/20,sms=1/5"
+DEFAULT_ACCOUNT_BUDGETS = "read=10/30,write=1/5,sms=0.2/3"
+
+
+def parse_budgets(spec: str) -> Dict[str, Tuple[float, float]]:
+    """{route class: (rate, burst)} from `class=rate/burst` entries separated by commas"""
+    budgets = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            route_class, _, budget = entry.partition("=")
+            rate, _, burst = budget.partition("/")
+            budgets[route_class.strip()] = (float(rate), float(burst or rate))
+        except ValueError:
+            logger.warning("Ignoring invalid rate limit budget: %s", entry)
+    return budgets
+
+
+class TokenBucket:
+    """`burst` tokens, refilled at `rate` per second"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, cost: float = 1.0) -> float:
+        """Seconds until `cost` tokens are available (0 when they are now)"""
+        if self.tokens >= cost:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (cost - self.tokens) / self.rate
+
+
+class PoolPressure:
+    """How long requests wait for a database connection
+
+    The signal is the larger of a moving average of completed waits, which
+    decays while nobody acquires, and the age of the oldest wait still in
+    progress, so a stalled pool is noticed before anyone gets through.
+    """
+
+    def __init__(self, half_life: float = 1.0):
+        self.half_life = half_life
+        self._average = 0.0
+        self._updated = time.monotonic()
+        self._ids = itertools.count()
+        # id -> start, oldest first
+        self._waiting: Dict[int, float] = {}
+
+    def started(self) -> int:
+        waiter = next(self._ids)
+        self._waiting[waiter] = time.monotonic()
+        return waiter
+
+    def acquired(self, waiter: int, seconds: float) -> None:
+        self._waiting.pop(waiter, None)
+        average = self._decayed(time.monotonic())
+        self._average = average + (seconds - average) * 0.2
+
+    def abandoned(self, waiter: int) -> None:
+        self._waiting.pop(waiter, None)
+
+    def _decayed(self, now: float) -> float:
+        average = self._average * 0.5 ** ((now - self._updated) / self.half_life)
+        self._updated = now
+        return average
+
+    def wait(self) -> float:
+        now = time.monotonic()
+        self._average = self._decayed(now)
+        oldest = now - next(iter(self._waiting.values())) if self._waiting else 0.0
+        return max(self._average, oldest)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+
+class RateLimiter:
+    """Admits requests against per-token and per-account budgets, shedding load under pool pressure"""
+
+    def __init__(
+        self,
+        token_budgets: Dict[str, Tuple[float, float]],
+        account_budgets: Dict[str, Tuple[float, float]],
+        sms_budget: Optional[Tuple[float, float]] = None,
+        shed_wait: float = 0.25,
+        max_buckets: int = 10000,
+        enabled: bool = True,
+    ):
+        self.token_budgets = token_budgets
+        self.account_budgets = account_budgets
+        self.shed_wait = shed_wait
+        self.max_buckets = max_buckets
+        self.enabled = enabled
+        self.pool = PoolPressure()
+        self._buckets: "OrderedDict[Tuple[str, str, str], TokenBucket]" = OrderedDict()
+        self._sms = TokenBucket(*sms_budget, time.monotonic()) if sms_budget else None
+        # id(route) -> route class; routes live as long as the app
+        self._route_classes: Dict[int, str] = {}
+
+    def route_class(self, request: Request) -> str:
+        """The class of the matched route: that of its last (most specific) scope dependency"""
+        route = request.scope.get("route")
+        route_class = self._route_classes.get(id(route))
+        if route_class is None:
+            route_class = ROUTE_READ
+            for dependency in reversed(getattr(route, "dependencies", [])):
+                declared = getattr(dependency.dependency, "route_class", None)
+                if declared:
+                    route_class = declared
+                    break
+            self._route_classes[id(route)] = route_class
+        return route_class
+
+    async def admit(self, request: Request, caller: str) -> None:
+        """Raise 503 when the request is shed, or 429 when the caller is over budget"""
+        if not self.enabled or getattr(request.state, "admitted", False):
+            return
+        request.state.admitted = True
+        if idempotency_store.holds(request):
+            # A retry of a request that already ran (or is running) is replayed without work
+            return
+        route_class = self.route_class(request)
+
+        wait = self.pool.wait()
+        if wait > self.shed_wait * SHED_FACTORS.get(route_class, 1.0):
+            metrics.reject(route_class, "shed")
+            logger.warning("Shedding %s request to %s: pool wait %.0fms", route_class, request.url.path, wait * 1000)
+            raise HTTPException(
+                status_code=503, detail="Service is busy, please retry shortly", headers={"Retry-After": "1"}
+            )
+
+        keys: List[Tuple[Tuple[str, str, str], Tuple[float, float]]] = []
+        if route_class in self.token_budgets:
+            keys.append(((route_class, "token", caller), self.token_budgets[route_class]))
+        if route_class in self.account_budgets:
+            account_number = await self._account_number(request)
+            if account_number:
+                keys.append(((route_class, "account", account_number), self.account_budgets[route_class]))
+        if not keys:
+            return
+
+        now = time.monotonic()
+        buckets = [self._bucket(key, budget, now) for key, budget in keys]
+        # Take from every bucket or from none, so a refused request costs nothing
+        for (key, _), bucket in zip(keys, buckets):
+            retry_after = bucket.wait()
+            if retry_after > 0:
+                metrics.reject(route_class, f"{key[1]}_limit")
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Rate limit exceeded for this {'API token' if key[1] == 'token' else 'account'}",
+                    headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))},
+                )
+        for bucket in buckets:
+            bucket.tokens -= 1
+
+    def _bucket(self, key: Tuple[str, str, str], budget: Tuple[float, float], now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*budget, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.refill(now)
+        return bucket
+
+    @staticmethod
+    async def _account_number(request: Request) -> Optional[str]:
+        """account_number from the path, query string or JSON body, if the request names one"""
+        account_number = request.path_params.get("account_number") or request.query_params.get("account_number")
+        if account_number:
+            return account_number
+        if request.method in ("GET", "HEAD") or "json" not in request.headers.get("content-type", ""):
+            return None
+        # FastAPI keeps the body on the request, so this does not read it twice
+        try:
+            body = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            return None
+        account_number = body.get("account_number") if isinstance(body, dict) else None
+        return str(account_number) if account_number else None
+
+    def take_sms(self) -> bool:
+        """Spend one message of the SMS provider budget; False when it is used up"""
+        if not self.enabled or self._sms is None:
+            return True
+        self._sms.refill(time.monotonic())
+        if self._sms.wait() > 0:
+            metrics.reject(ROUTE_SMS, "provider_limit")
+            return False
+        self._sms.tokens -= 1
+        return True
+
+    def gauges(self) -> List[Tuple[str, str, float]]:
+        """(name, help, value) of the limiter's state, for /metrics"""
+        gauges = [
+            ("bankwise_rate_limit_buckets", "Token buckets held by the rate limiter", len(self._buckets)),
+            ("bankwise_db_pool_wait_seconds", "Recent wait for a database connection, as used for load shedding", self.pool.wait()),
+            ("bankwise_db_pool_waiting", "Requests waiting for a database connection", self.pool.waiting),
+            ("bankwise_load_shed_wait_seconds", "Pool wait at which reads are shed", self.shed_wait),
+        ]
+        if self._sms is not None:
+            self._sms.refill(time.monotonic())
+            gauges.append(("bankwise_sms_budget_tokens", "Messages left in the SMS provider budget", self._sms.tokens))
+        return gauges
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    token_budgets=parse_budgets(os.getenv("RATE_LIMIT_PER_TOKEN", DEFAULT_TOKEN_BUDGETS)),
+    account_budgets=parse_budgets(os.getenv("RATE_LIMIT_PER_ACCOUNT", DEFAULT_ACCOUNT_BUDGETS)),
+    sms_budget=parse_budgets(f"sms={os.getenv('SMS_RATE_LIMIT', '5/10')}").get(ROUTE_SMS),
+    shed_wait=float(os.getenv("SHED_POOL_WAIT_MS", "250")) / 1000,
+    max_buckets=int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "10000")),
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true",
+)
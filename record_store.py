@@ -0,0 +1,408 @@
+"""
+Compact, column-oriented storage for large mock data collections.
+
+A list of dicts costs several hundred bytes per record: the dict itself, its
+hash table, and a boxed float or string for every value. `RecordStore` keeps
+one column per field instead:
+
+* numbers in `array('d')` / `array('q')`
+* ISO datetimes as epoch microseconds in `array('q')`
+* low-cardinality strings (type, status, account number...) as `array('i')`
+  codes into an interned value list
+* everything else in a plain list
+
+Rows are handed out as `Record` views that behave like the original dicts
+(`record["amount"]`, `.get()`, `**record`, item assignment), so the existing
+getters and routes keep working unchanged.
+"""
+
+from array import array
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import sys
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+# Marks a field a record does not have (as opposed to a None value)
+_MISSING = object()
+
+
+class _ObjectColumn:
+    """Fallback column holding arbitrary Python values"""
+
+    kind = "object"
+
+    def __init__(self, values: List[Any]):
+        self.values = values
+
+    def get(self, row: int) -> Any:
+        return self.values[row]
+
+    def set(self, row: int, value: Any) -> bool:
+        self.values[row] = value
+        return True
+
+    def append(self, value: Any) -> bool:
+        self.values.append(value)
+        return True
+
+
+class _TypedColumn:
+    """Column backed by an array; None and missing values are kept aside per row
+
+    Subclasses set `typecode` and `kind`, and define `encode(value)`, which
+    returns the array value or None when the column cannot hold `value`.
+    """
+
+    typecode: str
+    kind: str
+
+    def __init__(self, values: List[Any]):
+        self.values = array(self.typecode)
+        self.special: Dict[int, Any] = {}
+        for value in values:
+            self.append(value)
+
+    def decode(self, raw):
+        return raw
+
+    def get(self, row: int) -> Any:
+        if self.special and row in self.special:
+            return self.special[row]
+        return self.decode(self.values[row])
+
+    def set(self, row: int, value: Any) -> bool:
+        if value is None or value is _MISSING:
+            self.values[row] = 0
+            self.special[row] = value
+            return True
+        encoded = self.encode(value)
+        if encoded is None:
+            return False
+        self.values[row] = encoded
+        self.special.pop(row, None)
+        return True
+
+    def append(self, value: Any) -> bool:
+        self.values.append(0)
+        if not self.set(len(self.values) - 1, value):
+            self.values.pop()
+            return False
+        return True
+
+
+class _FloatColumn(_TypedColumn):
+    typecode = "d"
+    kind = "float"
+
+    def encode(self, value):
+        return value if isinstance(value, float) else None
+
+
+class _IntColumn(_TypedColumn):
+    typecode = "q"
+    kind = "int"
+
+    def encode(self, value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return None
+
+
+class _DateTimeColumn(_TypedColumn):
+    """ISO datetime strings stored as epoch microseconds"""
+
+    typecode = "q"
+    kind = "datetime"
+
+    def encode(self, value):
+        if not isinstance(value, str) or not _is_iso_datetime(value):
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        # Only keep values that render back to exactly the same string
+        if parsed.tzinfo is not None or parsed.isoformat() != value:
+            return None
+        return (parsed - EPOCH) // ONE_MICROSECOND
+
+    def decode(self, raw):
+        return (EPOCH + timedelta(microseconds=raw)).isoformat()
+
+
+class _CategoryColumn:
+    """Strings stored as codes into a list of interned values"""
+
+    kind = "category"
+
+    def __init__(self, values: List[Any]):
+        self.codes = array("i")
+        self.categories: List[Any] = [None, _MISSING]
+        self.lookup: Dict[Any, int] = {}
+        for value in values:
+            self.append(value)
+
+    def _code(self, value: Any) -> Optional[int]:
+        if value is None:
+            return 0
+        if value is _MISSING:
+            return 1
+        if not isinstance(value, str):
+            return None
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(sys.intern(value))
+            self.lookup[value] = code
+        return code
+
+    def get(self, row: int) -> Any:
+        return self.categories[self.codes[row]]
+
+    def set(self, row: int, value: Any) -> bool:
+        code = self._code(value)
+        if code is None:
+            return False
+        self.codes[row] = code
+        return True
+
+    def append(self, value: Any) -> bool:
+        code = self._code(value)
+        if code is None:
+            return False
+        self.codes.append(code)
+        return True
+
+
+def _is_iso_datetime(value: str) -> bool:
+    return len(value) >= 19 and value[4] == "-" and value[10] == "T"
+
+
+def _build_column(values: List[Any]):
+    """Pick the most compact column type that holds every value exactly"""
+    present = [v for v in values if v is not None and v is not _MISSING]
+    if present:
+        if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+            return _IntColumn(values)
+        if all(isinstance(v, float) for v in present):
+            return _FloatColumn(values)
+        if all(isinstance(v, str) for v in present):
+            if all(_is_iso_datetime(v) for v in present):
+                column = _DateTimeColumn([])
+                if all(column.append(v) for v in values):
+                    return column
+            if len(set(present)) * 2 <= len(present):
+                return _CategoryColumn(values)
+    return _ObjectColumn(values)
+
+
+class Record(MutableMapping):
+    """Dict-like view of one row of a RecordStore; writes go to the store"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "RecordStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        column = self._store._columns.get(key)
+        value = column.get(self._row) if column else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._store._set(self._row, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self[key]
+        self._store._set(self._row, key, _MISSING)
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._row
+        for name, column in self._store._columns.items():
+            if column.get(row) is not _MISSING:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class RecordStore:
+    """List-like collection of records stored column by column"""
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        records = list(records)
+        fields = list(dict.fromkeys(key for record in records for key in record))
+        self._size = len(records)
+        self._columns: Dict[str, Any] = {
+            field: _build_column([record.get(field, _MISSING) for record in records])
+            for field in fields
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Record(self, row) for row in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("record index out of range")
+        return Record(self, index)
+
+    def __iter__(self) -> Iterator[Record]:
+        for row in range(self._size):
+            yield Record(self, row)
+
+    def _set(self, row: int, key: str, value: Any) -> None:
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = _ObjectColumn([_MISSING] * self._size)
+        if not column.set(row, value):
+            # The value does not fit the compact column; fall back to plain values
+            column = self._columns[key] = _ObjectColumn(
+                [column.get(r) for r in range(self._size)]
+            )
+            column.set(row, value)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        for key in record:
+            if key not in self._columns:
+                self._columns[key] = _ObjectColumn([_MISSING] * self._size)
+        for key, column in list(self._columns.items()):
+            value = record.get(key, _MISSING)
+            if not column.append(value):
+                column = self._columns[key] = _ObjectColumn(
+                    [column.get(r) for r in range(self._size)]
+                )
+                column.append(value)
+        self._size += 1
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def column(self, name: str) -> List[Any]:
+        """All values of one field, with None for rows that lack it"""
+        column = self._columns[name]
+        values = [column.get(row) for row in range(self._size)]
+        return [None if v is _MISSING else v for v in values]
+
+    def _group_codes(self, name: str) -> Tuple[np.ndarray, List[Any]]:
+        """Integer code per row for a field, and the value of each code"""
+        column = self._columns.get(name)
+        if isinstance(column, _CategoryColumn):
+            codes = np.array(column.codes, dtype=np.int64)
+            # Missing fields group with None, as in column()
+            codes[codes == 1] = 0
+            return codes, column.categories
+        return _factorize(self.column(name) if column else [None] * self._size)
+
+    def _sum_values(self, name: str) -> np.ndarray:
+        """A numeric field as float64, with 0 for None, missing and non-numeric values"""
+        column = self._columns.get(name)
+        if isinstance(column, (_FloatColumn, _IntColumn)):
+            values = np.array(column.values, dtype=np.float64)
+            for row in column.special:
+                values[row] = 0.0
+            return values
+        values = self.column(name) if column else []
+        return np.array(
+            [v if isinstance(v, (int, float)) and not isinstance(v, bool) else 0.0 for v in values],
+            dtype=np.float64,
+        )
+
+    def group_by(
+        self, fields: Sequence[str], sum_field: Optional[str] = None
+    ) -> List[Tuple[Tuple[Any, ...], int, float]]:
+        """(field values, record count, sum of sum_field) per distinct combination of fields
+
+        Category columns are grouped on their codes with NumPy, without
+        building a Record per row.
+        """
+        if not self._size:
+            return []
+        columns = [self._group_codes(name) for name in fields]
+        weights = self._sum_values(sum_field) if sum_field else None
+        groups, counts, totals = count_codes([codes for codes, _ in columns], [len(v) for _, v in columns], weights)
+        keys = zip(*([values[code] for code in codes.tolist()] for codes, (_, values) in zip(groups, columns)))
+        return list(zip(keys, counts.tolist(), totals.tolist()))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialise plain dicts, e.g. for JSON serialisation"""
+        return [dict(record) for record in self]
+
+    def __repr__(self) -> str:
+        kinds = ", ".join(f"{name}:{column.kind}" for name, column in self._columns.items())
+        return f"RecordStore({self._size} records; {kinds})"
+
+
+def count_codes(
+    codes: Sequence[np.ndarray], sizes: Sequence[int], weights: Optional[np.ndarray] = None
+) -> Tuple[List[np.ndarray], np.ndarray, np.ndarray]:
+    """Group rows on several integer code columns (codes of column i in [0, sizes[i]))
+
+    Returns the codes of each non-empty group (one array per column), and its
+    row count and sum of `weights`. The columns are combined into one group
+    number and counted with `np.bincount` when the combined space is small,
+    which avoids a sort; larger spaces fall back to `np.unique`.
+    """
+    n = len(codes[0])
+    space = int(np.prod(sizes, dtype=np.float64))
+    if space <= max(4 * n, 1 << 16):
+        group = np.ravel_multi_index(codes, sizes)
+        counts = np.bincount(group, minlength=space)
+        present = np.flatnonzero(counts)
+        totals = np.bincount(group, weights=weights, minlength=space)[present] if weights is not None else np.zeros(len(present))
+        return list(np.unravel_index(present, sizes)), counts[present], totals
+
+    group = np.zeros(n, dtype=np.int64)
+    for column, size in zip(codes, sizes):
+        # Renumber as we go so the combined number cannot overflow
+        _, group = np.unique(group * size + column, return_inverse=True)
+    _, first, group = np.unique(group, return_index=True, return_inverse=True)
+    counts = np.bincount(group)
+    totals = np.bincount(group, weights=weights) if weights is not None else np.zeros(len(first))
+    return [column[first] for column in codes], counts, totals
+
+
+def _factorize(values: List[Any]) -> Tuple[np.ndarray, List[Any]]:
+    """Integer code per value, and the distinct values in order of first appearance"""
+    lookup: Dict[Any, int] = {}
+    codes = np.fromiter((lookup.setdefault(v, len(lookup)) for v in values), dtype=np.int64, count=len(values))
+    return codes, list(lookup)
+
+
+def group_records(
+    records: Iterable[Dict[str, Any]], fields: Sequence[str], sum_field: Optional[str] = None
+) -> List[Tuple[Tuple[Any, ...], int, float]]:
+    """`RecordStore.group_by` for a plain list of dicts"""
+    groups: Dict[Tuple[Any, ...], List] = {}
+    for record in records:
+        key = tuple(record.get(field) for field in fields)
+        entry = groups.get(key)
+        if entry is None:
+            entry = groups[key] = [0, 0.0]
+        entry[0] += 1
+        if sum_field:
+            value = record.get(sum_field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                entry[1] += value
+    return [(key, count, total) for key, (count, total) in groups.items()]
@@ -0,0 +1,98 @@
+"""
+Response cache for slow-changing reference data.
+
+Keeps the serialised JSON body and a strong ETag per (endpoint, normalised
+request). Each entry remembers the generations (see generations.py) of the
+collections it was built from; once any of them moves, the next request
+rebuilds it. Database rows can change without a write through this
+process, so entries also expire after `ttl` seconds.
+
+A hit is served from the stored bytes, without touching storage or
+pydantic. A request whose If-None-Match names the current ETag gets a 304.
+The cached endpoints are lookups that use POST only to carry a JSON body,
+so they answer If-None-Match like a GET would.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Tuple
+import logging
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from generations import generations
+from metrics import cache_hit, cache_miss
+from shared_state import shared_state
+from static_assets import etag_matches
+
+logger = logging.getLogger(__name__)
+
+# Clients keep the body but must revalidate it before every use
+CACHE_CONTROL = "private, no-cache"
+
+
+class CachedResponse:
+    """A serialised response and what it was built from"""
+
+    __slots__ = ("body", "etag", "generations", "expires")
+
+    def __init__(self, body: bytes, generations: Tuple[int, ...], expires: float):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        self.generations = generations
+        self.expires = expires
+
+
+class ResponseCache:
+    """LRU cache of serialised responses, invalidated by collection generations"""
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedResponse]" = OrderedDict()
+
+    async def serve(
+        self,
+        request: Request,
+        endpoint: str,
+        key: Hashable,
+        collections: Tuple[str, ...],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """The cached response for (endpoint, key), built by `build()` when missing or stale
+
+        `build` returns the response model (or any JSON-encodable value); an
+        exception it raises, such as a 404, is passed on and nothing is cached.
+        """
+        if shared_state:
+            # Picks up writes from other workers (and bumps their generations)
+            shared_state.sync_once()
+
+        cache_key = (endpoint, key)
+        # Read before building, so a write during the build leaves the entry stale
+        current = generations.of(*collections)
+        entry = self._entries.get(cache_key)
+        if entry is not None and entry.generations == current and time.monotonic() < entry.expires:
+            cache_hit(f"response_{endpoint}")
+            self._entries.move_to_end(cache_key)
+        else:
+            cache_miss(f"response_{endpoint}")
+            body = orjson.dumps(jsonable_encoder(await build()))
+            entry = CachedResponse(body, current, time.monotonic() + self.ttl)
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# Global response cache instance
+response_cache = ResponseCache(ttl=float(os.getenv("RESPONSE_CACHE_TTL", "300")))
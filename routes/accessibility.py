@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
 from pydantic import BaseModel
 from typing import Dict, Any
 import logging
@@ -7,7 +8,7 @@ from main import get_session_data
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/accessibility", tags=["accessibility"])
+router = APIRouter(prefix="/api/accessibility", tags=["accessibility"], route_class=TimedRoute)
 
 class AccessibilityRequest(BaseModel):
     session_id: str
@@ -22,7 +23,7 @@ class AccessibilityResponse(BaseModel):
 async def handle_accessibility_request(request: AccessibilityRequest, session: Dict[str, Any] = Depends(get_session_data)):
     """Handle accessibility requests like slower speech or repeating the last answer"""
     try:
-        logger.info(f"Accessibility request received: {request.action} for session {request.session_id}")
+        logger.info("Accessibility request received: %s for session %s", request.action, request.session_id)
 
         if request.action == "slower_speech":
             # In a real voice application, this would trigger a change in the TTS settings.
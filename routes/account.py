@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
-from dependencies import verify_api_token
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -20,14 +21,14 @@ from models import (
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/account", tags=["account"])
+router = APIRouter(prefix="/api/account", tags=["account"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/balance", response_model=BalanceResponse)
-async def get_account_balance(request: AccountInfoRequest, auth: bool = Depends(verify_api_token)):
+async def get_account_balance(request: AccountInfoRequest):
     """Get account balance information"""
     try:
-        logger.info(f"Account balance request for account: {request.account_number}")
+        logger.info("Account balance request for account: %s", request.account_number)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -49,7 +50,7 @@ async def get_account_balance(request: AccountInfoRequest, auth: bool = Depends(
                     )
 
                     logger.info(
-                        f"Balance retrieved from database for account: {request.account_number}"
+                        "Balance retrieved from database for account: %s", request.account_number
                     )
                     return response
 
@@ -71,7 +72,7 @@ async def get_account_balance(request: AccountInfoRequest, auth: bool = Depends(
         )
 
         logger.info(
-            f"Balance retrieved from mock data for account: {request.account_number}"
+            "Balance retrieved from mock data for account: %s", request.account_number
         )
         return response
 
@@ -85,11 +86,11 @@ async def get_account_balance(request: AccountInfoRequest, auth: bool = Depends(
 
 
 @router.post("/transactions", response_model=TransactionHistoryResponse)
-async def get_transaction_history(request: TransactionHistoryRequest, auth: bool = Depends(verify_api_token)):
+async def get_transaction_history(request: TransactionHistoryRequest):
     """Get recent transaction history"""
     try:
         logger.info(
-            f"Transaction history request for account: {request.account_number}, limit: {request.limit}"
+            "Transaction history request for account: %s, limit: %s", request.account_number, request.limit
         )
 
         # Try to get from database first
@@ -123,7 +124,7 @@ async def get_transaction_history(request: TransactionHistoryRequest, auth: bool
                     )
 
                     logger.info(
-                        f"Transaction history retrieved from database for account: {request.account_number}"
+                        "Transaction history retrieved from database for account: %s", request.account_number
                     )
                     return response
 
@@ -158,7 +159,7 @@ async def get_transaction_history(request: TransactionHistoryRequest, auth: bool
         )
 
         logger.info(
-            f"Transaction history retrieved from mock data for account: {request.account_number}"
+            "Transaction history retrieved from mock data for account: %s", request.account_number
         )
         return response
 
@@ -172,10 +173,10 @@ async def get_transaction_history(request: TransactionHistoryRequest, auth: bool
 
 
 @router.post("/transaction", response_model=TransactionResponse)
-async def get_transaction_details(request: TransactionRequest, auth: bool = Depends(verify_api_token)):
+async def get_transaction_details(request: TransactionRequest):
     """Get detailed information about a specific transaction"""
     try:
-        logger.info(f"Transaction details request for transaction ID: {request.transaction_id}")
+        logger.info("Transaction details request for transaction ID: %s", request.transaction_id)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -202,7 +203,7 @@ async def get_transaction_details(request: TransactionRequest, auth: bool = Depe
                     )
 
                     logger.info(
-                        f"Transaction details retrieved from database for transaction: {request.transaction_id}"
+                        "Transaction details retrieved from database for transaction: %s", request.transaction_id
                     )
                     return response
 
@@ -228,7 +229,7 @@ async def get_transaction_details(request: TransactionRequest, auth: bool = Depe
         )
 
         logger.info(
-            f"Transaction details retrieved from mock data for transaction: {request.transaction_id}"
+            "Transaction details retrieved from mock data for transaction: %s", request.transaction_id
         )
         return response
 
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Request
+from metrics import TimedRoute
+import logging
+
+from static_assets import static_assets, STATIC_URL
+
+logger = logging.getLogger(__name__)
+
+# Public, like the dashboard that uses these files
+router = APIRouter(prefix=STATIC_URL, tags=["static"], route_class=TimedRoute)
+
+
+@router.get("/{path:path}", include_in_schema=False)
+async def get_static_asset(path: str, request: Request):
+    """A static file from memory; fingerprinted names may be cached for a year"""
+    found = static_assets.get(path)
+    if not found:
+        raise HTTPException(status_code=404, detail="Not found")
+    asset, cache_control = found
+    return asset.response(request, cache_control)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -7,19 +9,26 @@ import random
 
 from mock_data_storage import mock_storage
 from database import db_manager
+from response_cache import response_cache
 from models import ATMLocatorRequest, ATM, ATMLocatorResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/atm", tags=["atm"])
+router = APIRouter(prefix="/api/atm", tags=["atm"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/locate", response_model=ATMLocatorResponse)
-async def locate_atm(request: ATMLocatorRequest):
-    """Locate ATMs by pincode"""
+async def locate_atm(request: ATMLocatorRequest, http_request: Request):
+    """Locate ATMs by pincode, cached until the ATMs change (ETag / If-None-Match)"""
+    return await response_cache.serve(
+        http_request, "atm_locate", (request.pincode, request.limit), ("atms",), lambda: _locate_atm(request)
+    )
+
+
+async def _locate_atm(request: ATMLocatorRequest) -> ATMLocatorResponse:
     try:
         logger.info(
-            f"ATM locator request for pincode: {request.pincode}, limit: {request.limit}"
+            "ATM locator request for pincode: %s, limit: %s", request.pincode, request.limit
         )
 
         # Try to get from database first
@@ -54,7 +63,7 @@ async def locate_atm(request: ATMLocatorRequest):
                     )
 
                     logger.info(
-                        f"ATMs located from database for pincode: {request.pincode}"
+                        "ATMs located from database for pincode: %s", request.pincode
                     )
                     return response
 
@@ -88,7 +97,7 @@ async def locate_atm(request: ATMLocatorRequest):
             atms=atm_list, total_count=len(atm_list), status=Status.SUCCESS
         )
 
-        logger.info(f"ATMs located from mock data for pincode: {request.pincode}")
+        logger.info("ATMs located from mock data for pincode: %s", request.pincode)
         return response
 
     except HTTPException:
@@ -0,0 +1,193 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from metrics import TimedRoute
+from dependencies import require_read
+from datetime import datetime
+from typing import Dict, Any, List
+import logging
+
+import orjson
+
+from mock_data_storage import mock_storage
+from database import db_manager
+from models import BatchLookupRequest, BatchLookupItem, BatchLookupResponse, Status
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/batch", tags=["batch"], route_class=TimedRoute, dependencies=[Depends(require_read)])
+
+# Largest list answered as a single JSON document; bigger lists must be streamed
+MAX_BATCH_SIZE = 500
+MAX_STREAMED_BATCH_SIZE = 50000
+# Number of IDs resolved per database round-trip when streaming
+STREAM_CHUNK_SIZE = 500
+
+
+def _iso(value):
+    """Render database datetimes as ISO strings, pass mock strings through"""
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _complaint(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "ticket_id": record["ticket_id"],
+        "account_number": record["account_number"],
+        "subject": record["subject"],
+        "description": record["description"],
+        "category": record["category"],
+        "status": record["status"],
+        "priority": record["priority"],
+        "created_at": _iso(record["created_at"]),
+        "resolved_at": _iso(record.get("resolved_at")),
+        "estimated_resolution_days": record["estimated_resolution_days"],
+        "assigned_agent": record.get("assigned_agent"),
+        "resolution_notes": record.get("resolution_notes"),
+        "customer_satisfaction": record.get("customer_satisfaction"),
+    }
+
+
+def _cheque(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "cheque_number": record["cheque_number"],
+        "content": record["status"],
+        "amount": float(record["amount"]),
+        "date": _iso(record["issue_date"]),
+        "clearing_date": _iso(record.get("clearing_date")),
+    }
+
+
+def _loan(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "loan_id": record["loan_id"],
+        "loan_type": record["loan_type"],
+        "principal": float(record["principal"]),
+        "emi_amount": float(record["emi_amount"]),
+        "due_date": _iso(record["next_emi_date"]),
+        "remaining_tenure": record["remaining_tenure"],
+        "interest_rate": float(record["interest_rate"]),
+        "status": record["status"],
+    }
+
+
+def _transaction(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "transaction_id": record.get("transaction_id") or record["id"],
+        "account_number": f"******{record['account_number'][-4:]}",
+        "transaction_date": _iso(record["transaction_date"]),
+        "description": record["description"],
+        "amount": float(record["amount"]),
+        "type": record["type"],
+        "balance_after": float(record["balance_after"]),
+        "status": record.get("status", "COMPLETED"),
+        "reference_id": record.get("reference_id"),
+        "merchant_id": record.get("merchant_id"),
+        "location": record.get("location"),
+    }
+
+
+# entity -> (table, id column, mock data type, mock key field, serializer)
+BATCH_ENTITIES = {
+    "complaints": ("complaints", "ticket_id", "complaints", "ticket_id", _complaint),
+    "cheques": ("cheques", "cheque_number", "cheques", "cheque_number", _cheque),
+    "loans": ("loans", "loan_id", "loans", "loan_id", _loan),
+    "transactions": ("transactions", "transaction_id", "transactions", "id", _transaction),
+}
+
+
+async def _resolve(entity: str, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Resolve a list of IDs with one ANY($1) query, then mock data for the misses"""
+    table, column, data_type, key_field, serializer = BATCH_ENTITIES[entity]
+    unique_ids = list(dict.fromkeys(ids))
+    found: Dict[str, Dict[str, Any]] = {}
+
+    async with db_manager.get_connection() as conn:
+        if conn:
+            try:
+                records = await conn.fetch(
+                    f"SELECT * FROM {table} WHERE {column} = ANY($1::text[])",
+                    unique_ids,
+                )
+                for record in records:
+                    found.setdefault(record[column], serializer(dict(record)))
+            except Exception as e:
+                logger.warning("Batch %s query failed, using mock data: %s", entity, str(e))
+
+    # Fallback to mock data
+    missing = [i for i in unique_ids if i not in found]
+    if missing:
+        for key, record in mock_storage.get_many(data_type, key_field, missing).items():
+            found[key] = serializer(record)
+
+    return found
+
+
+def _items(entity: str, ids: List[str], found: Dict[str, Dict[str, Any]]) -> List[BatchLookupItem]:
+    """Build one result per requested ID, in request order"""
+    singular = entity[:-1]
+    return [
+        BatchLookupItem(id=i, status=Status.SUCCESS, data=found[i])
+        if i in found
+        else BatchLookupItem(id=i, status=Status.NOT_FOUND, error=f"{singular.capitalize()} not found")
+        for i in ids
+    ]
+
+
+async def _stream(entity: str, ids: List[str]):
+    """Yield NDJSON results chunk by chunk so large lists never sit in memory at once"""
+    for start in range(0, len(ids), STREAM_CHUNK_SIZE):
+        chunk = ids[start : start + STREAM_CHUNK_SIZE]
+        found = await _resolve(entity, chunk)
+        yield b"".join(
+            orjson.dumps(item.model_dump(mode="json")) + b"\n"
+            for item in _items(entity, chunk, found)
+        )
+
+
+@router.post("/{entity}")
+async def batch_lookup(entity: str, request: BatchLookupRequest):
+    """Look up many complaints, cheques, loans or transactions by ID in one call"""
+    try:
+        logger.info("Batch %s lookup for %s IDs (stream=%s)", entity, len(request.ids), request.stream)
+
+        if entity not in BATCH_ENTITIES:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Unknown entity. Must be one of: {list(BATCH_ENTITIES)}",
+            )
+
+        max_size = MAX_STREAMED_BATCH_SIZE if request.stream else MAX_BATCH_SIZE
+        if len(request.ids) > max_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch too large: {len(request.ids)} IDs (max {max_size}"
+                + ("" if request.stream else ", set stream=true for larger lists")
+                + ")",
+            )
+
+        if request.stream:
+            return StreamingResponse(
+                _stream(entity, request.ids), media_type="application/x-ndjson"
+            )
+
+        found = await _resolve(entity, request.ids)
+        results = _items(entity, request.ids, found)
+        found_count = sum(1 for item in results if item.status == Status.SUCCESS)
+
+        response = BatchLookupResponse(
+            entity=entity,
+            results=results,
+            found=found_count,
+            not_found=len(results) - found_count,
+            status=Status.SUCCESS,
+        )
+
+        logger.info("Batch %s lookup resolved %s/%s IDs", entity, found_count, len(results))
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error in batch %s lookup: %s", entity, str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
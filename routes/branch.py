@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
@@ -7,19 +9,28 @@ import random
 
 from mock_data_storage import mock_storage
 from database import db_manager
+from response_cache import response_cache
 from models import BranchLocatorRequest, Branch, BranchLocatorResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/branch", tags=["branch"])
+router = APIRouter(prefix="/api/branch", tags=["branch"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/locate", response_model=BranchLocatorResponse)
-async def locate_branch(request: BranchLocatorRequest):
-    """Locate branches in a city"""
+async def locate_branch(request: BranchLocatorRequest, http_request: Request):
+    """Locate branches in a city, cached until the branches change (ETag / If-None-Match)"""
+    # Cities are matched case-insensitively
+    key = (request.branch_city.lower(), request.limit)
+    return await response_cache.serve(
+        http_request, "branch_locate", key, ("branches",), lambda: _locate_branch(request)
+    )
+
+
+async def _locate_branch(request: BranchLocatorRequest) -> BranchLocatorResponse:
     try:
         logger.info(
-            f"Branch locator request for city: {request.branch_city}, limit: {request.limit}"
+            "Branch locator request for city: %s, limit: %s", request.branch_city, request.limit
         )
 
         # Try to get from database first
@@ -56,7 +67,7 @@ async def locate_branch(request: BranchLocatorRequest):
                     )
 
                     logger.info(
-                        f"Branches located from database in city: {request.branch_city}"
+                        "Branches located from database in city: %s", request.branch_city
                     )
                     return response
 
@@ -90,7 +101,7 @@ async def locate_branch(request: BranchLocatorRequest):
             branches=branch_list, total_count=len(branch_list), status=Status.SUCCESS
         )
 
-        logger.info(f"Branches located from mock data in city: {request.branch_city}")
+        logger.info("Branches located from mock data in city: %s", request.branch_city)
         return response
 
     except HTTPException:
@@ -1,42 +1,84 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_write
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List, Dict, Any
 import logging
-import random
 
 from mock_data_storage import mock_storage
+from change_feed import change_feed, OP_UPDATE
 from database import db_manager
+from idempotency import idempotency_store
 from services.sms_service import sms_service, SMSTemplates
+from services.id_allocator import id_allocator
 from models import CardBlockRequest, CardBlockResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/card", tags=["card"])
+router = APIRouter(prefix="/api/card", tags=["card"], route_class=TimedRoute, dependencies=[Depends(require_write)])
+
+# Blocks the card only when exactly one card matches, using the (last4, account_number) index
+BLOCK_CARD_QUERY = """
+    WITH matches AS (
+        SELECT id FROM cards
+        WHERE last4 = $1 AND ($2::varchar IS NULL OR account_number = $2)
+    )
+    UPDATE cards SET card_status = 'BLOCKED'
+    WHERE id IN (SELECT id FROM matches)
+    AND (SELECT COUNT(*) FROM matches) = 1
+    RETURNING *
+"""
+
+MATCHING_CARDS_QUERY = """
+    SELECT card_number, account_number, card_type, card_network, card_status
+    FROM cards
+    WHERE last4 = $1 AND ($2::varchar IS NULL OR account_number = $2)
+"""
+
+
+def _raise_ambiguous(last4: str, cards: List[Dict[str, Any]]):
+    """Reject a block request that matches several cards, listing them so the caller can pick one"""
+    logger.warning(f"{len(cards)} cards found ending with: {last4}, asking caller to disambiguate")
+    raise HTTPException(
+        status_code=409,
+        detail={
+            "message": "Multiple cards match these digits. Please provide the account number to identify the card.",
+            "matches": [
+                {
+                    "card_number": f"****{card['card_number'][-4:]}",
+                    "account_number": f"******{card['account_number'][-4:]}",
+                    "card_type": card["card_type"],
+                    "card_network": card["card_network"],
+                    "card_status": card["card_status"],
+                }
+                for card in cards
+            ],
+        },
+    )
 
 
 @router.post("/block", response_model=CardBlockResponse)
-async def block_card(request: CardBlockRequest):
-    """Block a card"""
+async def block_card(request: CardBlockRequest, http_request: Request):
+    """Block a card; retries with the same Idempotency-Key block it once"""
+    return await idempotency_store.run(http_request, lambda: _block_card(request))
+
+
+async def _block_card(request: CardBlockRequest) -> CardBlockResponse:
     try:
-        logger.info(f"Card block request for card ending with: {request.last4}")
+        logger.info("Card block request for card ending with: %s", request.last4)
 
-        # Try to get from database first
+        # Try to block in the database first, in a single statement
         async with db_manager.get_connection() as conn:
             if conn:
                 card = await conn.fetchrow(
-                    "SELECT * FROM cards WHERE card_number LIKE $1", f"%{request.last4}"
+                    BLOCK_CARD_QUERY, request.last4, request.account_number
                 )
                 if card:
+                    change_feed.publish("cards", OP_UPDATE, mock_storage.record_key("cards", card), {"card_status": "BLOCKED"})
                     # Simulate card blocking process
                     blocked_at = datetime.now()
-                    ticket_id = f"BLOCK{random.randint(10000, 99999)}"
-
-                    # Update card status in database
-                    await conn.execute(
-                        "UPDATE cards SET card_status = $1 WHERE card_number LIKE $2",
-                        "BLOCKED",
-                        f"%{request.last4}",
-                    )
+                    ticket_id = id_allocator.next_id("BLOCK")
 
                     response = CardBlockResponse(
                         card_number=f"****{request.last4}",
@@ -47,15 +89,25 @@ async def block_card(request: CardBlockRequest):
                     )
 
                     logger.info(
-                        f"Card blocked in database for card ending with: {request.last4}"
+                        "Card blocked in database for card ending with: %s", request.last4
                     )
                     return response
 
+                # Nothing was blocked: either no card matches or several do
+                matches = await conn.fetch(
+                    MATCHING_CARDS_QUERY, request.last4, request.account_number
+                )
+                if len(matches) > 1:
+                    _raise_ambiguous(request.last4, [dict(m) for m in matches])
+
         # Fallback to mock data
-        card = mock_storage.get_card_by_last4(request.last4)
-        if not card:
+        cards = mock_storage.get_cards_by_last4(request.last4, request.account_number)
+        if not cards:
             logger.warning(f"Card not found ending with: {request.last4}")
             raise HTTPException(status_code=404, detail="Card not found")
+        if len(cards) > 1:
+            _raise_ambiguous(request.last4, cards)
+        card = cards[0]
 
         # Get account details to retrieve customer info and mobile numbers
         account = mock_storage.get_account_by_number(card["account_number"])
@@ -65,10 +117,10 @@ async def block_card(request: CardBlockRequest):
 
         # Simulate card blocking process
         blocked_at = datetime.now()
-        ticket_id = f"BLOCK{random.randint(10000, 99999)}"
+        ticket_id = id_allocator.next_id("BLOCK")
 
-        # Update card status in mock data
-        card["card_status"] = "BLOCKED"
+        # Update card status in mock data (visible to every worker)
+        mock_storage.update_record("cards", card, {"card_status": "BLOCKED"})
 
         # Send SMS notification to customer if account and mobile numbers are available
         if account and account.get("mobile_numbers") and sms_service.is_enabled():
@@ -87,7 +139,10 @@ async def block_card(request: CardBlockRequest):
             )
             
             if sms_result["success"]:
-                logger.info(f"SMS notification sent for card block {ticket_id} to {len(sms_result['successful_sends'])} numbers")
+                logger.info(
+                    "SMS notification sent for card block %s to %s numbers",
+                    ticket_id, len(sms_result['successful_sends']),
+                )
             else:
                 logger.warning(f"Failed to send SMS notification for card block {ticket_id}")
         else:
@@ -106,7 +161,7 @@ async def block_card(request: CardBlockRequest):
             status=Status.SUCCESS,
         )
 
-        logger.info(f"Card blocked in mock data for card ending with: {request.last4}")
+        logger.info("Card blocked in mock data for card ending with: %s", request.last4)
         return response
 
     except HTTPException:
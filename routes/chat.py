@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from typing import Dict, Any
 import logging
@@ -9,14 +11,14 @@ from models import Intent
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/chat", tags=["chat"])
+router = APIRouter(prefix="/api/chat", tags=["chat"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/intent")
 async def process_intent(request: Dict[str, Any]):
     """Process natural language intent (placeholder for NLU integration)"""
     try:
-        logger.info(f"Intent processing request: {request}")
+        logger.info("Intent processing request: %s", request)
 
         # This is a placeholder for actual NLU processing
         # In a real implementation, this would integrate with a natural language understanding service
@@ -58,7 +60,7 @@ async def process_intent(request: Dict[str, Any]):
             "session_id": request.get("session_id", str(uuid.uuid4())),
         }
 
-        logger.info(f"Intent detected: {intent.value}")
+        logger.info("Intent detected: %s", intent.value)
         return response
 
     except Exception as e:
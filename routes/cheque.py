@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 import logging
@@ -17,14 +19,14 @@ from database import db_manager
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/cheque", tags=["cheque"])
+router = APIRouter(prefix="/api/cheque", tags=["cheque"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/status", response_model=ChequeStatusResponse)
 async def get_cheque_status(request: ChequeStatusRequest):
     """Get cheque status"""
     try:
-        logger.info(f"Cheque status request for cheque number: {request.cheque_number}")
+        logger.info("Cheque status request for cheque number: %s", request.cheque_number)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -48,7 +50,7 @@ async def get_cheque_status(request: ChequeStatusRequest):
                             status=Status.SUCCESS,
                         )
                         logger.info(
-                            f"Cheque status retrieved from database for cheque number: {request.cheque_number}"
+                            "Cheque status retrieved from database for cheque number: %s", request.cheque_number
                         )
                         return response
                 except Exception as e:
@@ -67,7 +69,7 @@ async def get_cheque_status(request: ChequeStatusRequest):
                         status=Status.SUCCESS,
                     )
                     logger.info(
-                        f"Cheque status retrieved from mock data for cheque number: {request.cheque_number}"
+                        "Cheque status retrieved from mock data for cheque number: %s", request.cheque_number
                     )
                     return response
             else:
@@ -85,7 +87,7 @@ async def get_cheque_status(request: ChequeStatusRequest):
                     status=Status.SUCCESS,
                 )
                 logger.info(
-                    f"Cheque status retrieved from mock data for cheque number: {request.cheque_number}"
+                    "Cheque status retrieved from mock data for cheque number: %s", request.cheque_number
                 )
                 return response
 
@@ -105,7 +107,7 @@ async def get_cheque_status(request: ChequeStatusRequest):
         )
 
         logger.info(
-            f"Cheque status retrieved from mock data for cheque number: {request.cheque_number}"
+            "Cheque status retrieved from mock data for cheque number: %s", request.cheque_number
         )
         return response
 
@@ -121,7 +123,7 @@ async def get_cheque_status(request: ChequeStatusRequest):
 async def track_cheque(request: ChequeTrackingRequest):
     """Track a cheque's journey and current status"""
     try:
-        logger.info(f"Cheque tracking request for cheque: {request.cheque_number}")
+        logger.info("Cheque tracking request for cheque: %s", request.cheque_number)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -194,7 +196,7 @@ async def track_cheque(request: ChequeTrackingRequest):
                     )
 
                     logger.info(
-                        f"Cheque tracking details retrieved for {request.cheque_number}"
+                        "Cheque tracking details retrieved for %s", request.cheque_number
                     )
                     return response
 
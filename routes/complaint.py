@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_read, require_write
 from pydantic import BaseModel
 from datetime import datetime
 import logging
@@ -6,7 +8,10 @@ import random
 
 from mock_data_storage import mock_storage
 from database import db_manager
+from idempotency import idempotency_store
 from services.sms_service import sms_service, SMSTemplates
+from services.id_allocator import id_allocator
+from services.ticket_writer import ticket_writer
 from models import (
     ComplaintRequest,
     ComplaintStatusRequest,
@@ -17,7 +22,7 @@ from models import (
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/complaint", tags=["complaint"])
+router = APIRouter(prefix="/api/complaint", tags=["complaint"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 # Configuration for complaint priority and resolution time
@@ -36,11 +41,15 @@ COMPLAINT_CONFIG = {
 }
 
 
-@router.post("/new", response_model=ComplaintResponse)
-async def create_complaint(request: ComplaintRequest):
-    """Create a new complaint"""
+@router.post("/new", response_model=ComplaintResponse, dependencies=[Depends(require_write)])
+async def create_complaint(request: ComplaintRequest, http_request: Request):
+    """Create a new complaint; retries with the same Idempotency-Key create it once"""
+    return await idempotency_store.run(http_request, lambda: _create_complaint(request))
+
+
+async def _create_complaint(request: ComplaintRequest) -> ComplaintResponse:
     try:
-        logger.info(f"Complaint creation request for account: {request.account_number}")
+        logger.info("Complaint creation request for account: %s", request.account_number)
 
         # Get account details to retrieve customer info and mobile numbers
         account = mock_storage.get_account_by_number(request.account_number)
@@ -53,50 +62,47 @@ async def create_complaint(request: ComplaintRequest):
         priority = config["priority"]
         estimated_days = config["days"]
 
-        # Create a new complaint data dict
+        # Create the complaint record
+        ticket_id = id_allocator.next_id("COMPLAINT")
         complaint_data = {
+            "ticket_id": ticket_id,
             "account_number": request.account_number,
             "subject": request.subject,
             "description": request.description,
             "category": request.category,
+            "status": "OPEN",
             "priority": priority,
-            "estimated_resolution_days": estimated_days
+            "created_at": datetime.now().isoformat(),
+            "resolved_at": None,
+            "estimated_resolution_days": estimated_days,
+            "assigned_agent": None,
+            "resolution_notes": None,
+            "customer_satisfaction": None
         }
 
-        # Add to mock storage using the proper method
-        new_complaint_dict = mock_storage.add_complaint(complaint_data)
-        new_complaint = Complaint(**new_complaint_dict)
-
-        # Send SMS notification to customer
-        if account.get("mobile_numbers") and sms_service.is_enabled():
-            customer_name = account.get("customer_name", "Customer")
-            sms_message = SMSTemplates.complaint_confirmation(
-                new_complaint.ticket_id,
-                customer_name
-            )
-            
-            # Send SMS to all mobile numbers
-            sms_result = await sms_service.send_bulk_sms(
-                account["mobile_numbers"],
-                sms_message
-            )
-            
-            if sms_result["success"]:
-                logger.info(f"SMS notification sent for complaint {new_complaint.ticket_id} to {len(sms_result['successful_sends'])} numbers")
-            else:
-                logger.warning(f"Failed to send SMS notification for complaint {new_complaint.ticket_id}")
+        # SMS confirmation, sent once the complaint is committed
+        notification = None
+        if account.get("mobile_numbers"):
+            notification = {
+                "mobile_numbers": list(account["mobile_numbers"]),
+                "message": SMSTemplates.complaint_confirmation(
+                    ticket_id,
+                    account.get("customer_name", "Customer")
+                ),
+            }
         else:
-            if not account.get("mobile_numbers"):
-                logger.warning(f"No mobile numbers found for account {request.account_number}")
-            if not sms_service.is_enabled():
-                logger.info("SMS service not enabled, skipping notification")
+            logger.warning(f"No mobile numbers found for account {request.account_number}")
+
+        # Persist to the database (with outbox notification), or mock storage as fallback
+        source = await ticket_writer.create_complaint(complaint_data, notification)
+        new_complaint = Complaint(**complaint_data)
 
         response = ComplaintResponse(
             complaint=new_complaint,
             status=Status.SUCCESS,
         )
 
-        logger.info(f"Complaint created successfully with ticket ID: {new_complaint.ticket_id}")
+        logger.info("Complaint created successfully in %s with ticket ID: %s", source, ticket_id)
         return response
 
     except HTTPException:
@@ -106,11 +112,11 @@ async def create_complaint(request: ComplaintRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/update-status", response_model=ComplaintResponse)
+@router.post("/update-status", response_model=ComplaintResponse, dependencies=[Depends(require_write)])
 async def update_complaint_status(request: ComplaintStatusRequest):
     """Update complaint status and send SMS notification if resolved"""
     try:
-        logger.info(f"Updating complaint status for ticket ID: {request.ticket_id}")
+        logger.info("Updating complaint status for ticket ID: %s", request.ticket_id)
         
         # Find the complaint in mock storage
         complaint_data = mock_storage.get_complaint_by_id(request.ticket_id)
@@ -153,7 +159,10 @@ async def update_complaint_status(request: ComplaintStatusRequest):
             )
             
             if sms_result["success"]:
-                logger.info(f"SMS notification sent for complaint resolution {request.ticket_id} to {len(sms_result['successful_sends'])} numbers")
+                logger.info(
+                    "SMS notification sent for complaint resolution %s to %s numbers",
+                    request.ticket_id, len(sms_result['successful_sends']),
+                )
             else:
                 logger.warning(f"Failed to send SMS notification for complaint resolution {request.ticket_id}")
         
@@ -163,7 +172,7 @@ async def update_complaint_status(request: ComplaintStatusRequest):
             status=Status.SUCCESS,
         )
         
-        logger.info(f"Complaint status updated successfully for ticket ID: {request.ticket_id}")
+        logger.info("Complaint status updated successfully for ticket ID: %s", request.ticket_id)
         return response
         
     except HTTPException:
@@ -177,7 +186,7 @@ async def update_complaint_status(request: ComplaintStatusRequest):
 async def get_complaint_status(request: ComplaintStatusRequest):
     """Get complaint status"""
     try:
-        logger.info(f"Complaint status request for ticket ID: {request.ticket_id}")
+        logger.info("Complaint status request for ticket ID: %s", request.ticket_id)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -198,7 +207,7 @@ async def get_complaint_status(request: ComplaintStatusRequest):
                         status=Status.SUCCESS,
                     )
                     logger.info(
-                        f"Complaint status retrieved from database for ticket ID: {request.ticket_id}"
+                        "Complaint status retrieved from database for ticket ID: %s", request.ticket_id
                     )
                     return response
 
@@ -216,7 +225,7 @@ async def get_complaint_status(request: ComplaintStatusRequest):
         )
 
         logger.info(
-            f"Complaint status retrieved from mock data for ticket ID: {request.ticket_id}"
+            "Complaint status retrieved from mock data for ticket ID: %s", request.ticket_id
         )
         return response
 
@@ -0,0 +1,218 @@
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
+from datetime import datetime
+import asyncio
+import logging
+
+from mock_data_storage import mock_storage
+from database import db_manager
+from models import (
+    CustomerSnapshotRequest,
+    CustomerSnapshotResponse,
+    AccountSnapshot,
+    Transaction,
+    CardSummary,
+    LoanInfo,
+    Complaint,
+    DisputeSummary,
+    Status,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/customer", tags=["customer"], route_class=TimedRoute, dependencies=[Depends(require_read)])
+
+CLOSED_COMPLAINT_STATUSES = {"RESOLVED", "CLOSED"}
+CLOSED_DISPUTE_STATUSES = {"APPROVED", "REJECTED", "RESOLVED"}
+
+
+def _iso(value):
+    """Render database datetimes as ISO strings, pass mock strings through"""
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+async def _fetch(query: str, *args):
+    """Run a query on its own pooled connection so several can run concurrently"""
+    async with db_manager.get_connection() as conn:
+        if not conn:
+            return None
+        return [dict(record) for record in await conn.fetch(query, *args)]
+
+
+async def _get_snapshot_from_db(account_number: str, transaction_limit: int):
+    """Fetch every entity of the snapshot concurrently from the database"""
+    results = await asyncio.gather(
+        _fetch("SELECT * FROM accounts WHERE account_number = $1", account_number),
+        _fetch(
+            "SELECT * FROM transactions WHERE account_number = $1 ORDER BY transaction_date DESC LIMIT $2",
+            account_number,
+            transaction_limit,
+        ),
+        _fetch("SELECT * FROM cards WHERE account_number = $1", account_number),
+        _fetch("SELECT * FROM loans WHERE account_number = $1", account_number),
+        _fetch(
+            "SELECT * FROM complaints WHERE account_number = $1 AND status <> ALL($2::text[])",
+            account_number,
+            list(CLOSED_COMPLAINT_STATUSES),
+        ),
+        _fetch(
+            "SELECT * FROM disputes WHERE account_number = $1 AND status <> ALL($2::text[])",
+            account_number,
+            list(CLOSED_DISPUTE_STATUSES),
+        ),
+        return_exceptions=True,
+    )
+
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Snapshot query failed, falling back to mock data: %s", result)
+            return None
+        if result is None:
+            # No pooled connection for one of the queries
+            logger.warning("Snapshot query got no database connection, falling back to mock data")
+            return None
+
+    accounts, transactions, cards, loans, complaints, disputes = results
+    if not accounts:
+        return None
+
+    for tx in transactions:
+        tx["id"] = tx["transaction_id"]
+    return accounts[0], transactions, cards, loans, complaints, disputes
+
+
+def _get_snapshot_from_mock(account_number: str, transaction_limit: int):
+    """Collect every entity of the snapshot from mock storage"""
+    account = mock_storage.get_account_by_number(account_number)
+    if not account:
+        return None
+
+    return (
+        account,
+        mock_storage.get_transactions_by_account(account_number, transaction_limit),
+        mock_storage.get_cards_by_account(account_number),
+        mock_storage.get_loans_by_account(account_number),
+        [
+            c
+            for c in mock_storage.get_complaints_by_account(account_number)
+            if c["status"] not in CLOSED_COMPLAINT_STATUSES
+        ],
+        [
+            d
+            for d in mock_storage.get_disputes_by_account(account_number)
+            if d["status"] not in CLOSED_DISPUTE_STATUSES
+        ],
+    )
+
+
+@router.post("/snapshot", response_model=CustomerSnapshotResponse)
+async def get_customer_snapshot(request: CustomerSnapshotRequest):
+    """Get account, recent transactions, cards, loans, open complaints and disputes in one call"""
+    try:
+        logger.info("Customer snapshot request for account: %s", request.account_number)
+
+        source = "database"
+        snapshot = None
+        if db_manager.pool:
+            snapshot = await _get_snapshot_from_db(
+                request.account_number, request.transaction_limit
+            )
+
+        # Fallback to mock data
+        if not snapshot:
+            source = "mock"
+            snapshot = _get_snapshot_from_mock(
+                request.account_number, request.transaction_limit
+            )
+        if not snapshot:
+            logger.warning("Account not found: %s", request.account_number)
+            raise HTTPException(status_code=404, detail="Account not found")
+
+        account, transactions, cards, loans, complaints, disputes = snapshot
+
+        response = CustomerSnapshotResponse(
+            account=AccountSnapshot(
+                account_number=f"******{request.account_number[-4:]}",
+                account_type=account["account_type"],
+                customer_name=account["customer_name"],
+                balance=float(account["balance"]),
+                currency=account["currency"],
+                account_status=account["account_status"],
+                kyc_status=account["kyc_status"],
+                kyc_level=account["kyc_level"],
+                last_updated=_iso(account["last_updated"]),
+            ),
+            transactions=[
+                Transaction(
+                    id=tx["id"],
+                    date=_iso(tx["transaction_date"]),
+                    description=tx["description"],
+                    amount=float(tx["amount"]),
+                    type=tx["type"],
+                    balance_after=float(tx["balance_after"]),
+                )
+                for tx in transactions
+            ],
+            cards=[
+                CardSummary(
+                    card_number=f"****{card['card_number'][-4:]}",
+                    card_type=card["card_type"],
+                    card_network=card["card_network"],
+                    card_status=card["card_status"],
+                    expiry_date=card["expiry_date"],
+                )
+                for card in cards
+            ],
+            loans=[
+                LoanInfo(
+                    loan_id=loan["loan_id"],
+                    loan_type=loan["loan_type"],
+                    principal=float(loan["principal"]),
+                    emi_amount=float(loan["emi_amount"]),
+                    due_date=_iso(loan["next_emi_date"]),
+                    remaining_tenure=loan["remaining_tenure"],
+                    interest_rate=float(loan["interest_rate"]),
+                    status=loan["status"],
+                )
+                for loan in loans
+            ],
+            open_complaints=[
+                Complaint(
+                    **{
+                        **complaint,
+                        "created_at": _iso(complaint["created_at"]),
+                        "resolved_at": _iso(complaint.get("resolved_at")),
+                    }
+                )
+                for complaint in complaints
+            ],
+            open_disputes=[
+                DisputeSummary(
+                    ticket_id=dispute["ticket_id"],
+                    amount=float(dispute["amount"]),
+                    dispute_type=dispute["dispute_type"],
+                    status=dispute["status"],
+                    created_at=_iso(dispute["created_at"]),
+                    estimated_resolution_days=dispute["estimated_resolution_days"],
+                )
+                for dispute in disputes
+            ],
+            source=source,
+            status=Status.SUCCESS,
+        )
+
+        logger.info(
+            "Customer snapshot retrieved from %s for account: %s", source, request.account_number
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            "Error getting customer snapshot for account %s: %s", request.account_number, str(e)
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
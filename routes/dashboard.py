@@ -1,24 +1,44 @@
 from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from metrics import TimedRoute
 from datetime import datetime
 import json
 import os
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+from change_feed import change_feed
 from mock_data_storage import mock_storage
 from database import db_manager
+from services.aggregation_service import aggregation_service, AGGREGATIONS
+from static_assets import static_assets, CACHE_REVALIDATE
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["dashboard"], route_class=TimedRoute)
 templates = Jinja2Templates(directory="templates")
 
+# Seconds between shared state checks, and between keep-alive comments, on an idle change feed
+CHANGE_FEED_POLL_INTERVAL = 1.0
+CHANGE_FEED_KEEPALIVE = 15.0
+
 
 def get_mock_data(data_type: str, limit: int = 100) -> List[Dict[str, Any]]:
     """Get mock data with a limit on records"""
     data = []
+    # Prefer the memory-mapped snapshot: only the requested rows are decoded
+    if data_type in mock_storage.data_files:
+        snapshot = mock_storage.query_snapshot(data_type)
+        if snapshot:
+            data = snapshot.rows(range(min(limit, len(snapshot))))
+            logger.info("Loaded %s %s records from snapshot", len(data), data_type)
+            return data
+        # Otherwise serve the in-memory collection, which includes runtime changes from every worker
+        data = [dict(record) for record in getattr(mock_storage, data_type)[:limit]]
+        logger.info("Loaded %s %s records from mock storage", len(data), data_type)
+        return data
+
     file_path = f"mock_data/{data_type}.json"
     
     if not os.path.exists(file_path):
@@ -32,7 +52,7 @@ def get_mock_data(data_type: str, limit: int = 100) -> List[Dict[str, Any]]:
             full_data = json.loads(content)
             # Limit the results
             data = full_data[:limit] if isinstance(full_data, list) else []
-            logger.info(f"Loaded {len(data)} {data_type} records from mock data")
+            logger.info("Loaded %s %s records from mock data", len(data), data_type)
             return data
     except json.JSONDecodeError as e:
         logger.error(f"Error parsing JSON from {file_path}: {str(e)}")
@@ -67,7 +87,7 @@ async def get_db_data(data_type: str, limit: int = 100) -> List[Dict[str, Any]]:
                 query = f"SELECT * FROM {table_name} LIMIT {limit}"
                 records = await conn.fetch(query)
                 data = [dict(record) for record in records]
-                logger.info(f"Loaded {len(data)} {data_type} records from database")
+                logger.info("Loaded %s %s records from database", len(data), data_type)
                 return data
         return []
     except Exception as e:
@@ -77,11 +97,11 @@ async def get_db_data(data_type: str, limit: int = 100) -> List[Dict[str, Any]]:
 
 @router.get("/api", response_class=JSONResponse)
 async def dashboard_api(
-    source: str = "mock", data_type: str = "accounts"
+    source: str = "mock", data_type: str = "accounts", limit: Optional[int] = None
 ):
-    """API endpoint for dashboard data"""
+    """API endpoint for dashboard data; `limit` returns only the first records"""
     try:
-        logger.info(f"Dashboard API request: source={source}, data_type={data_type}")
+        logger.info("Dashboard API request: source=%s, data_type=%s", source, data_type)
         
         # Get data based on source
         if source == "mock":
@@ -93,8 +113,10 @@ async def dashboard_api(
             logger.warning(f"No data found for {data_type} from {source}")
             # Return empty data instead of error
             data = []
+        if limit is not None:
+            data = data[:max(limit, 0)]
 
-        logger.info(f"Returning {len(data)} records for {data_type}")
+        logger.info("Returning %s records for %s", len(data), data_type)
         return {
             "data": data,
             "data_type": data_type,
@@ -109,38 +131,112 @@ async def dashboard_api(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/", response_class=HTMLResponse)
-async def dashboard(
-    request: Request, source: str = "mock", data_type: str = "accounts"
-):
-    """Endpoint for viewing data in a sophisticated table"""
+@router.get("/api/aggregates", response_class=JSONResponse)
+async def dashboard_aggregates(source: str = "mock", names: Optional[str] = None):
+    """Group-by counts and sums over the full datasets, for the dashboard charts
+
+    `names` is a comma-separated subset of the aggregations; all by default.
+    """
     try:
-        logger.info(f"Dashboard request: source={source}, data_type={data_type}")
-        
-        # Get data based on source
-        if source == "mock":
-            data = get_mock_data(data_type)
-        else:
-            data = await get_db_data(data_type)
+        logger.info("Dashboard aggregates request: source=%s, names=%s", source, names)
 
-        if not data:
-            logger.warning(f"No data found for {data_type} from {source}")
-            # Return empty data instead of error
-            data = []
+        selected = [n.strip() for n in names.split(",") if n.strip()] if names else list(AGGREGATIONS)
+        unknown = [n for n in selected if n not in AGGREGATIONS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown aggregations: {', '.join(unknown)}")
 
-        logger.info(f"Returning {len(data)} records for {data_type}")
-        return templates.TemplateResponse(
-            "dashboard.html",
-            {
-                "request": request,
-                "data": data,
-                "data_type": data_type,
-                "source": source,
-                "timestamp": datetime.now().isoformat(),
-            },
-        )
+        return {
+            "aggregates": await aggregation_service.aggregate_many(selected, source),
+            "source": source,
+            "timestamp": datetime.now().isoformat(),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in dashboard aggregates: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/api/aggregates/{name}", response_class=JSONResponse)
+async def dashboard_aggregate(name: str, source: str = "mock"):
+    """One aggregation: groups of the collection with their record count and total"""
+    try:
+        if name not in AGGREGATIONS:
+            raise HTTPException(status_code=404, detail=f"Unknown aggregation: {name}")
+
+        collection, fields, sum_field = AGGREGATIONS[name]
+        return {
+            "name": name,
+            "collection": collection,
+            "group_by": list(fields),
+            "sum": sum_field,
+            "groups": await aggregation_service.aggregate(name, source),
+            "source": source,
+            "timestamp": datetime.now().isoformat(),
+        }
     except HTTPException:
         raise
+    except Exception as e:
+        logger.error(f"Error in dashboard aggregate {name}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/api/changes")
+async def dashboard_changes(request: Request, collections: Optional[str] = None):
+    """Server-Sent Events stream of row-level changes, for incremental dashboard updates
+
+    `collections` is a comma-separated filter (e.g. `complaints,cards`).
+    Each `change` event carries the collection, the op (insert, update,
+    upsert), the record key and the record or changed fields; a `reset` op
+    means events were missed and the client should refetch. Reconnecting
+    clients resume from their `Last-Event-ID`.
+    """
+    try:
+        selected = [c.strip() for c in collections.split(",") if c.strip()] if collections else None
+        subscription = change_feed.subscribe(selected, request.headers.get("last-event-id"))
+        logger.info("Change feed subscriber connected: collections=%s, total=%s", collections, change_feed.subscribers)
+    except Exception as e:
+        logger.error(f"Error subscribing to change feed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    async def stream():
+        try:
+            # Reconnect quickly after a dropped connection
+            yield b"retry: 3000\n\n"
+            idle = 0.0
+            while True:
+                event = await subscription.next(CHANGE_FEED_POLL_INTERVAL)
+                if event:
+                    idle = 0.0
+                    yield event.frame
+                    continue
+                if mock_storage.shared_state:
+                    # Publishes the changes other workers made
+                    mock_storage.shared_state.sync()
+                idle += CHANGE_FEED_POLL_INTERVAL
+                if idle >= CHANGE_FEED_KEEPALIVE:
+                    idle = 0.0
+                    yield b": keep-alive\n\n"
+        finally:
+            change_feed.unsubscribe(subscription)
+            logger.info("Change feed subscriber disconnected: total=%s", change_feed.subscribers)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/", response_class=HTMLResponse)
+async def dashboard(request: Request):
+    """The dashboard page: a static shell, rendered once, that loads its data from the JSON API"""
+    try:
+        page = static_assets.page(
+            "dashboard.html",
+            lambda asset_url: templates.get_template("dashboard.html").render(asset_url=asset_url),
+        )
+        return page.response(request, CACHE_REVALIDATE)
     except Exception as e:
         logger.error(f"Error in dashboard: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_write
 from pydantic import BaseModel
 from datetime import datetime
 import logging
 import random
 
 from mock_data_storage import mock_storage
+from idempotency import idempotency_store
 from services.sms_service import sms_service, SMSTemplates
+from services.id_allocator import id_allocator
+from services.ticket_writer import ticket_writer
 from models import DisputeRequest, DisputeResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/dispute", tags=["dispute"])
+router = APIRouter(prefix="/api/dispute", tags=["dispute"], route_class=TimedRoute, dependencies=[Depends(require_write)])
 
 
 @router.post("/raise", response_model=DisputeResponse)
-async def raise_dispute(request: DisputeRequest):
-    """Raise a transaction dispute"""
+async def raise_dispute(request: DisputeRequest, http_request: Request):
+    """Raise a transaction dispute; retries with the same Idempotency-Key raise it once"""
+    return await idempotency_store.run(http_request, lambda: _raise_dispute(request))
+
+
+async def _raise_dispute(request: DisputeRequest) -> DisputeResponse:
     try:
         logger.info(
-            f"Dispute request for account: {request.account_number}, amount: {request.amount}, date: {request.transaction_date}"
+            "Dispute request for account: %s, amount: %s, date: %s",
+            request.account_number, request.amount, request.transaction_date
         )
 
         # Get account details to retrieve customer info and mobile numbers
@@ -28,10 +38,10 @@ async def raise_dispute(request: DisputeRequest):
             raise HTTPException(status_code=404, detail="Account not found")
 
         # Generate dispute ticket
-        ticket_id = f"DISPUTE{random.randint(10000, 99999)}"
+        ticket_id = id_allocator.next_id("DISPUTE")
         estimated_days = random.randint(5, 30)
 
-        # Create dispute record for mock storage
+        # Create dispute record
         dispute_data = {
             "ticket_id": ticket_id,
             "account_number": request.account_number,
@@ -50,34 +60,24 @@ async def raise_dispute(request: DisputeRequest):
             "evidence_submitted": "NO",
             "customer_contacted": "YES"
         }
-        
-        # Add to mock storage for future retrieval
-        mock_storage.disputes.append(dispute_data)
-
-        # Send SMS notification to customer
-        if account.get("mobile_numbers") and sms_service.is_enabled():
-            customer_name = account.get("customer_name", "Customer")
-            sms_message = SMSTemplates.dispute_confirmation(
-                ticket_id,
-                customer_name,
-                request.amount
-            )
-            
-            # Send SMS to all mobile numbers
-            sms_result = await sms_service.send_bulk_sms(
-                account["mobile_numbers"],
-                sms_message
-            )
-            
-            if sms_result["success"]:
-                logger.info(f"SMS notification sent for dispute {ticket_id} to {len(sms_result['successful_sends'])} numbers")
-            else:
-                logger.warning(f"Failed to send SMS notification for dispute {ticket_id}")
+
+
+        # SMS confirmation, sent once the dispute is committed
+        notification = None
+        if account.get("mobile_numbers"):
+            notification = {
+                "mobile_numbers": list(account["mobile_numbers"]),
+                "message": SMSTemplates.dispute_confirmation(
+                    ticket_id,
+                    account.get("customer_name", "Customer"),
+                    request.amount
+                ),
+            }
         else:
-            if not account.get("mobile_numbers"):
-                logger.warning(f"No mobile numbers found for account {request.account_number}")
-            if not sms_service.is_enabled():
-                logger.info("SMS service not enabled, skipping notification")
+            logger.warning(f"No mobile numbers found for account {request.account_number}")
+
+        # Persist to the database (with outbox notification), or mock storage as fallback
+        source = await ticket_writer.create_dispute(dispute_data, notification)
 
         response = DisputeResponse(
             ticket_id=ticket_id,
@@ -87,7 +87,7 @@ async def raise_dispute(request: DisputeRequest):
             status=Status.SUCCESS,
         )
 
-        logger.info(f"Dispute raised successfully with ticket ID: {ticket_id}")
+        logger.info("Dispute raised successfully in %s with ticket ID: %s", source, ticket_id)
         return response
 
     except HTTPException:
@@ -101,7 +101,7 @@ async def raise_dispute(request: DisputeRequest):
 async def update_dispute_status(ticket_id: str, new_status: str):
     """Update dispute status and send SMS notification if resolved"""
     try:
-        logger.info(f"Updating dispute status for ticket ID: {ticket_id}")
+        logger.info("Updating dispute status for ticket ID: %s", ticket_id)
         
         # Find the dispute in mock storage
         dispute_data = mock_storage.get_dispute_by_id(ticket_id)
@@ -117,12 +117,13 @@ async def update_dispute_status(ticket_id: str, new_status: str):
         
         # Update dispute status
         original_status = dispute_data["status"]
-        dispute_data["status"] = new_status.upper()
+        update_data = {"status": new_status.upper()}
+        if new_status.upper() in ["APPROVED", "REJECTED", "RESOLVED"]:
+            update_data["resolved_at"] = datetime.now().isoformat()
+            update_data["resolution_notes"] = f"Dispute has been {new_status.lower()}"
+        mock_storage.update_dispute(ticket_id, update_data)
         
         if new_status.upper() in ["APPROVED", "REJECTED", "RESOLVED"]:
-            dispute_data["resolved_at"] = datetime.now().isoformat()
-            dispute_data["resolution_notes"] = f"Dispute has been {new_status.lower()}"
-            
             # Send SMS notification if status changed to resolved
             if original_status != new_status.upper() and account.get("mobile_numbers") and sms_service.is_enabled():
                 customer_name = account.get("customer_name", "Customer")
@@ -139,11 +140,14 @@ async def update_dispute_status(ticket_id: str, new_status: str):
                 )
                 
                 if sms_result["success"]:
-                    logger.info(f"SMS notification sent for dispute resolution {ticket_id} to {len(sms_result['successful_sends'])} numbers")
+                    logger.info(
+                        "SMS notification sent for dispute resolution %s to %s numbers",
+                        ticket_id, len(sms_result['successful_sends']),
+                    )
                 else:
                     logger.warning(f"Failed to send SMS notification for dispute resolution {ticket_id}")
         
-        logger.info(f"Dispute status updated successfully for ticket ID: {ticket_id}")
+        logger.info("Dispute status updated successfully for ticket ID: %s", ticket_id)
         return {
             "ticket_id": ticket_id,
             "status": new_status.upper(),
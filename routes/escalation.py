@@ -1,25 +1,48 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_read, require_write
 from pydantic import BaseModel
 from datetime import datetime
 import logging
 import random
 
+from change_feed import change_feed, OP_INSERT
+from response_cache import response_cache
 from models import SpeakToAgentRequest, EscalationResponse, Status, AgentInfo
 from services.agent_service import agent_service
+from services.id_allocator import id_allocator
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api", tags=["escalation"])
+router = APIRouter(prefix="/api", tags=["escalation"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
-@router.post("/escalate", response_model=EscalationResponse)
+def _publish_escalation(response: EscalationResponse, request: SpeakToAgentRequest) -> None:
+    """Announce an escalation on the change feed (escalations are not stored)"""
+    change_feed.publish(
+        "escalations",
+        OP_INSERT,
+        response.escalation_id,
+        {
+            "escalation_id": response.escalation_id,
+            "agent_id": response.agent_info.agent_id,
+            "agent_name": response.agent_info.full_name,
+            "reason": request.reason,
+            "urgency": request.urgency,
+            "estimated_wait_time": response.estimated_wait_time,
+            "queue_position": response.queue_position,
+        },
+    )
+
+
+@router.post("/escalate", response_model=EscalationResponse, dependencies=[Depends(require_write)])
 async def escalate_to_agent(request: SpeakToAgentRequest):
     """Escalate to human agent with intelligent agent selection"""
     try:
-        logger.info(f"Escalation request received - Reason: {request.reason}, Urgency: {request.urgency}")
+        logger.info("Escalation request received - Reason: %s, Urgency: %s", request.reason, request.urgency)
 
         # Generate escalation ID
-        escalation_id = f"ESCALATION{random.randint(10000, 99999)}"
+        escalation_id = id_allocator.next_id("ESCALATION")
         
         # Determine specialization based on reason (if provided)
         specialization = None
@@ -69,7 +92,11 @@ async def escalate_to_agent(request: SpeakToAgentRequest):
                         status=Status.SUCCESS,
                     )
                     
-                    logger.info(f"Escalation queued with agent {soonest_available.full_name}, wait time: {wait_minutes} minutes")
+                    _publish_escalation(response, request)
+                    logger.info(
+                        "Escalation queued with agent %s, wait time: %s minutes",
+                        soonest_available.full_name, wait_minutes,
+                    )
                     return response
             
             # No agents at all
@@ -91,7 +118,8 @@ async def escalate_to_agent(request: SpeakToAgentRequest):
             status=Status.SUCCESS,
         )
 
-        logger.info(f"Escalation created successfully - Agent: {best_agent.full_name}, ID: {escalation_id}")
+        _publish_escalation(response, request)
+        logger.info("Escalation created successfully - Agent: %s, ID: %s", best_agent.full_name, escalation_id)
         return response
 
     except HTTPException:
@@ -102,8 +130,12 @@ async def escalate_to_agent(request: SpeakToAgentRequest):
 
 
 @router.get("/agents/statistics")
-async def get_agent_statistics():
-    """Get statistics about agents and their availability"""
+async def get_agent_statistics(request: Request):
+    """Get statistics about agents and their availability, cached until an agent changes"""
+    return await response_cache.serve(request, "agent_statistics", None, ("agents",), _get_agent_statistics)
+
+
+async def _get_agent_statistics():
     try:
         stats = agent_service.get_agent_statistics()
         logger.info("Retrieved agent statistics")
@@ -118,7 +150,7 @@ async def get_available_agents(specialization: str = None, limit: int = 10):
     """Get list of available agents, optionally filtered by specialization"""
     try:
         agents = agent_service.get_available_agents(specialization, limit)
-        logger.info(f"Retrieved {len(agents)} available agents for specialization: {specialization}")
+        logger.info("Retrieved %s available agents for specialization: %s", len(agents), specialization)
         return agents
     except Exception as e:
         logger.error(f"Error retrieving available agents: {str(e)}")
@@ -133,7 +165,7 @@ async def get_agent_details(agent_id: str):
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
         
-        logger.info(f"Retrieved details for agent: {agent_id}")
+        logger.info("Retrieved details for agent: %s", agent_id)
         return agent
     except HTTPException:
         raise
@@ -142,7 +174,7 @@ async def get_agent_details(agent_id: str):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.put("/agents/{agent_id}/status")
+@router.put("/agents/{agent_id}/status", dependencies=[Depends(require_write)])
 async def update_agent_status(agent_id: str, status: str):
     """Update agent availability status"""
     try:
@@ -154,7 +186,7 @@ async def update_agent_status(agent_id: str, status: str):
         if not success:
             raise HTTPException(status_code=404, detail="Agent not found")
         
-        logger.info(f"Updated agent {agent_id} status to: {status}")
+        logger.info("Updated agent %s status to: %s", agent_id, status)
         return {"message": f"Agent status updated to {status}"}
     except HTTPException:
         raise
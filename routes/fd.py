@@ -1,22 +1,32 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from datetime import datetime
 import logging
 
 from mock_data_storage import mock_storage
 from database import db_manager
+from response_cache import response_cache
 from models import FDRateInfoRequest, FDRate, FDRateInfoResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/fd", tags=["fd"])
+router = APIRouter(prefix="/api/fd", tags=["fd"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/rates", response_model=FDRateInfoResponse)
-async def get_fd_rates(request: FDRateInfoRequest):
-    """Get fixed deposit rates"""
+async def get_fd_rates(request: FDRateInfoRequest, http_request: Request):
+    """Get fixed deposit rates, cached until the rates change (ETag / If-None-Match)"""
+    # The amount does not affect the rates returned
+    return await response_cache.serve(
+        http_request, "fd_rates", request.tenure, ("fd_rates",), lambda: _get_fd_rates(request)
+    )
+
+
+async def _get_fd_rates(request: FDRateInfoRequest) -> FDRateInfoResponse:
     try:
-        logger.info(f"FD rates request for tenure: {request.tenure}")
+        logger.info("FD rates request for tenure: %s", request.tenure)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -51,7 +61,7 @@ async def get_fd_rates(request: FDRateInfoRequest):
                         status=Status.SUCCESS,
                     )
 
-                    logger.info(f"FD rates retrieved from database")
+                    logger.info("FD rates retrieved from database")
                     return response
 
         # Fallback to mock data
@@ -76,7 +86,7 @@ async def get_fd_rates(request: FDRateInfoRequest):
             status=Status.SUCCESS,
         )
 
-        logger.info(f"FD rates retrieved from mock data")
+        logger.info("FD rates retrieved from mock data")
         return response
 
     except Exception as e:
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
+import logging
+
+from services.kb_service import kb_service
+from models import KBSearchRequest, KBPassage, KBSearchResponse, Status
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/kb", tags=["kb"], route_class=TimedRoute, dependencies=[Depends(require_read)])
+
+MAX_TOP_K = 50
+
+
+@router.post("/search", response_model=KBSearchResponse)
+async def search_knowledge_base(request: KBSearchRequest):
+    """Search the FAQ, glossary and guides for the passages most relevant to a query"""
+    try:
+        logger.info("Knowledge base search: %r (top %s)", request.query, request.top_k)
+
+        if not request.query.strip():
+            raise HTTPException(status_code=400, detail="Query must not be empty")
+
+        top_k = min(max(request.top_k, 1), MAX_TOP_K)
+        results = [KBPassage(**passage) for passage in kb_service.search(request.query, top_k)]
+
+        return KBSearchResponse(
+            query=request.query,
+            results=results,
+            total_count=len(results),
+            status=Status.SUCCESS if results else Status.NOT_FOUND,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error searching knowledge base: %s", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
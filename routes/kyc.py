@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from datetime import datetime
 import logging
@@ -9,14 +11,14 @@ from models import KYCStatusRequest, KYCStatusResponse, Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/kyc", tags=["kyc"])
+router = APIRouter(prefix="/api/kyc", tags=["kyc"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/status", response_model=KYCStatusResponse)
 async def get_kyc_status(request: KYCStatusRequest):
     """Get KYC status"""
     try:
-        logger.info(f"KYC status request for account: {request.account_number}")
+        logger.info("KYC status request for account: %s", request.account_number)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -36,7 +38,7 @@ async def get_kyc_status(request: KYCStatusRequest):
                     )
 
                     logger.info(
-                        f"KYC status retrieved from database for account: {request.account_number}"
+                        "KYC status retrieved from database for account: %s", request.account_number
                     )
                     return response
 
@@ -56,7 +58,7 @@ async def get_kyc_status(request: KYCStatusRequest):
         )
 
         logger.info(
-            f"KYC status retrieved from mock data for account: {request.account_number}"
+            "KYC status retrieved from mock data for account: %s", request.account_number
         )
         return response
 
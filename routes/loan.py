@@ -1,22 +1,38 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
 from pydantic import BaseModel
 from datetime import datetime
 import logging
 
 from mock_data_storage import mock_storage
 from database import db_manager
-from models import LoanStatusRequest, LoanInfo, LoanStatusResponse, Status
+from services.loan_amortization import loan_amortization_service
+from models import (
+    LoanStatusRequest,
+    LoanInfo,
+    LoanStatusResponse,
+    LoanScheduleRequest,
+    LoanScheduleResponse,
+    LoanPortfolioRequest,
+    LoanPortfolioResponse,
+    LoanPrepaymentRequest,
+    LoanPrepaymentResponse,
+    LoanSummary,
+    AmortizationEntry,
+    Status,
+)
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/loan", tags=["loan"])
+router = APIRouter(prefix="/api/loan", tags=["loan"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 @router.post("/status", response_model=LoanStatusResponse)
 async def get_loan_status(request: LoanStatusRequest):
     """Get loan status"""
     try:
-        logger.info(f"Loan status request for loan ID: {request.loan_id}")
+        logger.info("Loan status request for loan ID: %s", request.loan_id)
 
         # Try to get from database first
         async with db_manager.get_connection() as conn:
@@ -43,7 +59,7 @@ async def get_loan_status(request: LoanStatusRequest):
                     )
 
                     logger.info(
-                        f"Loan status retrieved from database for loan ID: {request.loan_id}"
+                        "Loan status retrieved from database for loan ID: %s", request.loan_id
                     )
                     return response
 
@@ -71,7 +87,7 @@ async def get_loan_status(request: LoanStatusRequest):
         )
 
         logger.info(
-            f"Loan status retrieved from mock data for loan ID: {request.loan_id}"
+            "Loan status retrieved from mock data for loan ID: %s", request.loan_id
         )
         return response
 
@@ -82,3 +98,139 @@ async def get_loan_status(request: LoanStatusRequest):
             f"Error getting loan status for loan ID {request.loan_id}: {str(e)}"
         )
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+async def _fetch_loan(loan_id: str):
+    """Fetch a loan record from the database, falling back to mock data"""
+    async with db_manager.get_connection() as conn:
+        if conn:
+            loan = await conn.fetchrow("SELECT * FROM loans WHERE loan_id = $1", loan_id)
+            if loan:
+                return dict(loan)
+    return mock_storage.get_loan_by_id(loan_id)
+
+
+async def _fetch_account_loans(account_number: str):
+    """Fetch all loans of an account from the database, falling back to mock data"""
+    async with db_manager.get_connection() as conn:
+        if conn:
+            loans = await conn.fetch(
+                "SELECT * FROM loans WHERE account_number = $1 ORDER BY loan_id",
+                account_number,
+            )
+            if loans:
+                return [dict(loan) for loan in loans]
+    return mock_storage.get_loans_by_account(account_number)
+
+
+@router.post("/schedule", response_model=LoanScheduleResponse)
+async def get_loan_schedule(request: LoanScheduleRequest):
+    """Get the amortization schedule and repayment progress of a loan"""
+    try:
+        logger.info("Loan schedule request for loan ID: %s", request.loan_id)
+
+        loan = await _fetch_loan(request.loan_id)
+        if not loan:
+            logger.warning(f"Loan not found with ID: {request.loan_id}")
+            raise HTTPException(status_code=404, detail="Loan not found")
+
+        schedule = loan_amortization_service.get_schedule(loan)
+        rows = loan_amortization_service.schedule_to_rows(
+            schedule, start=max(request.start_month - 1, 0), limit=request.limit
+        )
+
+        response = LoanScheduleResponse(
+            summary=LoanSummary(**loan_amortization_service.summarize(loan, schedule)),
+            schedule=[AmortizationEntry(**row) for row in rows],
+            status=Status.SUCCESS,
+        )
+
+        logger.info("Loan schedule computed for loan ID: %s", request.loan_id)
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            f"Error computing loan schedule for loan ID {request.loan_id}: {str(e)}"
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/portfolio", response_model=LoanPortfolioResponse)
+async def get_loan_portfolio(request: LoanPortfolioRequest):
+    """Get repayment progress for all loans of an account"""
+    try:
+        logger.info("Loan portfolio request for account: %s", request.account_number)
+
+        loans = await _fetch_account_loans(request.account_number)
+        if not loans:
+            logger.warning(f"No loans found for account: {request.account_number}")
+            raise HTTPException(status_code=404, detail="No loans found for account")
+
+        summaries = loan_amortization_service.summarize_loans(loans)
+
+        response = LoanPortfolioResponse(
+            account_number=f"******{request.account_number[-4:]}",
+            loans=[LoanSummary(**summary) for summary in summaries],
+            total_outstanding_principal=round(
+                sum(s["outstanding_principal"] for s in summaries), 2
+            ),
+            total_monthly_emi=round(
+                sum(s["emi_amount"] for s in summaries if s["remaining_emis"] > 0), 2
+            ),
+            total_remaining_interest=round(
+                sum(s["remaining_interest"] for s in summaries), 2
+            ),
+            status=Status.SUCCESS,
+        )
+
+        logger.info(
+            "Loan portfolio computed for account: %s (%s loans)", request.account_number, len(summaries)
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            f"Error computing loan portfolio for account {request.account_number}: {str(e)}"
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/prepayment", response_model=LoanPrepaymentResponse)
+async def simulate_prepayment(request: LoanPrepaymentRequest):
+    """Simulate the impact of a lump-sum prepayment on a loan"""
+    try:
+        logger.info(
+            "Prepayment simulation for loan ID: %s, amount: %s, mode: %s",
+            request.loan_id, request.prepayment_amount, request.mode
+        )
+
+        loan = await _fetch_loan(request.loan_id)
+        if not loan:
+            logger.warning(f"Loan not found with ID: {request.loan_id}")
+            raise HTTPException(status_code=404, detail="Loan not found")
+
+        try:
+            scenario = loan_amortization_service.prepayment_scenario(
+                loan, request.prepayment_amount, request.mode
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        response = LoanPrepaymentResponse(**scenario, status=Status.SUCCESS)
+
+        logger.info(
+            "Prepayment simulated for loan ID: %s, interest saved: %s", request.loan_id, scenario['interest_saved']
+        )
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(
+            f"Error simulating prepayment for loan ID {request.loan_id}: {str(e)}"
+        )
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read
+import logging
+
+from services.prompt_service import prompt_service
+from models import PromptContextRequest, PromptContextResponse, Status
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/prompt", tags=["prompt"], route_class=TimedRoute, dependencies=[Depends(require_read)])
+
+MIN_TOKENS = 100
+MAX_TOKENS = 32000
+
+
+@router.post("/context", response_model=PromptContextResponse)
+async def get_prompt_context(request: PromptContextRequest):
+    """Compile the system prompt and knowledge base sections relevant to an intent within a token budget"""
+    try:
+        logger.info(
+            "Prompt context request: %s / %s / %s within %s tokens",
+            request.intent.value, request.channel.value, request.language_pref.value, request.max_tokens
+        )
+
+        if not MIN_TOKENS <= request.max_tokens <= MAX_TOKENS:
+            raise HTTPException(
+                status_code=400, detail=f"max_tokens must be between {MIN_TOKENS} and {MAX_TOKENS}"
+            )
+
+        compiled = prompt_service.compile(
+            request.intent, request.channel, request.language_pref, request.max_tokens
+        )
+
+        return PromptContextResponse(
+            intent=request.intent,
+            channel=request.channel,
+            language_pref=request.language_pref,
+            context=compiled.text,
+            token_count=compiled.tokens,
+            max_tokens=request.max_tokens,
+            sections=compiled.sections,
+            omitted_sections=compiled.omitted,
+            status=Status.SUCCESS,
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error compiling prompt context: %s", str(e))
+        raise HTTPException(status_code=500, detail="Internal server error")
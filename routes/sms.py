@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from metrics import TimedRoute
+from dependencies import require_read, require_sms
 from pydantic import BaseModel
 from typing import List, Optional
 import logging
@@ -9,7 +11,7 @@ from models import Status
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/sms", tags=["sms"])
+router = APIRouter(prefix="/api/sms", tags=["sms"], route_class=TimedRoute, dependencies=[Depends(require_read)])
 
 
 class TransactionAlertRequest(BaseModel):
@@ -32,11 +34,11 @@ class SMSResponse(BaseModel):
     status: Status
 
 
-@router.post("/transaction-alert", response_model=SMSResponse)
+@router.post("/transaction-alert", response_model=SMSResponse, dependencies=[Depends(require_sms)])
 async def send_transaction_alert(request: TransactionAlertRequest):
     """Send SMS alert for a transaction"""
     try:
-        logger.info(f"Transaction alert request for account: {request.account_number}")
+        logger.info("Transaction alert request for account: %s", request.account_number)
         
         # Get account details to retrieve customer info and mobile numbers
         account = mock_storage.get_account_by_number(request.account_number)
@@ -80,7 +82,10 @@ async def send_transaction_alert(request: TransactionAlertRequest):
             status=Status.SUCCESS if sms_result["success"] else Status.FAILED
         )
         
-        logger.info(f"Transaction alert processed for account {request.account_number}: sent to {len(sent_to)}, failed {len(failed_numbers)}")
+        logger.info(
+            "Transaction alert processed for account %s: sent to %s, failed %s",
+            request.account_number, len(sent_to), len(failed_numbers),
+        )
         return response
         
     except HTTPException:
@@ -90,11 +95,11 @@ async def send_transaction_alert(request: TransactionAlertRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.post("/send", response_model=SMSResponse)
+@router.post("/send", response_model=SMSResponse, dependencies=[Depends(require_sms)])
 async def send_general_sms(request: GeneralSMSRequest):
     """Send a general SMS to account holder"""
     try:
-        logger.info(f"General SMS request for account: {request.account_number}")
+        logger.info("General SMS request for account: %s", request.account_number)
         
         # Get account details to retrieve customer info and mobile numbers
         account = mock_storage.get_account_by_number(request.account_number)
@@ -127,7 +132,10 @@ async def send_general_sms(request: GeneralSMSRequest):
             status=Status.SUCCESS if sms_result["success"] else Status.FAILED
         )
         
-        logger.info(f"General SMS processed for account {request.account_number}: sent to {len(sent_to)}, failed {len(failed_numbers)}")
+        logger.info(
+            "General SMS processed for account %s: sent to %s, failed %s",
+            request.account_number, len(sent_to), len(failed_numbers),
+        )
         return response
         
     except HTTPException:
@@ -5,11 +5,14 @@ Agent service for managing human agent data and operations
 import json
 import os
 import random
+import threading
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 
 from models import AgentInfo, Status
+from shared_state import SharedState, shared_state
+from change_feed import change_feed, OP_UPDATE
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +20,32 @@ logger = logging.getLogger(__name__)
 class AgentService:
     """Service for managing human agent data and operations"""
     
-    def __init__(self, agents_file: str = "mock_data/agents.json"):
+    def __init__(self, agents_file: str = "mock_data/agents.json", shared_state: Optional[SharedState] = None):
         self.agents_file = agents_file
-        self.agents = []
-        self.load_agents()
+        # Status changes are shared with the other workers through this overlay
+        self.shared_state = shared_state
+        # Agents are loaded on first access rather than at import time
+        self._agents = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def agents(self) -> List[Dict[str, Any]]:
+        """Agent roster, loaded from disk on first access"""
+        if self._agents is None:
+            with self._load_lock:
+                if self._agents is None:
+                    self.load_agents()
+                    if self.shared_state:
+                        for agent_id, agent in self.shared_state.records("agents"):
+                            self._apply_agent(agent_id, agent)
+                        self.shared_state.register("agents", self._apply_agent)
+        elif self.shared_state:
+            self.shared_state.sync_once()
+        return self._agents
+
+    @agents.setter
+    def agents(self, value: List[Dict[str, Any]]) -> None:
+        self._agents = value
     
     def load_agents(self) -> None:
         """Load agents from JSON file or generate if doesn't exist"""
@@ -28,7 +53,7 @@ class AgentService:
             if os.path.exists(self.agents_file):
                 with open(self.agents_file, 'r', encoding='utf-8') as f:
                     self.agents = json.load(f)
-                logger.info(f"Loaded {len(self.agents)} agents from {self.agents_file}")
+                logger.info("Loaded %s agents from %s", len(self.agents), self.agents_file)
             else:
                 logger.warning(f"Agents file {self.agents_file} not found. Generating new agents...")
                 self.generate_agents()
@@ -44,7 +69,7 @@ class AgentService:
             generator = AgentDataGenerator()
             self.agents = generator.generate_agents(count=25)
             generator.save_agents_to_json(self.agents_file)
-            logger.info(f"Generated {len(self.agents)} new agents")
+            logger.info("Generated %s new agents", len(self.agents))
         except ImportError:
             logger.error("Could not import AgentDataGenerator. Creating minimal agent data.")
             self._create_minimal_agents()
@@ -108,12 +133,22 @@ class AgentService:
         """Get all agents"""
         return [AgentInfo(**agent_data) for agent_data in self.agents]
     
+    def _apply_agent(self, agent_id: str, agent_data: Dict[str, Any]) -> None:
+        """Apply an agent record changed by another worker"""
+        for agent in self._agents:
+            if agent.get("agent_id") == agent_id:
+                agent.update(agent_data)
+                return
+        self._agents.append(agent_data)
+
     def update_agent_status(self, agent_id: str, new_status: str) -> bool:
         """Update agent status"""
         for agent in self.agents:
             if agent.get("agent_id") == agent_id:
-                agent["current_status"] = new_status
-                agent["is_available"] = new_status == "Available"
+                changes = {
+                    "current_status": new_status,
+                    "is_available": new_status == "Available",
+                }
                 
                 # Calculate next available time if not available
                 if new_status != "Available":
@@ -128,12 +163,17 @@ class AgentService:
                         minutes = random.randint(480, 1440)  # 8-24 hours
                     
                     next_available = datetime.now().timestamp() + (minutes * 60)
-                    agent["next_available_time"] = datetime.fromtimestamp(next_available).isoformat()
+                    changes["next_available_time"] = datetime.fromtimestamp(next_available).isoformat()
                 else:
-                    agent["next_available_time"] = None
+                    changes["next_available_time"] = None
                 
-                # Save updated data
-                self._save_agents()
+                if self.shared_state:
+                    agent.update(self.shared_state.update("agents", agent_id, changes, base=agent))
+                else:
+                    # Save updated data
+                    agent.update(changes)
+                    self._save_agents()
+                change_feed.publish("agents", OP_UPDATE, agent_id, changes)
                 return True
         return False
     
@@ -141,8 +181,11 @@ class AgentService:
         """Save agents to JSON file"""
         try:
             os.makedirs(os.path.dirname(self.agents_file), exist_ok=True)
-            with open(self.agents_file, 'w', encoding='utf-8') as f:
+            # Write to a temporary file and rename, so readers never see a partial file
+            tmp_file = f"{self.agents_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.agents, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.agents_file)
         except Exception as e:
             logger.error(f"Error saving agents: {e}")
     
@@ -181,4 +224,6 @@ class AgentService:
 
 
 # Global agent service instance
-agent_service = AgentService()
\ No newline at end of file
+agent_service = AgentService(
+    os.path.join(os.getenv("MOCK_DATA_DIR", "mock_data"), "agents.json"), shared_state=shared_state
+)
\ No newline at end of file
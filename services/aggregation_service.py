@@ -0,0 +1,120 @@
+"""
+Dashboard aggregation service: group-by counts and sums over full collections
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from database import db_manager
+from generations import generations
+from mock_data_storage import mock_storage
+from record_store import group_records
+from services.agent_service import agent_service
+
+logger = logging.getLogger(__name__)
+
+# name -> (collection, group-by fields, summed field or None)
+AGGREGATIONS: Dict[str, Tuple[str, Tuple[str, ...], Optional[str]]] = {
+    "account_types": ("accounts", ("account_type",), "balance"),
+    "account_status": ("accounts", ("account_status",), "balance"),
+    "card_status": ("cards", ("card_status",), None),
+    "card_types": ("cards", ("card_type",), None),
+    "transaction_status": ("transactions", ("status",), "amount"),
+    "transaction_types": ("transactions", ("type",), "amount"),
+    "complaint_status": ("complaints", ("status",), None),
+    "complaint_categories": ("complaints", ("category",), None),
+    "dispute_status": ("disputes", ("status",), "amount"),
+    "dispute_types": ("disputes", ("dispute_type",), "amount"),
+    "atm_status_by_city": ("atms", ("city", "status"), None),
+    "loan_types": ("loans", ("loan_type",), "principal"),
+    "loan_status": ("loans", ("status",), "principal"),
+    "cheque_status": ("cheques", ("status",), "amount"),
+    "agent_status": ("agents", ("current_status",), None),
+}
+
+# The agent roster lives in AgentService for both sources; there is no agents table
+SERVICE_COLLECTIONS = {"agents"}
+
+
+class AggregationService:
+    """Computes dashboard aggregations and caches them until the collection changes
+
+    Mock data is grouped with vectorised passes over the snapshot or
+    RecordStore columns, the database with SQL `GROUP BY`. A cached result is
+    kept while the generation of its collection (bumped on every write, see
+    generations.py) is unchanged. Database results also expire after
+    `db_ttl` seconds, because writes made by other processes do not bump
+    this process's generations.
+    """
+
+    def __init__(self, db_ttl: float = 30.0):
+        self.db_ttl = db_ttl
+        # (source, name) -> (generation, expires at, groups)
+        self._cache: Dict[Tuple[str, str], Tuple[int, float, List[Dict[str, Any]]]] = {}
+
+    async def aggregate(self, name: str, source: str = "mock") -> List[Dict[str, Any]]:
+        """Groups of one aggregation, largest first: the group-by fields, `count` and `total`"""
+        collection, fields, sum_field = AGGREGATIONS[name]
+        if source != "db" or collection in SERVICE_COLLECTIONS:
+            source = "mock"
+            if mock_storage.shared_state:
+                # Picks up writes from other workers (and bumps their generations)
+                mock_storage.shared_state.sync_once()
+
+        key = (source, name)
+        generation = generations.get(collection)
+        cached = self._cache.get(key)
+        if cached and cached[0] == generation and time.monotonic() < cached[1]:
+            return cached[2]
+
+        groups = None
+        if source == "db":
+            groups = await self._aggregate_db(collection, fields, sum_field)
+        if groups is None:
+            source = "mock"
+            generation = generations.get(collection)
+            groups = self._aggregate_mock(collection, fields, sum_field)
+
+        result = [
+            {**dict(zip(fields, values)), "count": count, "total": round(total, 2)}
+            for values, count, total in sorted(groups, key=lambda g: (-g[1], str(g[0])))
+        ]
+        # A mock fallback for a database request is retried once the TTL is up too
+        expires = time.monotonic() + self.db_ttl if key[0] == "db" else float("inf")
+        self._cache[key] = (generation, expires, result)
+        return result
+
+    def _aggregate_mock(self, collection: str, fields: Tuple[str, ...], sum_field: Optional[str]) -> List[tuple]:
+        if collection == "agents":
+            return group_records(agent_service.agents, fields, sum_field)
+        return mock_storage.count_by(collection, list(fields), sum_field)
+
+    async def _aggregate_db(
+        self, collection: str, fields: Tuple[str, ...], sum_field: Optional[str]
+    ) -> Optional[List[tuple]]:
+        """GROUP BY in Postgres; None when the database is unavailable"""
+        # Identifiers come from AGGREGATIONS only, never from the request
+        columns = ", ".join(fields)
+        total = f"COALESCE(SUM({sum_field}), 0)" if sum_field else "0"
+        query = f"SELECT {columns}, COUNT(*) AS count, {total} AS total FROM {collection} GROUP BY {columns}"
+        try:
+            async with db_manager.get_connection() as conn:
+                if not conn:
+                    return None
+                rows = await conn.fetch(query)
+        except Exception as e:
+            logger.error("Error aggregating %s in database: %s", collection, str(e))
+            return None
+        return [
+            (tuple(row[field] for field in fields), row["count"], float(row["total"]))
+            for row in rows
+        ]
+
+    async def aggregate_many(self, names: List[str], source: str = "mock") -> Dict[str, List[Dict[str, Any]]]:
+        return {name: await self.aggregate(name, source) for name in names}
+
+
+# Global aggregation service instance
+aggregation_service = AggregationService(db_ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "30")))
@@ -0,0 +1,133 @@
+"""
+API token authentication service
+"""
+
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+from collections import OrderedDict
+from typing import FrozenSet, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+SCOPE_READ = "read"
+SCOPE_WRITE = "write"
+SCOPE_ALL = "*"
+
+
+class Credential:
+    """A configured API token, identified by the SHA-256 of the token"""
+
+    __slots__ = ("name", "token_hash", "scopes")
+
+    def __init__(self, name: str, token_hash: bytes, scopes: FrozenSet[str]):
+        self.name = name
+        self.token_hash = token_hash
+        self.scopes = scopes
+
+    def allows(self, scope: str) -> bool:
+        return SCOPE_ALL in self.scopes or scope in self.scopes
+
+
+def hash_token(token: str) -> bytes:
+    """SHA-256 digest of a token
+
+    Tokens are long random strings, so a fast hash is enough: there is no
+    password-like low-entropy input to protect with a slow KDF, and hashing
+    stays cheap on every request.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+
+class AuthService:
+    """Verifies API tokens against credentials loaded once at startup
+
+    Credentials come from the environment:
+
+    * API_TOKENS: `name:sha256-hex:scope,scope` entries separated by `;`,
+      e.g. `dashboard:9f86...08:read;ivr:60303...a4:read,write`
+    * API_TOKEN: a single plaintext token with every scope (the original
+      setup); it is hashed on load and not kept
+
+    A presented token is hashed and compared with every configured hash
+    using `hmac.compare_digest`, without stopping at the first match, so the
+    time taken does not depend on which credential (if any) matched. Results
+    are cached per token hash, so repeat callers cost one SHA-256 and a dict
+    lookup.
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self.credentials: List[Credential] = []
+        self._cache: "OrderedDict[bytes, Optional[Credential]]" = OrderedDict()
+        self.load()
+
+    def load(self, tokens: Optional[str] = None, legacy_token: Optional[str] = None) -> None:
+        """(Re)load credentials; arguments default to API_TOKENS and API_TOKEN"""
+        tokens = os.getenv("API_TOKENS", "") if tokens is None else tokens
+        legacy_token = os.getenv("API_TOKEN") if legacy_token is None else legacy_token
+
+        credentials = []
+        for entry in filter(None, (e.strip() for e in tokens.split(";"))):
+            try:
+                name, token_hash, scopes = entry.split(":", 2)
+                if len(bytes.fromhex(token_hash)) != hashlib.sha256().digest_size:
+                    raise ValueError("not a SHA-256 hex digest")
+                credentials.append(
+                    Credential(
+                        name=name,
+                        token_hash=bytes.fromhex(token_hash),
+                        scopes=frozenset(s.strip() for s in scopes.split(",") if s.strip()),
+                    )
+                )
+            except ValueError:
+                logger.error("Ignoring malformed API_TOKENS entry: %s", entry.split(':', 1)[0])
+        if legacy_token:
+            credentials.append(Credential("default", hash_token(legacy_token), frozenset({SCOPE_ALL})))
+
+        self.credentials = credentials
+        self._cache.clear()
+        logger.info("Loaded %s API credentials", len(credentials))
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.credentials)
+
+    def verify(self, token: Optional[str]) -> Optional[Credential]:
+        """The credential a token belongs to, or None"""
+        if not token:
+            return None
+        token_hash = hash_token(token)
+        try:
+            credential = self._cache[token_hash]
+            self._cache.move_to_end(token_hash)
+            return credential
+        except KeyError:
+            pass
+
+        credential = None
+        for candidate in self.credentials:
+            # No early exit: every hash is compared whatever the outcome
+            if hmac.compare_digest(candidate.token_hash, token_hash):
+                credential = candidate
+
+        self._cache[token_hash] = credential
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return credential
+
+
+# Global auth service instance
+auth_service = AuthService()
+
+
+if __name__ == "__main__":
+    # Print a new token and its API_TOKENS entry: python -m services.auth_service <name> <scope,scope>
+    name = sys.argv[1] if len(sys.argv) > 1 else "client"
+    scopes = sys.argv[2] if len(sys.argv) > 2 else SCOPE_READ
+    token = secrets.token_urlsafe(32)
+    print(f"token:            {token}")
+    print(f"API_TOKENS entry: {name}:{hash_token(token).hex()}:{scopes}")
@@ -0,0 +1,122 @@
+"""
+ID allocation service for tickets and other generated identifiers
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Custom epoch (2024-01-01 UTC) in milliseconds; 41 bits of time last ~69 years
+ID_EPOCH_MS = 1704067200000
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKERS = 1 << WORKER_BITS
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, and in ascending ASCII order so IDs sort by time
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ID_LENGTH = 13
+
+
+class IdAllocator:
+    """Allocates monotonic, sortable, collision-free IDs without any database round-trips
+
+    Each ID packs a millisecond timestamp, a worker slot and a per-millisecond
+    sequence (Snowflake layout). Worker slots are leased with an exclusive
+    file lock, so every uvicorn worker on a host gets its own slot; the lock
+    is released by the OS when the process exits. Set WORKER_ID to assign
+    slots explicitly when running across several hosts.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None):
+        self.lock_dir = lock_dir or os.getenv(
+            "ID_LOCK_DIR", os.path.join(tempfile.gettempdir(), "bankwise-id-workers")
+        )
+        self._lock = threading.Lock()
+        self._worker_id: Optional[int] = None
+        self._worker_pid: Optional[int] = None
+        self._lease_file = None
+        self._last_ms = -1
+        self._sequence = 0
+
+    @property
+    def worker_id(self) -> int:
+        """Worker slot of this process, leased on first use (and again after a fork)"""
+        if self._worker_id is None or self._worker_pid != os.getpid():
+            self._worker_id = self._lease_worker_id()
+            self._worker_pid = os.getpid()
+            self._last_ms = -1
+            self._sequence = 0
+            logger.info("ID allocator using worker slot %s", self._worker_id)
+        return self._worker_id
+
+    def _lease_worker_id(self) -> int:
+        configured = os.getenv("WORKER_ID")
+        if configured is not None:
+            return int(configured) % MAX_WORKERS
+
+        try:
+            import fcntl
+        except ImportError:
+            # No flock (Windows): fall back to the process ID
+            return os.getpid() % MAX_WORKERS
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        start = os.getpid() % MAX_WORKERS
+        for offset in range(MAX_WORKERS):
+            slot = (start + offset) % MAX_WORKERS
+            lease = open(os.path.join(self.lock_dir, f"worker-{slot}.lock"), "a")
+            try:
+                fcntl.flock(lease, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lease.close()
+                continue
+            if self._lease_file:
+                self._lease_file.close()
+            self._lease_file = lease
+            return slot
+
+        raise RuntimeError(f"No free ID worker slot in {self.lock_dir}")
+
+    def _next_value(self) -> int:
+        with self._lock:
+            worker_id = self.worker_id
+            now_ms = int(time.time() * 1000) - ID_EPOCH_MS
+            # Never step back in time, even if the wall clock does
+            if now_ms <= self._last_ms:
+                now_ms = self._last_ms
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    # Sequence exhausted for this millisecond: borrow the next one
+                    now_ms += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << (WORKER_BITS + SEQUENCE_BITS)) | (worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self, prefix: str = "") -> str:
+        """Allocate a new ID, e.g. next_id("COMPLAINT") -> "COMPLAINT0C8Z4K7M20040" """
+        value = self._next_value()
+        chars = []
+        for _ in range(ID_LENGTH):
+            value, digit = divmod(value, 32)
+            chars.append(ALPHABET[digit])
+        return prefix + "".join(reversed(chars))
+
+    @staticmethod
+    def timestamp_ms(allocated_id: str) -> int:
+        """Unix time in milliseconds at which an ID was allocated"""
+        value = 0
+        for char in allocated_id[-ID_LENGTH:]:
+            value = value * 32 + ALPHABET.index(char)
+        return (value >> (WORKER_BITS + SEQUENCE_BITS)) + ID_EPOCH_MS
+
+
+# Global ID allocator instance
+id_allocator = IdAllocator()
@@ -0,0 +1,83 @@
+"""
+Knowledge base search service
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import logging
+
+from kb_index import KB_DIR, KB_INDEX, KBIndex, build_index, is_stale
+
+logger = logging.getLogger(__name__)
+
+
+class KBService:
+    """Serves searches from the memory-mapped index and keeps it in sync with the files
+
+    At most every `reload_interval` seconds a search checks the source files'
+    mtimes and sizes against the ones recorded in the index. When they
+    differ, the index is rebuilt on a background thread and swapped in once
+    written; searches keep using the previous index meanwhile.
+    """
+
+    def __init__(self, kb_dir: str = KB_DIR, index_path: str = KB_INDEX, reload_interval: float = 2.0):
+        self.kb_dir = kb_dir
+        self.index_path = index_path
+        self.reload_interval = reload_interval
+        self.index: Optional[KBIndex] = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._next_check = 0.0
+
+    def load(self) -> KBIndex:
+        """Open the index, building it first if it is missing or stale"""
+        with self._lock:
+            if self.index is None:
+                index = None
+                if os.path.exists(self.index_path):
+                    try:
+                        index = KBIndex(self.index_path)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Rebuilding unreadable knowledge base index: %s", e)
+                if is_stale(index, self.kb_dir):
+                    build_index(self.kb_dir, self.index_path)
+                    index = KBIndex(self.index_path)
+                self.index = index
+                self._next_check = time.monotonic() + self.reload_interval
+            return self.index
+
+    def _check_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check or self._rebuilding:
+            return
+        self._next_check = now + self.reload_interval
+        if is_stale(self.index, self.kb_dir):
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild, name="kb-rebuild", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        try:
+            build_index(self.kb_dir, self.index_path)
+            self.index = KBIndex(self.index_path)
+            logger.info("Knowledge base index reloaded")
+        except Exception as e:
+            logger.error("Knowledge base rebuild failed: %s", e)
+        finally:
+            self._rebuilding = False
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Top passages for a query, best first, each with its BM25 score"""
+        index = self.index or self.load()
+        self._check_reload()
+        results = []
+        for passage_id, score in index.search(query, top_k):
+            passage = index.passage(passage_id)
+            passage["score"] = round(score, 4)
+            results.append(passage)
+        return results
+
+
+# Global knowledge base service instance
+kb_service = KBService(reload_interval=float(os.getenv("KB_RELOAD_INTERVAL", "2")))
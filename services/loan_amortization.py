@@ -0,0 +1,236 @@
+"""
+Loan amortization service for computing EMI schedules and prepayment scenarios
+"""
+
+import math
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+import numpy as np
+
+from metrics import cache_hit, cache_miss
+
+logger = logging.getLogger(__name__)
+
+
+class LoanAmortizationService:
+    """Computes vectorised amortization schedules for loan records"""
+
+    def __init__(self, max_cached_schedules: int = 1024):
+        self.max_cached_schedules = max_cached_schedules
+        self._cache: Dict[str, Tuple[Tuple, Dict[str, np.ndarray]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _loan_terms(loan: Dict[str, Any]) -> Tuple[float, float, int, int]:
+        """Extract (principal, annual_rate, tenure_months, paid_emis) from a loan record"""
+        principal = float(loan["principal"])
+        annual_rate = float(loan["interest_rate"])
+        tenure_months = int(loan["tenure_months"])
+        paid_emis = min(max(int(loan.get("paid_emis") or 0), 0), tenure_months)
+        return principal, annual_rate, tenure_months, paid_emis
+
+    @staticmethod
+    def _emi(principal: np.ndarray, monthly_rate: np.ndarray, months: np.ndarray) -> np.ndarray:
+        """Standard reducing-balance EMI, falling back to P/n for zero-rate loans"""
+        growth = np.power(1.0 + monthly_rate, months)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            emi = principal * monthly_rate * growth / (growth - 1.0)
+        return np.where(monthly_rate > 0, emi, principal / np.maximum(months, 1))
+
+    def _compute_schedules(self, loans: List[Dict[str, Any]]) -> List[Dict[str, np.ndarray]]:
+        """Compute schedules for many loans at once on a (loans x months) grid"""
+        terms = np.array([self._loan_terms(loan)[:3] for loan in loans], dtype=np.float64)
+        principal = terms[:, 0:1]
+        monthly_rate = terms[:, 1:2] / 1200.0
+        tenure = terms[:, 2:3]
+
+        max_tenure = int(tenure.max())
+        months = np.arange(1, max_tenure + 1, dtype=np.float64)[np.newaxis, :]
+        active = months <= tenure
+
+        emi = self._emi(principal, monthly_rate, tenure)
+        growth = np.power(1.0 + monthly_rate, months)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            annuity = np.where(
+                monthly_rate > 0, (growth - 1.0) / monthly_rate, months
+            )
+        closing_balance = principal * np.where(monthly_rate > 0, growth, 1.0) - emi * annuity
+        closing_balance = np.where(active, np.maximum(closing_balance, 0.0), 0.0)
+
+        opening_balance = np.concatenate(
+            [np.broadcast_to(principal, (len(loans), 1)), closing_balance[:, :-1]], axis=1
+        )
+        interest = np.where(active, opening_balance * monthly_rate, 0.0)
+        principal_component = np.where(active, opening_balance - closing_balance, 0.0)
+        payment = interest + principal_component
+
+        schedules = []
+        for i, loan in enumerate(loans):
+            n = int(tenure[i, 0])
+            schedules.append(
+                {
+                    "month": np.arange(1, n + 1, dtype=np.int32),
+                    "emi": payment[i, :n],
+                    "interest": interest[i, :n],
+                    "principal": principal_component[i, :n],
+                    "balance": closing_balance[i, :n],
+                }
+            )
+        return schedules
+
+    def get_schedules(self, loans: List[Dict[str, Any]]) -> List[Dict[str, np.ndarray]]:
+        """Get schedules for a batch of loans, computing only the ones not cached"""
+        results: List[Optional[Dict[str, np.ndarray]]] = [None] * len(loans)
+        missing = []
+
+        with self._lock:
+            for i, loan in enumerate(loans):
+                cached = self._cache.get(loan["loan_id"])
+                if cached and cached[0] == self._loan_terms(loan)[:3]:
+                    results[i] = cached[1]
+                else:
+                    missing.append(i)
+        cache_hit("amortization_schedule", len(loans) - len(missing))
+        cache_miss("amortization_schedule", len(missing))
+
+        if missing:
+            computed = self._compute_schedules([loans[i] for i in missing])
+            with self._lock:
+                for i, schedule in zip(missing, computed):
+                    results[i] = schedule
+                    if len(self._cache) >= self.max_cached_schedules:
+                        self._cache.pop(next(iter(self._cache)))
+                    self._cache[loans[i]["loan_id"]] = (
+                        self._loan_terms(loans[i])[:3],
+                        schedule,
+                    )
+            logger.debug("Computed %s amortization schedules", len(missing))
+
+        return results
+
+    def get_schedule(self, loan: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """Get the full amortization schedule for a single loan"""
+        return self.get_schedules([loan])[0]
+
+    def invalidate(self, loan_id: Optional[str] = None) -> None:
+        """Drop a cached schedule, or the whole cache when no loan_id is given"""
+        with self._lock:
+            if loan_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(loan_id, None)
+
+    def summarize(self, loan: Dict[str, Any], schedule: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Summarize progress on a loan given its schedule"""
+        principal, annual_rate, tenure_months, paid_emis = self._loan_terms(loan)
+        outstanding = float(schedule["balance"][paid_emis - 1]) if paid_emis else principal
+
+        return {
+            "loan_id": loan["loan_id"],
+            "loan_type": loan.get("loan_type"),
+            "principal": round(principal, 2),
+            "interest_rate": annual_rate,
+            "tenure_months": tenure_months,
+            "paid_emis": paid_emis,
+            "remaining_emis": tenure_months - paid_emis,
+            "emi_amount": round(float(schedule["emi"][0]), 2),
+            "outstanding_principal": round(outstanding, 2),
+            "principal_paid": round(principal - outstanding, 2),
+            "interest_paid": round(float(schedule["interest"][:paid_emis].sum()), 2),
+            "remaining_interest": round(float(schedule["interest"][paid_emis:].sum()), 2),
+            "total_interest": round(float(schedule["interest"].sum()), 2),
+        }
+
+    def summarize_loans(self, loans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Summarize a batch of loans (e.g. all loans of an account) in one pass"""
+        if not loans:
+            return []
+        schedules = self.get_schedules(loans)
+        return [self.summarize(loan, schedule) for loan, schedule in zip(loans, schedules)]
+
+    def prepayment_scenario(
+        self, loan: Dict[str, Any], prepayment_amount: float, mode: str = "reduce_tenure"
+    ) -> Dict[str, Any]:
+        """
+        Simulate a lump-sum prepayment made after the last paid EMI
+
+        Args:
+            loan: Loan record
+            prepayment_amount: Lump sum paid towards outstanding principal
+            mode: "reduce_tenure" keeps the EMI and shortens the loan,
+                "reduce_emi" keeps the remaining tenure and lowers the EMI
+
+        Returns:
+            dict: Before/after comparison including interest saved
+        """
+        if mode not in ("reduce_tenure", "reduce_emi"):
+            raise ValueError(f"Invalid prepayment mode: {mode}")
+
+        summary = self.summarize(loan, self.get_schedule(loan))
+        outstanding = summary["outstanding_principal"]
+        remaining_emis = summary["remaining_emis"]
+        if prepayment_amount <= 0:
+            raise ValueError("Prepayment amount must be positive")
+        if remaining_emis == 0 or outstanding <= 0:
+            raise ValueError("Loan has no outstanding principal")
+
+        new_principal = max(outstanding - prepayment_amount, 0.0)
+        monthly_rate = summary["interest_rate"] / 1200.0
+        emi = summary["emi_amount"]
+
+        if new_principal == 0:
+            new_emi, new_tenure, new_interest = 0.0, 0, 0.0
+        elif mode == "reduce_emi":
+            new_tenure = remaining_emis
+            new_emi = float(
+                self._emi(np.float64(new_principal), np.float64(monthly_rate), np.float64(new_tenure))
+            )
+            new_interest = new_emi * new_tenure - new_principal
+        elif monthly_rate > 0:
+            new_emi = emi
+            new_tenure = math.ceil(
+                -math.log(1.0 - monthly_rate * new_principal / emi)
+                / math.log(1.0 + monthly_rate)
+            )
+            # The last instalment only clears whatever balance is left
+            growth = (1.0 + monthly_rate) ** (new_tenure - 1)
+            balance = new_principal * growth - emi * (growth - 1.0) / monthly_rate
+            final_emi = balance * (1.0 + monthly_rate)
+            new_interest = emi * (new_tenure - 1) + final_emi - new_principal
+        else:
+            new_emi = emi
+            new_tenure = math.ceil(new_principal / emi)
+            new_interest = 0.0
+
+        return {
+            "loan_id": loan["loan_id"],
+            "mode": mode,
+            "prepayment_amount": round(min(prepayment_amount, outstanding), 2),
+            "outstanding_before": outstanding,
+            "outstanding_after": round(new_principal, 2),
+            "emi_before": emi,
+            "emi_after": round(new_emi, 2),
+            "remaining_emis_before": remaining_emis,
+            "remaining_emis_after": new_tenure,
+            "remaining_interest_before": summary["remaining_interest"],
+            "remaining_interest_after": round(new_interest, 2),
+            "interest_saved": round(summary["remaining_interest"] - new_interest, 2),
+        }
+
+    @staticmethod
+    def schedule_to_rows(
+        schedule: Dict[str, np.ndarray], start: int = 0, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Convert (a window of) a schedule to a list of JSON-friendly rows"""
+        end = None if limit is None else start + limit
+        columns = {
+            key: np.round(values[start:end], 2).tolist() if key != "month" else values[start:end].tolist()
+            for key, values in schedule.items()
+        }
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+# Global loan amortization service instance
+loan_amortization_service = LoanAmortizationService()
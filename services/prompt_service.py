@@ -0,0 +1,92 @@
+"""
+Prompt context service
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import logging
+
+from kb_index import KB_DIR, source_files, source_signature
+from models import Channel, Intent, Language
+from prompt_compiler import SYSTEM_PROMPT_PATH, CompiledPrompt, Section, compile_context, load_sections
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[Intent, Channel, Language, int]
+
+
+class PromptService:
+    """Compiles prompt contexts and caches them per (intent, channel, language, budget)
+
+    The sections are split and tagged once; a turn with a cached key costs a
+    dict lookup. At most every `reload_interval` seconds a request checks the
+    prompt and knowledge base files' mtimes and sizes, and when they changed
+    the sections are reloaded and the cache cleared.
+    """
+
+    def __init__(
+        self,
+        prompt_path: str = SYSTEM_PROMPT_PATH,
+        kb_dir: str = KB_DIR,
+        reload_interval: float = 2.0,
+        cache_size: int = 256,
+    ):
+        self.prompt_path = prompt_path
+        self.kb_dir = kb_dir
+        self.reload_interval = reload_interval
+        self.cache_size = cache_size
+        self.sections: Optional[List[Section]] = None
+        self._signature: Optional[List[List]] = None
+        self._cache: "OrderedDict[CacheKey, CompiledPrompt]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+
+    def _sources(self) -> List[str]:
+        return [self.prompt_path] + source_files(self.kb_dir)
+
+    def load(self) -> List[Section]:
+        """(Re)load the sections if they are missing or the files changed"""
+        with self._lock:
+            signature = source_signature(self._sources())
+            if self.sections is None or signature != self._signature:
+                self.sections = load_sections(self.prompt_path, self.kb_dir)
+                self._signature = signature
+                self._cache.clear()
+                logger.info("Loaded %s prompt and knowledge base sections", len(self.sections))
+            self._next_check = time.monotonic() + self.reload_interval
+            return self.sections
+
+    def compile(
+        self,
+        intent: Intent,
+        channel: Channel = Channel.VOICE,
+        language: Language = Language.EN,
+        max_tokens: int = 1500,
+    ) -> CompiledPrompt:
+        """The context for an intent within `max_tokens`, from the cache when possible"""
+        if self.sections is None or time.monotonic() >= self._next_check:
+            try:
+                self.load()
+            except OSError as e:
+                if self.sections is None:
+                    raise
+                logger.warning("Keeping previous prompt sections: %s", e)
+
+        key = (intent, channel, language, max_tokens)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            return compiled
+
+        compiled = compile_context(self.sections, intent, channel, language, max_tokens)
+        self._cache[key] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+
+# Global prompt service instance
+prompt_service = PromptService(reload_interval=float(os.getenv("KB_RELOAD_INTERVAL", "2")))
@@ -5,6 +5,9 @@ from twilio.rest import Client
 from twilio.base.exceptions import TwilioException
 from dotenv import load_dotenv
 
+from metrics import timed_calls
+from rate_limiter import rate_limiter
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
@@ -39,6 +42,7 @@ class SMSService:
         """Check if SMS service is properly configured and enabled"""
         return self.client is not None
     
+    @timed_calls("sms")
     async def send_sms(self, to_number: str, message: str) -> dict:
         """
         Send SMS to a single number
@@ -53,7 +57,7 @@ class SMSService:
         if not self.is_enabled():
             logger.warning("SMS service not enabled. Cannot send SMS.")
             # Return mock response when Twilio is disabled
-            logger.info(f"Mock SMS sent to {to_number}: {message}")
+            logger.info("Mock SMS sent to %s: %s", to_number, message)
             return {
                 "success": True,
                 "message_sid": "mock_sms_id_" + to_number,
@@ -61,6 +65,14 @@ class SMSService:
                 "status": "mock_delivered"
             }
         
+        if not rate_limiter.take_sms():
+            logger.warning(f"SMS provider budget used up, not sending SMS to {to_number}")
+            return {
+                "success": False,
+                "error": "SMS rate limit exceeded",
+                "message_sid": None
+            }
+
         try:
             # Ensure phone number is in correct format
             if not to_number.startswith('+'):
@@ -72,7 +84,7 @@ class SMSService:
                 to=to_number
             )
             
-            logger.info(f"SMS sent successfully to {to_number}. SID: {message_obj.sid}")
+            logger.info("SMS sent successfully to %s. SID: %s", to_number, message_obj.sid)
             return {
                 "success": True,
                 "message_sid": message_obj.sid,
@@ -95,6 +107,7 @@ class SMSService:
                 "message_sid": None
             }
     
+    @timed_calls("sms")
     async def send_bulk_sms(self, phone_numbers: List[str], message: str) -> dict:
         """
         Send SMS to multiple numbers
@@ -109,7 +122,7 @@ class SMSService:
         if not self.is_enabled():
             logger.warning("SMS service not enabled. Cannot send bulk SMS.")
             # Return mock response for bulk SMS when Twilio is disabled
-            logger.info(f"Mock bulk SMS sent to {len(phone_numbers)} numbers")
+            logger.info("Mock bulk SMS sent to %s numbers", len(phone_numbers))
             return {
                 "success": True,
                 "successful_sends": [{
@@ -143,7 +156,7 @@ class SMSService:
         total_sent = len(successful_sends)
         total_failed = len(failed_sends)
         
-        logger.info(f"Bulk SMS completed: {total_sent} successful, {total_failed} failed")
+        logger.info("Bulk SMS completed: %s successful, %s failed", total_sent, total_failed)
         
         return {
             "success": total_sent > 0,
@@ -0,0 +1,344 @@
+"""
+Ticket writer: persists complaints and disputes to Postgres with a transactional outbox
+"""
+
+import asyncio
+import json
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from database import db_manager, parse_datetime
+from mock_data_storage import mock_storage
+from change_feed import change_feed, OP_INSERT
+from services.sms_service import sms_service
+
+logger = logging.getLogger(__name__)
+
+INSERT_COMPLAINT = """
+    INSERT INTO complaints (
+        ticket_id, account_number, subject, description, category,
+        status, priority, created_at, resolved_at, estimated_resolution_days,
+        assigned_agent, resolution_notes, customer_satisfaction
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+"""
+
+INSERT_DISPUTE = """
+    INSERT INTO disputes (
+        ticket_id, account_number, transaction_id, amount, transaction_date,
+        dispute_type, reason, description, status, created_at, resolved_at,
+        estimated_resolution_days, assigned_officer, resolution_notes,
+        evidence_submitted, customer_contacted
+    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16)
+"""
+
+INSERT_OUTBOX = """
+    INSERT INTO notification_outbox (aggregate_type, aggregate_id, event_type, payload)
+    VALUES ($1, $2, $3, $4::jsonb)
+"""
+
+# Claim due outbox rows by pushing their next attempt out by a lease ($2 seconds), in
+# one autocommitted statement: no lock is held while the notifications are sent, and
+# rows claimed by a worker that dies are picked up again once the lease runs out.
+# SKIP LOCKED lets several workers claim at once without taking the same rows.
+CLAIM_OUTBOX = """
+    UPDATE notification_outbox
+    SET attempts = attempts + 1, next_attempt_at = NOW() + make_interval(secs => $2)
+    WHERE id IN (
+        SELECT id
+        FROM notification_outbox
+        WHERE processed_at IS NULL AND failed_at IS NULL AND next_attempt_at <= NOW()
+        ORDER BY next_attempt_at, id
+        LIMIT $1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, aggregate_id, payload, attempts
+"""
+
+MARK_OUTBOX_SENT = "UPDATE notification_outbox SET processed_at = NOW() WHERE id = ANY($1::bigint[])"
+RETRY_OUTBOX = "UPDATE notification_outbox SET next_attempt_at = NOW() + make_interval(secs => $2) WHERE id = $1"
+FAIL_OUTBOX = "UPDATE notification_outbox SET failed_at = NOW() WHERE id = ANY($1::bigint[])"
+
+
+def _complaint_row(c: Dict[str, Any]) -> Tuple:
+    return (
+        c["ticket_id"],
+        c["account_number"],
+        c["subject"],
+        c["description"],
+        c["category"],
+        c["status"],
+        c["priority"],
+        parse_datetime(c["created_at"]),
+        parse_datetime(c.get("resolved_at")),
+        c["estimated_resolution_days"],
+        c.get("assigned_agent"),
+        c.get("resolution_notes"),
+        c.get("customer_satisfaction"),
+    )
+
+
+def _dispute_row(d: Dict[str, Any]) -> Tuple:
+    return (
+        d["ticket_id"],
+        d["account_number"],
+        d["transaction_id"],
+        d["amount"],
+        parse_datetime(d["transaction_date"]),
+        d["dispute_type"],
+        d["reason"],
+        d["description"],
+        d["status"],
+        parse_datetime(d["created_at"]),
+        parse_datetime(d.get("resolved_at")),
+        d["estimated_resolution_days"],
+        d.get("assigned_officer"),
+        d.get("resolution_notes"),
+        d["evidence_submitted"],
+        d["customer_contacted"],
+    )
+
+
+# kind -> (insert statement, row builder, mock journal method)
+TICKET_KINDS = {
+    "complaint": (INSERT_COMPLAINT, _complaint_row, "add_complaint"),
+    "dispute": (INSERT_DISPUTE, _dispute_row, "add_dispute"),
+}
+
+
+class _PendingWrite:
+    __slots__ = ("kind", "record", "notification", "future")
+
+    def __init__(self, kind: str, record: Dict[str, Any], notification: Optional[Dict[str, Any]]):
+        self.kind = kind
+        self.record = record
+        self.notification = notification
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class TicketWriter:
+    """Group-commits complaint and dispute inserts together with their outbox rows
+
+    Writes are queued on a bounded asyncio queue. A single flusher task takes
+    whatever has accumulated within `flush_interval_ms` (up to `max_batch`
+    writes) and inserts it in one transaction, so under load many requests
+    share one commit. Callers wait until their row is durable. When the
+    database is unavailable, or a row is rejected, the ticket goes to the
+    mock data journal instead, and its notification is sent inline.
+
+    The relay task sends outbox notifications (SMS) after commit and marks
+    them processed; it is woken after every flush and also polls, so rows
+    left behind by a crashed worker are picked up. Rows are claimed with a
+    lease and sent without holding a connection. A failed send (including
+    one refused by the SMS budget) is retried with exponential backoff, and
+    given up, with an error logged, after `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        max_batch: int = 100,
+        flush_interval_ms: float = 5,
+        relay_interval: float = 2.0,
+        max_attempts: int = 8,
+        relay_batch: int = 50,
+        claim_lease: float = 60.0,
+        max_backoff: float = 600.0,
+    ):
+        self.queue_size = queue_size
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000
+        self.relay_interval = relay_interval
+        self.max_attempts = max_attempts
+        self.relay_batch = relay_batch
+        self.claim_lease = claim_lease
+        self.max_backoff = max_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._relay: Optional[asyncio.Task] = None
+        self._relay_wakeup: Optional[asyncio.Event] = None
+
+    def _ensure_started(self) -> None:
+        if self._flusher and not self._flusher.done():
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._relay_wakeup = asyncio.Event()
+        self._flusher = asyncio.create_task(self._flush_loop())
+        self._relay = asyncio.create_task(self._relay_loop())
+
+    async def create_complaint(self, complaint: Dict[str, Any], notification: Optional[Dict[str, Any]] = None) -> str:
+        """Persist a complaint; returns "database" or "mock" depending on where it was written"""
+        return await self._submit("complaint", complaint, notification)
+
+    async def create_dispute(self, dispute: Dict[str, Any], notification: Optional[Dict[str, Any]] = None) -> str:
+        """Persist a dispute; returns "database" or "mock" depending on where it was written"""
+        return await self._submit("dispute", dispute, notification)
+
+    async def _submit(self, kind: str, record: Dict[str, Any], notification: Optional[Dict[str, Any]]) -> str:
+        if not db_manager.pool:
+            return await self._write_to_mock(kind, record, notification)
+
+        self._ensure_started()
+        pending = _PendingWrite(kind, record, notification)
+        # A full queue applies backpressure to callers instead of growing without bound
+        await self._queue.put(pending)
+        return await pending.future
+
+    async def _flush_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                logger.error("Unexpected error flushing %s tickets: %s", len(batch), e)
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[_PendingWrite]) -> None:
+        """Commit a batch in one transaction; on failure retry each write on its own"""
+        if await self._commit(batch):
+            logger.info("Group-committed %s tickets", len(batch))
+            for pending in batch:
+                self._resolve(pending, "database")
+            self._relay_wakeup.set()
+            return
+
+        for pending in batch:
+            if len(batch) > 1 and await self._commit([pending]):
+                self._resolve(pending, "database")
+                self._relay_wakeup.set()
+            else:
+                source = await self._write_to_mock(pending.kind, pending.record, pending.notification)
+                self._resolve(pending, source)
+
+    @staticmethod
+    def _resolve(pending: _PendingWrite, source: str) -> None:
+        # The caller may have gone away (e.g. client disconnect); the write still happened
+        if not pending.future.done():
+            pending.future.set_result(source)
+
+    async def _commit(self, batch: List[_PendingWrite]) -> bool:
+        async with db_manager.get_connection() as conn:
+            if not conn:
+                return False
+            try:
+                async with conn.transaction():
+                    for kind, (statement, to_row, _) in TICKET_KINDS.items():
+                        rows = [to_row(p.record) for p in batch if p.kind == kind]
+                        if rows:
+                            await conn.executemany(statement, rows)
+                    await conn.executemany(
+                        INSERT_OUTBOX,
+                        [
+                            (
+                                p.kind,
+                                p.record["ticket_id"],
+                                f"{p.kind}.created",
+                                json.dumps({"notification": p.notification}),
+                            )
+                            for p in batch
+                        ],
+                    )
+                for pending in batch:
+                    change_feed.publish(f"{pending.kind}s", OP_INSERT, pending.record["ticket_id"], pending.record)
+                return True
+            except Exception as e:
+                logger.warning("Ticket batch of %s failed: %s", len(batch), str(e))
+                return False
+
+    async def _write_to_mock(self, kind: str, record: Dict[str, Any], notification: Optional[Dict[str, Any]]) -> str:
+        """Fallback: append to the mock data journal and notify inline"""
+        getattr(mock_storage, TICKET_KINDS[kind][2])(record)
+        if notification:
+            await self._notify(record["ticket_id"], notification)
+        return "mock"
+
+    async def _notify(self, ticket_id: str, notification: Dict[str, Any]) -> bool:
+        if not notification.get("mobile_numbers") or not sms_service.is_enabled():
+            return True
+        result = await sms_service.send_bulk_sms(notification["mobile_numbers"], notification["message"])
+        if result["success"]:
+            logger.info("SMS notification sent for %s to %s numbers", ticket_id, len(result['successful_sends']))
+        else:
+            logger.warning("Failed to send SMS notification for %s", ticket_id)
+        return result["success"]
+
+    async def _relay_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._relay_wakeup.wait(), self.relay_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._relay_wakeup.clear()
+            try:
+                # Keep going while there is a backlog of full pages
+                while await self.relay_outbox(self.relay_batch) == self.relay_batch:
+                    pass
+            except Exception as e:
+                logger.error("Error relaying notification outbox: %s", e)
+
+    async def relay_outbox(self, limit: int = 50) -> int:
+        """Send due outbox notifications; returns how many rows were claimed"""
+        async with db_manager.get_connection() as conn:
+            if not conn:
+                return 0
+            rows = await conn.fetch(CLAIM_OUTBOX, limit, self.claim_lease)
+        if not rows:
+            return 0
+
+        sent, retry, failed = [], [], []
+        for row in rows:
+            notification = json.loads(row["payload"]).get("notification")
+            if not notification or await self._notify(row["aggregate_id"], notification):
+                sent.append(row["id"])
+            elif row["attempts"] >= self.max_attempts:
+                logger.error(
+                    "Giving up on notification for %s (outbox row %s) after %s attempts",
+                    row["aggregate_id"],
+                    row["id"],
+                    row["attempts"],
+                )
+                failed.append(row["id"])
+            else:
+                backoff = min(self.max_backoff, self.relay_interval * 2 ** row["attempts"])
+                retry.append((row["id"], backoff))
+
+        async with db_manager.get_connection() as conn:
+            if not conn:
+                # The leases run out and the rows are sent again
+                logger.warning("Could not record the result of %s outbox notifications", len(rows))
+                return len(rows)
+            if sent:
+                await conn.execute(MARK_OUTBOX_SENT, sent)
+            if failed:
+                await conn.execute(FAIL_OUTBOX, failed)
+            if retry:
+                await conn.executemany(RETRY_OUTBOX, retry)
+        return len(rows)
+
+    async def close(self) -> None:
+        """Flush queued writes and stop the background tasks"""
+        if not self._flusher:
+            return
+        await self._queue.join()
+        for task in (self._flusher, self._relay):
+            task.cancel()
+        await asyncio.gather(self._flusher, self._relay, return_exceptions=True)
+        self._flusher = self._relay = None
+
+
+# Global ticket writer instance
+ticket_writer = TicketWriter()
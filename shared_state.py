@@ -0,0 +1,242 @@
+"""
+Shared state for mock mode when the API runs with several worker processes.
+
+With `uvicorn --workers N` every process has its own copy of the mock data
+and the agent roster, so a card blocked in one worker is not seen by the
+others. Mutations therefore go through `SharedState`, a SQLite database in
+WAL mode that holds the latest version of every changed record:
+
+* writers upsert the record in a short `BEGIN IMMEDIATE` transaction, so
+  concurrent read-modify-write updates from different workers never lose
+  each other's fields
+* every row carries a global sequence number; readers check the cheap
+  `PRAGMA data_version` counter and, only when another connection has
+  committed, replay the rows newer than the last one they applied
+* within an HTTP request that check runs once, on the first read
+  (`sync_once`, delimited by `SharedStateMiddleware`), however many times
+  the request touches the mock data
+
+The JSON files (or snapshots) remain the baseline; the state database is an
+overlay on top of them. Set MOCK_STATE_DB to choose the file, or
+MOCK_SHARED_STATE=false to keep the old per-process behaviour.
+"""
+
+import os
+import sqlite3
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+import orjson
+
+from change_feed import change_feed, OP_UPSERT
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS records (
+        collection TEXT NOT NULL,
+        key TEXT NOT NULL,
+        data BLOB NOT NULL,
+        seq INTEGER NOT NULL,
+        PRIMARY KEY (collection, key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_records_seq ON records (seq);
+"""
+
+UPSERT = """
+    INSERT INTO records (collection, key, data, seq)
+    VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM records))
+    ON CONFLICT (collection, key) DO UPDATE SET data = excluded.data, seq = excluded.seq
+    RETURNING seq
+"""
+
+# Called with (key, record) for every record another worker changed
+ApplyFn = Callable[[str, Dict[str, Any]], None]
+
+
+class _RequestSync:
+    """Whether the current request has synced; shared by the request's copied contexts"""
+
+    __slots__ = ("synced",)
+
+    def __init__(self):
+        self.synced = False
+
+
+_request_sync: ContextVar[Optional[_RequestSync]] = ContextVar("shared_state_request_sync", default=None)
+
+
+class SharedState:
+    """Cross-process record overlay backed by a SQLite file in WAL mode"""
+
+    def __init__(self, path: str, busy_timeout_ms: int = 10000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._data_version: Optional[int] = None
+        self._last_seq = 0
+        self._handlers: Dict[str, ApplyFn] = {}
+
+    @classmethod
+    def from_env(cls, data_dir: str = "mock_data") -> Optional["SharedState"]:
+        """Shared state configured by MOCK_SHARED_STATE / MOCK_STATE_DB, or None when disabled"""
+        if os.getenv("MOCK_SHARED_STATE", "true").lower() != "true":
+            return None
+        return cls(os.getenv("MOCK_STATE_DB", os.path.join(data_dir, "state.db")))
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection of this process, opened on first use (and again after a fork)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._conn_pid = os.getpid()
+            self._data_version = None
+            self._last_seq = 0
+        return self._conn
+
+    def records(self, collection: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """Current (key, record) pairs stored for one collection"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT key, data FROM records WHERE collection = ?", (collection,)
+            ).fetchall()
+        return [(key, orjson.loads(data)) for key, data in rows]
+
+    def has_records(self, collection: str) -> bool:
+        """Whether any worker has changed a record of this collection"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM records WHERE collection = ? LIMIT 1", (collection,)
+            ).fetchone()
+        return row is not None
+
+    def register(self, collection: str, apply: ApplyFn) -> None:
+        """Have `sync` call `apply` for records of a collection changed elsewhere"""
+        with self._lock:
+            self._handlers[collection] = apply
+
+    def put(self, collection: str, key: str, record: Dict[str, Any]) -> None:
+        """Store the latest version of a record"""
+        data = orjson.dumps(dict(record))
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self.conn.execute(UPSERT, (collection, key, data)).fetchone()[0]
+                self.conn.execute("COMMIT")
+                self._wrote(seq)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def update(
+        self, collection: str, key: str, changes: Dict[str, Any], base: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Atomically merge `changes` into a record and return the merged record
+
+        `base` is the baseline (JSON) version, used when no worker has changed
+        the record yet. The write lock is taken before reading, so updates
+        from different workers are applied one after the other.
+        """
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT data FROM records WHERE collection = ? AND key = ?", (collection, key)
+                ).fetchone()
+                current = orjson.loads(row[0]) if row else dict(base or {})
+                current.update(changes)
+                seq = conn.execute(UPSERT, (collection, key, orjson.dumps(current))).fetchone()[0]
+                conn.execute("COMMIT")
+                self._wrote(seq)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return current
+
+    def _wrote(self, seq: int) -> None:
+        # Skip our own write in the next sync when no other worker wrote in between
+        if seq == self._last_seq + 1:
+            self._last_seq = seq
+
+    def sync(self) -> int:
+        """Apply records other workers changed since the last sync; returns how many were applied"""
+        with self._lock:
+            conn = self.conn
+            # data_version only moves when *another* connection commits: a pragma read otherwise
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return 0
+            self._data_version = data_version
+
+            rows = conn.execute(
+                "SELECT collection, key, data, seq FROM records WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            ).fetchall()
+            applied = 0
+            for collection, key, data, seq in rows:
+                self._last_seq = seq
+                record = orjson.loads(data)
+                apply = self._handlers.get(collection)
+                if apply:
+                    apply(key, record)
+                    applied += 1
+                # Also for collections not loaded here, whose snapshots no longer apply
+                change_feed.publish(collection, OP_UPSERT, key, record)
+            if applied:
+                logger.debug("Applied %s shared state changes", applied)
+            return applied
+
+    def sync_once(self) -> int:
+        """`sync()` on the first call in an HTTP request, and on every call outside one"""
+        request = _request_sync.get()
+        if request is None:
+            return self.sync()
+        if request.synced:
+            return 0
+        # Set first: applying the changes reads the collections, which calls back here
+        request.synced = True
+        return self.sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+class SharedStateMiddleware:
+    """ASGI middleware marking each HTTP request, so `sync_once` syncs once per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_sync.set(_RequestSync())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_sync.reset(token)
+
+
+# Global shared state instance (None when disabled)
+shared_state = SharedState.from_env(os.getenv("MOCK_DATA_DIR", "mock_data"))
@@ -0,0 +1,1163 @@
+// Theme toggle functionality
+const themeToggle = document.getElementById("themeToggle");
+const themeIcon = document.getElementById("themeIcon");
+const html = document.documentElement;
+
+themeToggle.addEventListener("click", () => {
+  if (html.getAttribute("data-bs-theme") === "dark") {
+    html.setAttribute("data-bs-theme", "light");
+    themeIcon.className = "fas fa-moon";
+  } else {
+    html.setAttribute("data-bs-theme", "dark");
+    themeIcon.className = "fas fa-sun";
+  }
+});
+
+// Dashboard elements
+const loadingSpinner = document.getElementById("loadingSpinner");
+const dataItems = document.querySelectorAll(".data-item");
+const currentDataType = document.getElementById("currentDataType");
+const tableHeader = document.getElementById("tableHeader");
+const tableBody = document.getElementById("tableBody");
+const jsonData = document.getElementById("jsonData");
+const sourceToggle = document.getElementById("sourceToggle");
+const agentsTabContainer = document.getElementById(
+  "agents-tab-container"
+);
+const agentsContainer = document.getElementById("agentsContainer");
+const homeDashboard = document.getElementById("homeDashboard");
+const dataViews = document.getElementById("dataViews");
+
+let currentData = [];
+let currentType = "home";
+let useDatabase = false;
+let charts = {};
+let aggregates = {};
+let chartViews = { account: "type", loan: "type" };
+let changeFeed;
+let aggregatesRefresh;
+let searchTimeout;
+
+// Initialize dashboard
+document.addEventListener("DOMContentLoaded", function () {
+  initializeEventListeners();
+  document.querySelector('.data-item[data-type="home"]').click();
+  connectChangeFeed();
+});
+
+function showHomeDashboard() {
+  homeDashboard.style.display = "block";
+  dataViews.style.display = "none";
+  loadDashboardData();
+}
+
+function showDataViews() {
+  homeDashboard.style.display = "none";
+  dataViews.style.display = "block";
+}
+
+function navigateToData(dataType) {
+  const targetItem = document.querySelector(
+    `.data-item[data-type="${dataType}"]`
+  );
+  if (targetItem) {
+    targetItem.click();
+  }
+}
+
+function initializeEventListeners() {
+  dataItems.forEach((item) => {
+    item.addEventListener("click", function () {
+      const dataType = this.dataset.type;
+      dataItems.forEach((i) => i.classList.remove("active"));
+      this.classList.add("active");
+
+      if (dataType === "home") {
+        currentType = "home";
+        showHomeDashboard();
+      } else {
+        showDataViews();
+        loadData(dataType);
+      }
+    });
+  });
+
+  sourceToggle.addEventListener("change", function () {
+    useDatabase = this.checked;
+    if (currentType !== "home") {
+      loadData(currentType);
+    } else {
+      loadDashboardData();
+    }
+  });
+
+  document.addEventListener("click", function (e) {
+    if (e.target && e.target.classList.contains("view-details-btn")) {
+      const data = JSON.parse(e.target.dataset.item);
+      document.getElementById("jsonContent").textContent = JSON.stringify(
+        data,
+        null,
+        4
+      );
+      new bootstrap.Modal(document.getElementById("jsonModal")).show();
+    }
+  });
+}
+
+async function loadDashboardData() {
+  showLoading();
+  try {
+    const source = useDatabase ? "db" : "mock";
+    const dashboardData = { aggregates: {} };
+
+    // Counts and sums over the full datasets, grouped on the server
+    const response = await fetch(
+      `/dashboard/api/aggregates?source=${source}`
+    );
+    if (response.ok) {
+      const data = await response.json();
+      dashboardData.aggregates = data.aggregates || {};
+    }
+
+    // The activity feed only shows the latest few records
+    for (const dataType of ["accounts", "transactions"]) {
+      const url = `/dashboard/api?source=${source}&data_type=${dataType}&limit=3`;
+      const response = await fetch(url);
+
+      if (response.ok) {
+        const data = await response.json();
+        dashboardData[dataType] = data.data || [];
+      }
+    }
+
+    aggregates = dashboardData.aggregates;
+    updateDashboardStats(aggregates);
+    initializeCharts(aggregates);
+    chartViews = { account: "type", loan: "type" };
+    populateActivityFeeds(dashboardData);
+  } catch (error) {
+    console.error("Error loading dashboard data:", error);
+  } finally {
+    hideLoading();
+  }
+}
+
+function sumGroups(groups, key) {
+  return (groups || []).reduce((sum, group) => sum + group[key], 0);
+}
+
+function countWhere(groups, field, value) {
+  return sumGroups(
+    (groups || []).filter((group) => group[field] === value),
+    "count"
+  );
+}
+
+function groupData(groups, field, fallback = "Unknown") {
+  return {
+    labels: (groups || []).map((group) => group[field] ?? fallback),
+    values: (groups || []).map((group) => group.count),
+  };
+}
+
+function updateDashboardStats(aggregates) {
+  const accountTypes = aggregates.account_types || [];
+  document.getElementById("totalAccounts").textContent = sumGroups(
+    accountTypes,
+    "count"
+  ).toLocaleString();
+
+  const totalBalance = sumGroups(accountTypes, "total");
+  document.getElementById("totalBalance").textContent =
+    "₹" +
+    totalBalance.toLocaleString("en-IN", { maximumFractionDigits: 0 });
+
+  const activeCards = countWhere(
+    aggregates.card_status,
+    "card_status",
+    "ACTIVE"
+  );
+  document.getElementById("activeCards").textContent =
+    activeCards.toLocaleString();
+
+  const availableAgents = countWhere(
+    aggregates.agent_status,
+    "current_status",
+    "Available"
+  );
+  document.getElementById("availableAgents").textContent =
+    availableAgents.toLocaleString();
+}
+
+function initializeCharts(data) {
+  const isDarkTheme = html.getAttribute("data-bs-theme") === "dark";
+  const textColor = isDarkTheme ? "#c9d1d9" : "#24292f";
+  const gridColor = isDarkTheme ? "#30363d" : "#d0d7de";
+
+  const chartConfigs = {
+    account: {
+      ctx: document.getElementById("accountChart").getContext("2d"),
+      type: "doughnut",
+      data: () => {
+        const accounts = groupData(data.account_types, "account_type");
+        return {
+          labels: accounts.labels,
+          datasets: [
+            {
+              data: accounts.values,
+              backgroundColor: [
+                "#0969da",
+                "#1a7f37",
+                "#8250df",
+                "#cf222e",
+                "#bc4c00",
+              ],
+              borderWidth: 0,
+            },
+          ],
+        };
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+          legend: {
+            position: "bottom",
+            labels: { color: textColor, font: { size: 11 } },
+          },
+        },
+      },
+    },
+    transaction: {
+      ctx: document.getElementById("transactionChart").getContext("2d"),
+      type: "line",
+      data: () => {
+        const last7Days = Array.from({ length: 7 }, (_, i) => {
+          const d = new Date();
+          d.setDate(d.getDate() - i);
+          return d.toLocaleDateString("en-US", {
+            month: "short",
+            day: "numeric",
+          });
+        }).reverse();
+        const transactionCounts = Array.from(
+          { length: 7 },
+          () => Math.floor(Math.random() * 100) + 50
+        );
+        return {
+          labels: last7Days,
+          datasets: [
+            {
+              label: "Transactions",
+              data: transactionCounts,
+              borderColor: "#0969da",
+              backgroundColor: "rgba(9, 105, 218, 0.1)",
+              borderWidth: 2,
+              fill: true,
+              tension: 0.4,
+              pointBackgroundColor: "#0969da",
+              pointBorderColor: "#fff",
+              pointBorderWidth: 2,
+              pointRadius: 4,
+              pointHoverRadius: 6,
+            },
+          ],
+        };
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        scales: {
+          y: {
+            beginAtZero: true,
+            ticks: { color: textColor, font: { size: 10 } },
+            grid: { color: gridColor, drawBorder: false },
+          },
+          x: {
+            ticks: { color: textColor, font: { size: 10 } },
+            grid: { display: false },
+          },
+        },
+        plugins: {
+          legend: { display: false },
+          tooltip: {
+            backgroundColor: isDarkTheme ? "#30363d" : "#fff",
+            titleColor: textColor,
+            bodyColor: textColor,
+            borderColor: gridColor,
+            borderWidth: 1,
+          },
+        },
+      },
+    },
+    loan: {
+      ctx: document.getElementById("loanChart").getContext("2d"),
+      type: "pie",
+      data: () => {
+        const loans = groupData(data.loan_types, "loan_type", "Personal");
+        return {
+          labels: loans.labels,
+          datasets: [
+            {
+              data: loans.values,
+              backgroundColor: [
+                "#1a7f37",
+                "#8250df",
+                "#cf222e",
+                "#bc4c00",
+                "#0969da",
+              ],
+              borderWidth: 0,
+            },
+          ],
+        };
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+          legend: {
+            position: "bottom",
+            labels: { color: textColor, font: { size: 11 } },
+          },
+        },
+      },
+    },
+    agent: {
+      ctx: document.getElementById("agentChart").getContext("2d"),
+      type: "bar",
+      data: () => {
+        const agents = groupData(data.agent_status, "current_status");
+        return {
+          labels: agents.labels,
+          datasets: [
+            {
+              label: "Agents",
+              data: agents.values,
+              backgroundColor: [
+                "rgba(26, 127, 55, 0.8)",
+                "rgba(130, 80, 223, 0.8)",
+                "rgba(207, 34, 46, 0.8)",
+                "rgba(188, 76, 0, 0.8)",
+                "rgba(9, 105, 218, 0.8)",
+              ],
+              borderColor: [
+                "#1a7f37",
+                "#8250df",
+                "#cf222e",
+                "#bc4c00",
+                "#0969da",
+              ],
+              borderWidth: 1,
+              borderRadius: 4,
+            },
+          ],
+        };
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        scales: {
+          y: {
+            beginAtZero: true,
+            ticks: { color: textColor, font: { size: 10 } },
+            grid: { color: gridColor, drawBorder: false },
+          },
+          x: {
+            ticks: { color: textColor, font: { size: 10 } },
+            grid: { display: false },
+          },
+        },
+        plugins: {
+          legend: { display: false },
+          tooltip: {
+            backgroundColor: isDarkTheme ? "#30363d" : "#fff",
+            titleColor: textColor,
+            bodyColor: textColor,
+            borderColor: gridColor,
+            borderWidth: 1,
+          },
+        },
+      },
+    },
+  };
+
+  for (const chartName in chartConfigs) {
+    if (charts[chartName]) charts[chartName].destroy();
+    const config = chartConfigs[chartName];
+    charts[chartName] = new Chart(config.ctx, {
+      type: config.type,
+      data: config.data(),
+      options: config.options,
+    });
+  }
+}
+
+function initializeSearch(dataType) {
+  const searchContainer = document.getElementById(
+    `${dataType}SearchContainer`
+  );
+  if (!searchContainer) return;
+
+  const searchInput = document.getElementById(`${dataType}SearchInput`);
+  const filters = searchContainer.querySelectorAll(".search-filter");
+
+  const handler = () => {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => performSearch(dataType), 300);
+  };
+
+  searchInput.addEventListener("input", handler);
+  filters.forEach((filter) => filter.addEventListener("change", handler));
+}
+
+function performSearch(dataType) {
+  const startTime = performance.now();
+  let results = [...currentData];
+
+  const searchContainer = document.getElementById(
+    `${dataType}SearchContainer`
+  );
+  const searchInput = document.getElementById(`${dataType}SearchInput`);
+  const searchTerm = searchInput.value.toLowerCase().trim();
+
+  switch (dataType) {
+    case "accounts": {
+      const accountType =
+        document.getElementById("accountTypeFilter").value;
+      const accountStatus = document.getElementById(
+        "accountStatusFilter"
+      ).value;
+      const kycStatus = document.getElementById("kycStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter((item) =>
+          Object.values(item).some((val) =>
+            String(val).toLowerCase().includes(searchTerm)
+          )
+        );
+      }
+      if (accountType)
+        results = results.filter(
+          (item) => item.account_type === accountType
+        );
+      if (accountStatus)
+        results = results.filter(
+          (item) => item.account_status === accountStatus
+        );
+      if (kycStatus)
+        results = results.filter((item) => item.kyc_status === kycStatus);
+      break;
+    }
+    case "transactions": {
+      const transType = document.getElementById(
+        "transactionTypeFilter"
+      ).value;
+      const transStatus = document.getElementById(
+        "transactionStatusFilter"
+      ).value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.id.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm) ||
+            item.description.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (transType)
+        results = results.filter((item) => item.type === transType);
+      if (transStatus)
+        results = results.filter((item) => item.status === transStatus);
+      break;
+    }
+    case "branches": {
+      const branchType =
+        document.getElementById("branchTypeFilter").value;
+      const branchFacilities = document.getElementById(
+        "branchFacilitiesFilter"
+      ).value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.name.toLowerCase().includes(searchTerm) ||
+            item.city.toLowerCase().includes(searchTerm) ||
+            item.ifsc.toLowerCase().includes(searchTerm) ||
+            item.manager_name.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (branchType)
+        results = results.filter(
+          (item) => item.branch_type === branchType
+        );
+      if (branchFacilities)
+        results = results.filter(
+          (item) => item.facilities === branchFacilities
+        );
+      break;
+    }
+    case "atms": {
+      const atmType = document.getElementById("atmTypeFilter").value;
+      const atmStatus = document.getElementById("atmStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.id.toLowerCase().includes(searchTerm) ||
+            item.address.toLowerCase().includes(searchTerm) ||
+            item.city.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (atmType)
+        results = results.filter((item) => item.type === atmType);
+      if (atmStatus)
+        results = results.filter((item) => item.status === atmStatus);
+      break;
+    }
+    case "agents": {
+      const agentStatus =
+        document.getElementById("agentStatusFilter").value;
+      const agentWorkMode = document.getElementById(
+        "agentWorkModeFilter"
+      ).value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.full_name.toLowerCase().includes(searchTerm) ||
+            item.agent_id.toLowerCase().includes(searchTerm) ||
+            item.employee_id.toLowerCase().includes(searchTerm) ||
+            item.email.toLowerCase().includes(searchTerm) ||
+            item.department.toLowerCase().includes(searchTerm) ||
+            item.specialization.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (agentStatus)
+        results = results.filter(
+          (item) => item.current_status === agentStatus
+        );
+      if (agentWorkMode)
+        results = results.filter(
+          (item) => item.work_mode === agentWorkMode
+        );
+      break;
+    }
+    case "complaints": {
+      const category = document.getElementById(
+        "complaintCategoryFilter"
+      ).value;
+      const status = document.getElementById(
+        "complaintStatusFilter"
+      ).value;
+      const priority = document.getElementById(
+        "complaintPriorityFilter"
+      ).value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.ticket_id.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm) ||
+            item.subject.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (category)
+        results = results.filter((item) => item.category === category);
+      if (status)
+        results = results.filter((item) => item.status === status);
+      if (priority)
+        results = results.filter((item) => item.priority === priority);
+      break;
+    }
+    case "disputes": {
+      const type = document.getElementById("disputeTypeFilter").value;
+      const status = document.getElementById("disputeStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.ticket_id.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm) ||
+            item.transaction_id.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (type)
+        results = results.filter((item) => item.dispute_type === type);
+      if (status)
+        results = results.filter((item) => item.status === status);
+      break;
+    }
+    case "loans": {
+      const type = document.getElementById("loanTypeFilter").value;
+      const status = document.getElementById("loanStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.loan_id.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (type)
+        results = results.filter((item) => item.loan_type === type);
+      if (status)
+        results = results.filter((item) => item.status === status);
+      break;
+    }
+    case "fd_rates": {
+      const customerType = document.getElementById(
+        "fdCustomerTypeFilter"
+      ).value;
+      const features = document.getElementById(
+        "fdSpecialFeaturesFilter"
+      ).value;
+      if (searchTerm) {
+        results = results.filter((item) =>
+          String(item.tenure).includes(searchTerm)
+        );
+      }
+      if (customerType)
+        results = results.filter(
+          (item) => item.customer_type === customerType
+        );
+      if (features)
+        results = results.filter(
+          (item) => item.special_features === features
+        );
+      break;
+    }
+    case "cards": {
+      const cardType = document.getElementById("cardTypeFilter").value;
+      const cardNetwork =
+        document.getElementById("cardNetworkFilter").value;
+      const cardStatus =
+        document.getElementById("cardStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.card_number.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm) ||
+            item.customer_name.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (cardType)
+        results = results.filter((item) => item.card_type === cardType);
+      if (cardNetwork)
+        results = results.filter(
+          (item) => item.card_network === cardNetwork
+        );
+      if (cardStatus)
+        results = results.filter(
+          (item) => item.card_status === cardStatus
+        );
+      break;
+    }
+    case "cheques": {
+      const status = document.getElementById("chequeStatusFilter").value;
+      if (searchTerm) {
+        results = results.filter(
+          (item) =>
+            item.cheque_number.toLowerCase().includes(searchTerm) ||
+            item.account_number.toLowerCase().includes(searchTerm) ||
+            item.payee_name.toLowerCase().includes(searchTerm)
+        );
+      }
+      if (status)
+        results = results.filter((item) => item.status === status);
+      break;
+    }
+  }
+
+  const endTime = performance.now();
+  updateSearchStats(
+    dataType,
+    currentData.length,
+    results.length,
+    endTime - startTime
+  );
+  displaySearchResults(results, searchTerm, dataType);
+}
+
+function updateSearchStats(dataType, total, filtered, timeMs) {
+  const statsContainer = document.getElementById(
+    `${dataType}SearchStats`
+  );
+  if (!statsContainer) return;
+  statsContainer.innerHTML = `
+          <div class="search-stat"><i class="fas fa-database search-stat-icon"></i><span>${total.toLocaleString()} total</span></div>
+          <div class="search-stat"><i class="fas fa-filter search-stat-icon"></i><span>${filtered.toLocaleString()} filtered</span></div>
+          <div class="search-stat"><i class="fas fa-clock search-stat-icon"></i><span>${timeMs.toFixed(
+            1
+          )}ms</span></div>
+      `;
+  statsContainer.style.display = "flex";
+}
+
+function displaySearchResults(results, searchTerm, dataType) {
+  if (results.length === 0) {
+    if (dataType === "agents") {
+      agentsContainer.innerHTML =
+        '<div class="col-12 text-center py-5"><div class="no-results"><div class="no-results-icon"><i class="fas fa-search"></i></div><div>No agents found.</div></div></div>';
+    }
+    tableBody.innerHTML = `<tr><td colspan="100%" class="text-center"><div class="no-results"><div class="no-results-icon"><i class="fas fa-search"></i></div><div>No results found.</div></div></td></tr>`;
+    return;
+  }
+
+  renderTable(results, searchTerm);
+  if (dataType === "agents") {
+    renderAgentCards(results, searchTerm);
+  }
+}
+
+function highlightSearchTerm(text, searchTerm) {
+  if (!searchTerm || typeof text !== "string") return text;
+  const regex = new RegExp(
+    `(${searchTerm.replace(/[-\/\\^$*+?.()|[\]{}]/g, "\\$&")})`,
+    "gi"
+  );
+  return text.replace(regex, '<span class="search-highlight">$1</span>');
+}
+
+function clearSearch(dataType) {
+  const searchContainer = document.getElementById(
+    `${dataType}SearchContainer`
+  );
+  if (!searchContainer) return;
+
+  const searchInput = document.getElementById(`${dataType}SearchInput`);
+  searchInput.value = "";
+
+  const filters = searchContainer.querySelectorAll(".search-filter");
+  filters.forEach((filter) => (filter.value = ""));
+
+  const statsContainer = document.getElementById(
+    `${dataType}SearchStats`
+  );
+  statsContainer.style.display = "none";
+
+  renderTable(currentData);
+  if (dataType === "agents") {
+    renderAgentCards(currentData);
+  }
+}
+
+function activityHtml(activity) {
+  return `<div class="activity-item"><div class="activity-icon" style="background: ${activity.color}20; color: ${activity.color};"><i class="fas ${activity.icon}"></i></div><div class="activity-content"><div class="activity-title">${activity.title}</div><div class="activity-description">${activity.description}</div><div class="activity-time">${activity.time}</div></div></div>`;
+}
+
+function populateActivityFeeds(data) {
+  const activityFeed = document.getElementById("activityFeed");
+  const alertsFeed = document.getElementById("alertsFeed");
+  const activities = [];
+  (data.accounts || [])
+    .slice(0, 3)
+    .forEach((account) =>
+      activities.push({
+        icon: "fa-user-plus",
+        color: "#1a7f37",
+        title: "New Account Created",
+        description: `${account.customer_name} - ${account.account_type}`,
+        time: "Just now",
+      })
+    );
+  (data.transactions || [])
+    .slice(0, 3)
+    .forEach((transaction) =>
+      activities.push({
+        icon: "fa-exchange-alt",
+        color: "#0969da",
+        title: "Transaction Processed",
+        description: `${transaction.type} - ₹${transaction.amount}`,
+        time: "2 mins ago",
+      })
+    );
+
+  if (activityFeed) {
+    activityFeed.innerHTML = activities
+      .slice(0, 5)
+      .map(activityHtml)
+      .join("");
+  }
+
+  const alerts = [
+    {
+      icon: "fa-exclamation-triangle",
+      color: "#bc4c00",
+      title: "High Transaction Volume",
+      description: "Transaction volume increased by 25% today",
+      time: "5 mins ago",
+    },
+    {
+      icon: "fa-info-circle",
+      color: "#0969da",
+      title: "System Maintenance",
+      description: "Scheduled maintenance tonight at 2 AM",
+      time: "1 hour ago",
+    },
+    {
+      icon: "fa-check-circle",
+      color: "#1a7f37",
+      title: "Backup Completed",
+      description: "Daily backup completed successfully",
+      time: "2 hours ago",
+    },
+  ];
+
+  if (alertsFeed) {
+    alertsFeed.innerHTML = alerts
+      .map(activityHtml)
+      .join("");
+  }
+}
+
+// Fields identifying a record in change events (RECORD_KEYS in mock_data_storage.py)
+const recordKeys = {
+  accounts: ["account_number"],
+  cards: ["card_number", "account_number"],
+  transactions: ["id"],
+  complaints: ["ticket_id"],
+  disputes: ["ticket_id"],
+  loans: ["loan_id"],
+  cheques: ["cheque_number"],
+  agents: ["agent_id"],
+};
+
+function connectChangeFeed() {
+  if (changeFeed) changeFeed.close();
+  // EventSource reconnects by itself, resuming from the last event id
+  changeFeed = new EventSource("/dashboard/api/changes");
+  changeFeed.addEventListener("change", (event) =>
+    applyChange(JSON.parse(event.data))
+  );
+}
+
+function applyChange(change) {
+  if (change.op === "reset") {
+    currentType === "home" ? loadDashboardData() : loadData(currentType);
+    return;
+  }
+  if (currentType === "home") {
+    addActivity(change);
+    // Several changes in a row cost one (server-cached) aggregates request
+    clearTimeout(aggregatesRefresh);
+    aggregatesRefresh = setTimeout(refreshAggregates, 1000);
+  } else if (currentType === change.collection) {
+    upsertRow(change);
+  }
+}
+
+async function refreshAggregates() {
+  const source = useDatabase ? "db" : "mock";
+  const response = await fetch(
+    `/dashboard/api/aggregates?source=${source}`
+  );
+  if (!response.ok) return;
+  aggregates = (await response.json()).aggregates || {};
+  updateDashboardStats(aggregates);
+  updateAccountChart(chartViews.account);
+  updateLoanChart(chartViews.loan);
+  setChartGroups("agent", aggregates.agent_status, "current_status");
+}
+
+function changeActivity(change) {
+  const data = change.data || {};
+  const time = new Date(change.timestamp).toLocaleTimeString();
+  switch (`${change.collection}.${change.op}`) {
+    case "complaints.insert":
+      return {
+        icon: "fa-comment-dots",
+        color: "#bc4c00",
+        title: "New Complaint",
+        description: `${data.ticket_id} - ${data.category}`,
+        time,
+      };
+    case "disputes.insert":
+      return {
+        icon: "fa-balance-scale",
+        color: "#cf222e",
+        title: "New Dispute",
+        description: `${data.ticket_id} - ₹${data.amount}`,
+        time,
+      };
+    case "cards.update":
+      return data.card_status === "BLOCKED"
+        ? {
+            icon: "fa-ban",
+            color: "#cf222e",
+            title: "Card Blocked",
+            description: `Card ending ${change.key.split(":")[0].slice(-4)}`,
+            time,
+          }
+        : null;
+    case "agents.update":
+      return {
+        icon: "fa-headset",
+        color: "#8250df",
+        title: "Agent Status Changed",
+        description: `${change.key} - ${data.current_status}`,
+        time,
+      };
+    case "escalations.insert":
+      return {
+        icon: "fa-user-tie",
+        color: "#0969da",
+        title: "Escalated to Agent",
+        description: `${data.agent_name} - ${data.urgency} urgency`,
+        time,
+      };
+  }
+  return null;
+}
+
+function addActivity(change) {
+  const activity = changeActivity(change);
+  const activityFeed = document.getElementById("activityFeed");
+  if (!activity || !activityFeed) return;
+  activityFeed.insertAdjacentHTML("afterbegin", activityHtml(activity));
+  while (activityFeed.children.length > 5) {
+    activityFeed.lastElementChild.remove();
+  }
+}
+
+function upsertRow(change) {
+  const fields = recordKeys[change.collection];
+  if (!fields) return;
+  const index = currentData.findIndex(
+    (row) => fields.map((field) => row[field]).join(":") === change.key
+  );
+  if (index >= 0) {
+    Object.assign(currentData[index], change.data);
+  } else if (change.op !== "update") {
+    currentData.unshift(change.data);
+  } else {
+    return;
+  }
+
+  if (document.getElementById(`${currentType}SearchContainer`)) {
+    performSearch(currentType);
+  } else {
+    renderTable(currentData);
+  }
+  if (currentType === "agents") renderAgentCards(currentData);
+  renderJson(currentData);
+}
+
+function setChartGroups(chartName, groups, field, fallback) {
+  const chart = charts[chartName];
+  if (!chart) return;
+  const data = groupData(groups, field, fallback);
+  chart.data.labels = data.labels;
+  chart.data.datasets[0].data = data.values;
+  chart.update();
+}
+
+function updateAccountChart(type) {
+  chartViews.account = type;
+  if (type === "status") {
+    setChartGroups("account", aggregates.account_status, "account_status");
+  } else {
+    setChartGroups("account", aggregates.account_types, "account_type");
+  }
+}
+function updateTransactionChart(period) {
+  console.log("Updating transaction chart:", period);
+}
+function updateLoanChart(type) {
+  chartViews.loan = type;
+  if (type === "status") {
+    setChartGroups("loan", aggregates.loan_status, "status");
+  } else {
+    setChartGroups("loan", aggregates.loan_types, "loan_type", "Personal");
+  }
+}
+function updateAgentChart(metric) {
+  console.log("Updating agent chart:", metric);
+}
+
+function showLoading() {
+  loadingSpinner.style.display = "block";
+}
+function hideLoading() {
+  loadingSpinner.style.display = "none";
+}
+
+async function loadData(dataType) {
+  showLoading();
+  currentType = dataType;
+  currentDataType.textContent =
+    dataType.charAt(0).toUpperCase() +
+    dataType.slice(1).replace(/_/g, " ");
+
+  document
+    .querySelectorAll(".search-container")
+    .forEach((c) => (c.style.display = "none"));
+  const currentSearchContainer = document.getElementById(
+    `${dataType}SearchContainer`
+  );
+  if (currentSearchContainer) {
+    currentSearchContainer.style.display = "block";
+    clearSearch(dataType);
+    initializeSearch(dataType);
+  }
+
+  const isAgents = dataType === "agents";
+  agentsTabContainer.style.display = isAgents ? "block" : "none";
+  const tableTab = new bootstrap.Tab(
+    document.getElementById("table-tab")
+  );
+  const cardsTab = new bootstrap.Tab(
+    document.getElementById("cards-tab")
+  );
+  isAgents ? cardsTab.show() : tableTab.show();
+
+  try {
+    const source = useDatabase ? "db" : "mock";
+    const url = `/dashboard/api?source=${source}&data_type=${dataType}`;
+    const response = await fetch(url);
+    if (!response.ok)
+      throw new Error(`HTTP error! status: ${response.status}`);
+
+    const data = await response.json();
+    currentData = data.data || [];
+    renderTable(currentData);
+    if (isAgents) renderAgentCards(currentData);
+    renderJson(currentData);
+  } catch (error) {
+    console.error("Error loading data:", error);
+    renderTable([]);
+    if (isAgents) renderAgentCards([]);
+    renderJson([]);
+  } finally {
+    hideLoading();
+  }
+}
+
+function renderTable(data, searchTerm = "") {
+  if (!data || data.length === 0) {
+    tableHeader.innerHTML = "<tr><th>No data available</th></tr>";
+    tableBody.innerHTML = "";
+    return;
+  }
+
+  tableHeader.innerHTML = "";
+  tableBody.innerHTML = "";
+
+  const headerRow = document.createElement("tr");
+  Object.keys(data[0]).forEach((key) => {
+    const th = document.createElement("th");
+    th.textContent = key
+      .replace(/_/g, " ")
+      .replace(/\b\w/g, (l) => l.toUpperCase());
+    headerRow.appendChild(th);
+  });
+  tableHeader.appendChild(headerRow);
+
+  data.forEach((item) => {
+    const row = document.createElement("tr");
+    Object.keys(item).forEach((key) => {
+      const td = document.createElement("td");
+      let value = item[key];
+
+      if (typeof value === "object" && value !== null) {
+        const btn = document.createElement("button");
+        btn.className = "btn btn-sm btn-outline-primary view-details-btn";
+        btn.textContent = "View Details";
+        btn.dataset.item = JSON.stringify(value);
+        td.appendChild(btn);
+      } else {
+        const textValue = String(value ?? "");
+        td.innerHTML = highlightSearchTerm(textValue, searchTerm);
+      }
+      row.appendChild(td);
+    });
+    tableBody.appendChild(row);
+  });
+}
+
+function renderJson(data) {
+  jsonData.textContent = JSON.stringify(data, null, 4);
+}
+
+function renderAgentCards(data, searchTerm = "") {
+  if (!data || data.length === 0) {
+    agentsContainer.innerHTML =
+      '<div class="col-12 text-center py-5">No agents data available</div>';
+    return;
+  }
+
+  agentsContainer.innerHTML = data
+    .map((agent, index) => {
+      const initials = agent.full_name
+        ? agent.full_name
+            .split(" ")
+            .map((n) => n[0])
+            .join("")
+            .toUpperCase()
+        : "AG";
+      const statusClass = getStatusClass(agent.current_status);
+      const skills = (agent.skills || [])
+        .slice(0, 4)
+        .map((skill) => `<span class="skill-badge">${skill}</span>`)
+        .join("");
+
+      return `
+              <div class="agent-card" style="animation-delay: ${
+                index * 0.1
+              }s;">
+                  <div class="agent-header">
+                      <div class="agent-avatar">${initials}</div>
+                      <div class="agent-info"><h5>${highlightSearchTerm(
+                        agent.full_name || "N/A",
+                        searchTerm
+                      )}</h5><p>${highlightSearchTerm(
+        agent.agent_id || "N/A",
+        searchTerm
+      )} • ${highlightSearchTerm(
+        agent.department || "N/A",
+        searchTerm
+      )}</p></div>
+                  </div>
+                  <div class="agent-status ${statusClass}">${
+        agent.current_status || "N/A"
+      }</div>
+                  <div class="agent-details">
+                      <div class="detail-row"><span>Specialization:</span><span>${highlightSearchTerm(
+                        agent.specialization || "N/A",
+                        searchTerm
+                      )}</span></div>
+                      <div class="detail-row"><span>Experience:</span><span>${
+                        agent.years_experience || 0
+                      } years</span></div>
+                      <div class="detail-row"><span>Location:</span><span>${
+                        agent.base_city || "N/A"
+                      }</span></div>
+                      <div class="detail-row"><span>Work Mode:</span><span>${
+                        agent.work_mode || "N/A"
+                      }</span></div>
+                  </div>
+                  <div class="agent-skills">${skills}</div>
+                  <div class="agent-metrics">
+                      <div class="metric"><div class="metric-value">${
+                        agent.performance_rating || 0
+                      }</div><div class="metric-label">Rating</div></div>
+                      <div class="metric"><div class="metric-value">${
+                        agent.customer_satisfaction_rate || 0
+                      }%</div><div class="metric-label">Satisfaction</div></div>
+                      <div class="metric"><div class="metric-value">${
+                        agent.cases_handled || 0
+                      }</div><div class="metric-label">Cases</div></div>
+                  </div>
+              </div>`;
+    })
+    .join("");
+}
+
+function getStatusClass(status) {
+  switch (status?.toLowerCase()) {
+    case "available":
+      return "status-available";
+    case "busy":
+      return "status-busy";
+    case "on break":
+      return "status-break";
+    case "in training":
+      return "status-training";
+    case "off duty":
+      return "status-off";
+    default:
+      return "status-off";
+  }
+}
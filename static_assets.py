@@ -0,0 +1,189 @@
+"""
+Fingerprinted, pre-compressed static assets.
+
+Files under STATIC_DIR are read once, at startup, and served from memory:
+
+* each file is also published under a fingerprinted name that embeds a
+  hash of its content (`dashboard/dashboard.css` ->
+  `dashboard/dashboard.3f2a9c1b7d4e.css`), with a one-year `immutable`
+  Cache-Control, so browsers never revalidate it; a changed file gets a
+  new name
+* the plain name stays available with `no-cache`, so it is revalidated
+  with its ETag on every use
+* every text asset is compressed once with gzip, and with brotli when the
+  `brotli` package is installed; each response picks the smallest encoding
+  the client accepts
+
+Pages rendered from templates (the dashboard shell) are cached the same
+way by `page`: rendered once with `asset_url`, which maps a plain name to
+its fingerprinted URL, and served with `no-cache` and an ETag, so a
+revisit costs a 304.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Callable, Dict, Optional, Tuple
+import logging
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = os.getenv("STATIC_DIR", "static")
+STATIC_URL = "/static"
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+# Content types worth compressing; images and fonts are compressed already
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+def compress(data: bytes, content_type: str) -> Dict[str, bytes]:
+    """The body in every available encoding that is smaller than the original"""
+    bodies = {"identity": data}
+    if not content_type.startswith(COMPRESSIBLE):
+        return bodies
+    # mtime=0 keeps the output (and so the ETag) identical across restarts
+    candidates = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(data, quality=11)
+    for encoding, body in candidates.items():
+        if len(body) < len(data):
+            bodies[encoding] = body
+    return bodies
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """{encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        if name:
+            accepted[name.lower()] = q
+    return accepted
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the ETag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+class Asset:
+    """One file (or rendered page) held in memory in each of its encodings"""
+
+    __slots__ = ("content_type", "digest", "bodies")
+
+    def __init__(self, data: bytes, content_type: str):
+        self.content_type = content_type
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        self.bodies = compress(data, content_type)
+
+    def etag(self, encoding: str) -> str:
+        # Each encoding is a different representation, so it gets its own strong ETag
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        """The smallest encoding the client accepts"""
+        accepted = accepted_encodings(accept_encoding)
+        usable = [
+            encoding
+            for encoding in self.bodies
+            if encoding == "identity" or accepted.get(encoding, accepted.get("*", 0)) > 0
+        ]
+        return min(usable, key=lambda encoding: len(self.bodies[encoding]))
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        """200 with the negotiated body, or 304 when the client's copy is current"""
+        encoding = self.negotiate(request.headers.get("accept-encoding"))
+        headers = {
+            "Cache-Control": cache_control,
+            "ETag": self.etag(encoding),
+            "Vary": "Accept-Encoding",
+        }
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.bodies[encoding], media_type=self.content_type, headers=headers)
+
+
+class AssetStore:
+    """The static files by plain and fingerprinted name, and the rendered pages"""
+
+    def __init__(self, directory: str = STATIC_DIR, url_prefix: str = STATIC_URL):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        # path -> (asset, Cache-Control for that path)
+        self._paths: Dict[str, Tuple[Asset, str]] = {}
+        # plain path -> fingerprinted path
+        self._fingerprints: Dict[str, str] = {}
+        self._pages: Dict[str, Asset] = {}
+        self.loaded = False
+
+    def load(self) -> None:
+        """Read, fingerprint and compress every file under the directory"""
+        paths, fingerprints = {}, {}
+        for root, _, files in os.walk(self.directory):
+            for filename in sorted(files):
+                full_path = os.path.join(root, filename)
+                path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                if content_type.startswith("text/") or content_type == "application/javascript":
+                    content_type += "; charset=utf-8"
+                with open(full_path, "rb") as f:
+                    asset = Asset(f.read(), content_type)
+
+                stem, ext = os.path.splitext(path)
+                fingerprinted = f"{stem}.{asset.digest}{ext}"
+                paths[fingerprinted] = (asset, CACHE_IMMUTABLE)
+                paths[path] = (asset, CACHE_REVALIDATE)
+                fingerprints[path] = fingerprinted
+
+        self._paths, self._fingerprints = paths, fingerprints
+        self._pages.clear()
+        self.loaded = True
+        encodings = "gzip and brotli" if brotli is not None else "gzip"
+        logger.info("Loaded %s static assets from %s (%s)", len(fingerprints), self.directory, encodings)
+
+    def asset_url(self, path: str) -> str:
+        """URL of the fingerprinted version of a file (the plain one when it is unknown)"""
+        if not self.loaded:
+            self.load()
+        return f"{self.url_prefix}/{self._fingerprints.get(path, path)}"
+
+    def get(self, path: str) -> Optional[Tuple[Asset, str]]:
+        """(asset, Cache-Control) served at a path below the URL prefix"""
+        if not self.loaded:
+            self.load()
+        return self._paths.get(path)
+
+    def page(self, name: str, render: Callable[[Callable[[str], str]], str]) -> Asset:
+        """A page rendered once by `render(asset_url)` and kept, compressed, until the next load"""
+        if not self.loaded:
+            self.load()
+        page = self._pages.get(name)
+        if page is None:
+            html = render(self.asset_url)
+            page = self._pages[name] = Asset(html.encode("utf-8"), "text/html; charset=utf-8")
+        return page
+
+
+# Global static asset store
+static_assets = AssetStore()
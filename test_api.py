@@ -6,13 +6,16 @@ Test script for the Banking Support API
 import asyncio
 import aiohttp
 import json
+import os
 from datetime import datetime
 
 BASE_URL = "http://localhost:8000"
+# Every /api endpoint needs a token (API_TOKEN, or one of API_TOKENS with read and write scopes)
+HEADERS = {"X-API-Token": os.getenv("API_TOKEN", "")}
 
 async def test_api_endpoints():
     """Test all API endpoints"""
-    async with aiohttp.ClientSession() as session:
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
         print("🧪 Testing Banking Support API...")
         print("=" * 50)
         